@@ -0,0 +1,632 @@
+"""
+bench.py
+========
+Performance benchmarks for FB Speed Monitor.
+
+The network benchmarks run against :class:`~fritzmock.MockFritzBox` instances on
+``localhost`` (optionally with artificial round-trip time), so no real
+router is needed.  Usage::
+
+    python bench.py transport [--rtt 0.02] [--samples 50]
+    python bench.py startup   [--rtt 0.02] [--runs 5]
+    python bench.py coldstart [--rtt 0.02] [--runs 5]
+    python bench.py async     [--rtt 0.05] [--routers 20] [--rounds 10]
+    python bench.py poll      [--rtt 0.02] [--routers 50] [--interval 2] [--duration 20]
+    python bench.py store     [--backend log|sqlite|compact] [--samples 10000000]
+    python bench.py plot      [--sizes 360,10000,100000] [--ticks 200]
+
+Each sub-command prints a small result table to stdout.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fritzmock import MockFritzBox
+
+
+def _median_ms(samples) -> float:
+    return statistics.median(samples) * 1000
+
+
+# ---------------------------------------------------------------------------
+# transport – pooled keep-alive session vs. fresh connection per call
+# ---------------------------------------------------------------------------
+
+def bench_transport(args) -> None:
+    """Median ``get_bandwidth`` latency with and without the session pool.
+
+    *fresh* disables the session on the soaper, so fritzconnection falls
+    back to ``requests.post`` with a new TCP connection and a new digest
+    challenge for every call – the cost every sample paid after each
+    reconnect before the pool existed.  *pooled* is the default transport.
+    """
+    from fritzreader import FritzReader
+    from fritztransport import SESSION_POOL
+
+    with MockFritzBox(rtt=args.rtt) as box:
+        reader = FritzReader(box.address, box.user, box.password, port=box.port)
+        if not reader.connect():
+            raise SystemExit("connect() against the mock failed")
+        reader.get_bandwidth()  # warm up: first call authenticates
+
+        results = {}
+        for mode in ("fresh", "pooled"):
+            session = reader.fc.soaper.session
+            if mode == "fresh":
+                reader.fc.soaper.session = None
+            box.reset_stats()
+            durations = []
+            for _ in range(args.samples):
+                t0 = time.perf_counter()
+                reader.get_bandwidth()
+                durations.append(time.perf_counter() - t0)
+            reader.fc.soaper.session = session
+            results[mode] = (_median_ms(durations), dict(box.stats))
+
+        # Reconnect re-uses the pooled session and its open connection.
+        box.reset_stats()
+        t0 = time.perf_counter()
+        reader.connect()
+        reconnect_ms = (time.perf_counter() - t0) * 1000
+        reconnect_conns = box.stats["connections"]
+
+        print(f"transport benchmark  (rtt={args.rtt * 1000:.0f} ms, {args.samples} samples)")
+        print(f"{'mode':<8} {'median ms':>10} {'tcp conns':>10} {'401s':>6}")
+        for mode, (ms, stats) in results.items():
+            print(f"{mode:<8} {ms:>10.1f} {stats['connections']:>10} {stats['challenges']:>6}")
+        speedup = results["fresh"][0] / results["pooled"][0] if results["pooled"][0] else float("inf")
+        print(f"speed-up: {speedup:.1f}x")
+        print(f"reconnect: {reconnect_ms:.0f} ms, {reconnect_conns} new tcp connection(s)")
+        print(f"pool stats: {SESSION_POOL.stats(box.address, box.port, box.user, box.password)}")
+
+
+# ---------------------------------------------------------------------------
+# startup – time to first sample, cold vs. warm description cache
+# ---------------------------------------------------------------------------
+
+def bench_startup(args) -> None:
+    """Time from ``FritzReader()`` to the first ``get_bandwidth`` result.
+
+    *cold* starts with an empty description cache (full SCPD crawl),
+    *warm* with the cache written by the cold run.  The pooled session is
+    discarded before every run to emulate a fresh process.
+    """
+    import fritzcache
+    from fritzreader import FritzReader
+    from fritztransport import SESSION_POOL
+
+    with MockFritzBox(rtt=args.rtt) as box, tempfile.TemporaryDirectory() as tmp:
+        fritzcache.CACHE_DIR = Path(tmp)
+        results = {"cold": [], "warm": []}
+        for mode in ("cold", "warm"):
+            for _ in range(args.runs):
+                if mode == "cold":
+                    for f in Path(tmp).glob("*.json"):
+                        f.unlink()
+                SESSION_POOL.discard(box.address, box.port, box.user, box.password)
+                box.reset_stats()
+                t0 = time.perf_counter()
+                reader = FritzReader(box.address, box.user, box.password, port=box.port)
+                if not reader.connect():
+                    raise SystemExit("connect() against the mock failed")
+                reader.get_bandwidth()
+                results[mode].append((time.perf_counter() - t0, box.stats["requests"]))
+
+        print(f"startup benchmark  (rtt={args.rtt * 1000:.0f} ms, {args.runs} runs)")
+        print(f"{'mode':<6} {'median ms':>10} {'requests':>9}")
+        for mode, runs in results.items():
+            print(f"{mode:<6} {_median_ms([r[0] for r in runs]):>10.1f} {runs[-1][1]:>9}")
+
+
+# ---------------------------------------------------------------------------
+# coldstart – fresh GUI process: first painted frame and first sample
+# ---------------------------------------------------------------------------
+
+# Runs in a fresh interpreter: starts the GUI like ``gui.main`` against the
+# mock and prints the milestones in seconds since the parent spawned it.
+_COLDSTART_CHILD = """
+import json, os, sys, time
+spawned = float(sys.argv[1])
+from pathlib import Path
+import config
+config.CONFIG_PATH = Path(sys.argv[2])
+import gui
+from PyQt5.QtCore import QEvent
+imported = time.time() - spawned
+result = {"import": imported}
+
+def event(self, e, _event=gui.FritzMain.event):
+    handled = _event(self, e)
+    if e.type() == QEvent.UpdateRequest and "paint" not in result:
+        result["paint"] = time.time() - spawned
+        result["modules"] = len(sys.modules)
+        result["fritzconnection"] = "fritzconnection" in sys.modules
+    return handled
+
+def handle(self, data, _handle=gui.FritzMain._handle_data_update):
+    _handle(self, data)
+    if data.get("rows") is not None and not data.get("backfill"):
+        result["sample"] = time.time() - spawned
+        print(json.dumps(result), flush=True)
+        self.worker.stop()
+        os._exit(0)
+
+gui.FritzMain.event = event
+gui.FritzMain._handle_data_update = handle
+gui.main()
+"""
+
+
+def bench_coldstart(args) -> None:
+    """Fresh GUI process: time to the first painted frame and the first sample.
+
+    Every run starts a new interpreter (``QT_QPA_PLATFORM=offscreen``) with
+    a config pointing at the mock, so the times include interpreter start,
+    imports, window construction and connecting.  *cold* starts without
+    the description cache file of the mock, *warm* with it.  The number of
+    loaded modules at the first frame – and whether fritzconnection is
+    among them – shows what the window waits for.
+    """
+    import json
+    import os
+    import subprocess
+    import sys
+
+    import fritzcache
+
+    here = Path(__file__).resolve().parent
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONPATH=str(here))
+    with MockFritzBox(rtt=args.rtt) as box, tempfile.TemporaryDirectory() as tmp:
+        config_path = Path(tmp) / "config.ini"
+        config_path.write_text(
+            f"[FRITZBOX]\naddress = {box.address}\nport = {box.port}\n"
+            f"username = {box.user}\npassword = {box.password}\n"
+            "[WINDOW]\nx = 100\ny = 100\nalways_on_top = no\n"
+            "[APP]\nrefresh_interval = 1\nhistory_store = none\n",
+            encoding="utf-8",
+        )
+        cache_file = fritzcache._cache_path(box.address, box.port)
+        results = {"cold": [], "warm": []}
+        try:
+            for mode in ("cold", "warm"):
+                for _ in range(args.runs):
+                    if mode == "cold":
+                        cache_file.unlink(missing_ok=True)
+                    spawned = time.time()
+                    out = subprocess.run(
+                        [sys.executable, "-c", _COLDSTART_CHILD, str(spawned), str(config_path)],
+                        cwd=here, env=env, capture_output=True, text=True, timeout=60,
+                    ).stdout
+                    line = next((l for l in out.splitlines() if l.startswith("{")), None)
+                    if line is None:
+                        raise SystemExit(f"GUI process produced no sample:\n{out}")
+                    results[mode].append(json.loads(line))
+        finally:
+            cache_file.unlink(missing_ok=True)
+
+    print(f"cold-start benchmark  (rtt={args.rtt * 1000:.0f} ms, {args.runs} runs, median ms)")
+    print(f"{'mode':<6} {'imports':>8} {'1st frame':>10} {'1st sample':>11}")
+    for mode, runs in results.items():
+        print(f"{mode:<6} {_median_ms([r['import'] for r in runs]):>8.0f} "
+              f"{_median_ms([r['paint'] for r in runs]):>10.0f} "
+              f"{_median_ms([r['sample'] for r in runs]):>11.0f}")
+    last = results["warm"][-1]
+    print(f"modules at 1st frame: {last['modules']}, "
+          f"fritzconnection loaded: {'yes' if last['fritzconnection'] else 'no'}")
+
+
+# ---------------------------------------------------------------------------
+# async – one sample from many routers, blocking vs. asyncio
+# ---------------------------------------------------------------------------
+
+def bench_async(args) -> None:
+    """Time to collect one sample from every router.
+
+    *blocking* polls the routers one after another with
+    :class:`~fritzreader.FritzReader` – what a single worker thread does.
+    *asyncio* polls them concurrently with
+    :class:`~fritzasync.AsyncFritzReader` on one event loop.
+    """
+    import asyncio
+    import contextlib
+
+    from fritzasync import AsyncFritzReader
+    from fritzreader import FritzReader
+
+    with contextlib.ExitStack() as stack:
+        boxes = [stack.enter_context(MockFritzBox(rtt=args.rtt)) for _ in range(args.routers)]
+
+        readers = [FritzReader(b.address, b.user, b.password, port=b.port) for b in boxes]
+        for reader in readers:
+            if not reader.connect():
+                raise SystemExit("connect() against the mock failed")
+        blocking = []
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            for reader in readers:
+                reader.get_bandwidth()
+            blocking.append(time.perf_counter() - t0)
+
+        async def run_async():
+            areaders = [AsyncFritzReader(b.address, b.user, b.password, port=b.port) for b in boxes]
+            if not all(await asyncio.gather(*(r.connect() for r in areaders))):
+                raise SystemExit("connect() against the mock failed")
+            durations = []
+            for _ in range(args.rounds):
+                t0 = time.perf_counter()
+                await asyncio.gather(*(r.get_bandwidth() for r in areaders))
+                durations.append(time.perf_counter() - t0)
+            await asyncio.gather(*(r.close() for r in areaders))
+            return durations
+
+        concurrent = asyncio.run(run_async())
+
+        print(f"async benchmark  (rtt={args.rtt * 1000:.0f} ms, {args.routers} routers, {args.rounds} rounds)")
+        print(f"{'mode':<9} {'median ms':>10}")
+        print(f"{'blocking':<9} {_median_ms(blocking):>10.1f}")
+        print(f"{'asyncio':<9} {_median_ms(concurrent):>10.1f}")
+        print(f"speed-up: {statistics.median(blocking) / statistics.median(concurrent):.1f}x")
+
+
+# ---------------------------------------------------------------------------
+# poll – multi-router polling core at the configured refresh interval
+# ---------------------------------------------------------------------------
+
+def bench_poll(args) -> None:
+    """Drive :class:`~fritzpoller.RouterPoller` like the worker's QTimer does.
+
+    All routers are connected first; then ticks are scheduled by a
+    :class:`~fritzscheduler.PollScheduler` (wall-clock aligned, duration
+    compensated) for *duration* seconds.  A tick is *missed* for a router
+    when its sample did not arrive before the next tick (or the tick was
+    skipped because the router was still busy).  ``jitter`` is the offset
+    of each tick from its grid boundary.
+    """
+    import contextlib
+    import threading
+
+    from config import RouterSettings
+    from fritzpoller import RouterPoller
+    from fritzscheduler import PollScheduler
+
+    with contextlib.ExitStack() as stack:
+        boxes = [stack.enter_context(MockFritzBox(rtt=args.rtt)) for _ in range(args.routers)]
+        routers = [
+            RouterSettings(f"box{i:02d}", b.address, b.user, b.password, b.port)
+            for i, b in enumerate(boxes)
+        ]
+
+        lock = threading.Lock()
+        connected = threading.Semaphore(0)
+        tick_started = [0.0]
+        latencies, arrivals = [], {}
+
+        def on_status(status):
+            if status["connected"]:
+                connected.release()
+
+        def on_sample(data):
+            now = time.perf_counter()
+            with lock:
+                if tick_started[0] and not data.get("error"):
+                    latencies.append(now - tick_started[0])
+                    arrivals[data["router"]] = arrivals.get(data["router"], 0) + 1
+
+        scheduler = PollScheduler(args.interval)
+        poller = RouterPoller(routers, on_status, on_sample, scheduler=scheduler)
+        t0 = time.perf_counter()
+        poller.start()
+        for _ in routers:
+            if not connected.acquire(timeout=30):
+                raise SystemExit("not all mock routers connected")
+        connect_s = time.perf_counter() - t0
+        time.sleep(0.2)  # let the first samples after connect arrive
+        base = {name: st["skipped"] for name, st in poller.stats().items()}
+
+        ticks = max(1, int(args.duration / scheduler.interval))
+        dispatch, offsets = [], []
+        for _ in range(ticks):
+            time.sleep(scheduler.delay_to_next())
+            with lock:
+                tick_started[0] = time.perf_counter()
+            wall = time.time()
+            boundary = scheduler.begin_tick(wall)
+            if boundary is not None:
+                offsets.append(wall - boundary)
+                poller.tick(boundary)
+            dispatch.append(time.perf_counter() - tick_started[0])
+        time.sleep(scheduler.delay_to_next())
+        poller.shutdown(wait=True)
+
+        stats = poller.stats()
+        expected = ticks * len(routers)
+        received = sum(arrivals.values())
+        skipped = sum(st["skipped"] - base[name] for name, st in stats.items())
+        errors = sum(st["errors"] for st in stats.values())
+        late = [x for x in latencies if x > args.interval]
+        latencies.sort()
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+        print(
+            f"poll benchmark  (rtt={args.rtt * 1000:.0f} ms, {len(routers)} routers, "
+            f"interval {args.interval:g} s, {ticks} ticks)"
+        )
+        print(f"connect all:        {connect_s * 1000:.0f} ms")
+        print(f"samples:            {received} / {expected} expected")
+        print(f"skipped (busy):     {skipped}")
+        print(f"late (> interval):  {len(late)}")
+        print(f"errors:             {errors}")
+        print(f"tick dispatch:      max {max(dispatch) * 1000:.1f} ms")
+        print(f"tick jitter:        max {max(offsets, default=0.0) * 1000:.1f} ms, late ticks {scheduler.late_ticks}")
+        print(f"tick → sample:      p50 {pct(0.5):.0f} ms, p99 {pct(0.99):.0f} ms, max {pct(1.0):.0f} ms")
+        print(f"missed ticks:       {expected - received + len(late)}")
+
+
+# ---------------------------------------------------------------------------
+# store – persistent sample store: append, reopen and range reads
+# ---------------------------------------------------------------------------
+
+def _traffic(rng, n: int) -> tuple:
+    """Synthetic 1 s rates (Mbit/s, 0.01 steps) of a mostly idle home line.
+
+    Background noise of a few hundred kbit/s plus downloads of 20–250 Mbit/s
+    starting about every half hour and lasting two minutes on average.
+    """
+    import numpy as np
+
+    dl = rng.exponential(0.15, n)
+    ul = rng.exponential(0.05, n)
+    starts = np.flatnonzero(rng.random(n) < 1 / 1800)
+    ends = np.minimum(starts + rng.exponential(120, len(starts)).astype(np.int64) + 1, n)
+    step = np.zeros(n + 1)
+    rates = rng.uniform(20, 250, len(starts))
+    np.add.at(step, starts, rates)
+    np.add.at(step, ends, -rates)
+    burst = np.cumsum(step[:n])
+    dl += burst * rng.uniform(0.9, 1.0, n)
+    ul += burst * 0.03 * rng.uniform(0.8, 1.0, n)
+    return np.round(dl, 2), np.round(ul, 2)
+
+
+def bench_store(args) -> None:
+    """Append and read cost of the history store (:mod:`fritzstore`).
+
+    Writes *samples* rows of synthetic traffic (:func:`_traffic`) at 1 s
+    spacing with a few milliseconds of jitter, ending now (bulk, like an
+    import), then measures the per-sample append latency of the live path, the time
+    to reopen the store and a one-day range read while another thread keeps
+    appending one sample every 10 ms.  The log backend also scans the whole
+    download column; the SQLite backend reads a day outside its in-memory
+    window instead (the path ad-hoc queries of old data take); the compact
+    backend decodes the last 30 days.
+    """
+    import threading
+
+    import numpy as np
+
+    from fritzstore import open_store
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = open_store(args.backend, tmp)
+        rng = np.random.default_rng(1)
+        t0 = time.time() - args.samples
+        chunk = 1_000_000
+        bulk_s = 0.0
+        for pos in range(0, args.samples, chunk):
+            n = min(chunk, args.samples - pos)
+            t = t0 + np.arange(pos, pos + n, dtype=np.float64) + rng.normal(0, 0.003, n)
+            dl, ul = _traffic(rng, n)
+            start = time.perf_counter()
+            store.append("bench", t, dl, ul)
+            store.flush()
+            bulk_s += time.perf_counter() - start
+
+        live = []
+        t_next = t0 + args.samples
+        for i in range(100_000):
+            a = time.perf_counter()
+            store.append("bench", t_next + i, 42.0, 4.2, "_get_bandwidth_addon_infos")
+            live.append(time.perf_counter() - a)
+        store.close()
+        size = sum(f.stat().st_size for f in Path(tmp).iterdir())
+
+        start = time.perf_counter()
+        store = open_store(args.backend, tmp)
+        store.read("bench", time.time() - 60)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        stop = threading.Event()
+
+        def writer() -> None:
+            while not stop.wait(0.01):
+                store.append("bench", time.time(), 42.0, 4.2)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            day_end = t0 + args.samples
+            reads = []
+            for _ in range(5):
+                start = time.perf_counter()
+                day = store.read("bench", day_end - 86_400, day_end)
+                reads.append((time.perf_counter() - start) * 1000)
+                store.flush()
+            if args.backend == "sqlite":
+                start = time.perf_counter()
+                old = store.read("bench", day_end - 3 * 86_400, day_end - 2 * 86_400)
+                old_ms = (time.perf_counter() - start) * 1000
+            elif args.backend == "compact":
+                start = time.perf_counter()
+                month = store.read("bench", day_end - 30 * 86_400, day_end)
+                month_ms = (time.perf_counter() - start) * 1000
+            else:
+                start = time.perf_counter()
+                mean_dl = float(store.read("bench")["dl"].mean())
+                scan_ms = (time.perf_counter() - start) * 1000
+        finally:
+            stop.set()
+            thread.join()
+            store.close()
+
+        live.sort()
+        print(f"store benchmark  ({args.backend}, {args.samples + len(live):,} samples, "
+              f"{size / 1e6:.0f} MB on disk, {size / (args.samples + len(live)):.2f} bytes/sample)")
+        print(f"bulk append:        {args.samples / bulk_s / 1e6:.2f} M samples/s")
+        print(
+            f"live append:        p50 {live[len(live) // 2] * 1e6:.1f} µs, "
+            f"p99 {live[int(len(live) * 0.99)] * 1e6:.1f} µs, max {live[-1] * 1e6:.0f} µs"
+        )
+        print(f"reopen:             {open_ms:.1f} ms")
+        print(f"read one day:       median {sorted(reads)[2]:.2f} ms, max {max(reads):.2f} ms "
+              f"({len(day):,} records, writer running)")
+        if args.backend == "sqlite":
+            print(f"read older day:     {old_ms:.0f} ms ({len(old):,} records, from the database)")
+        elif args.backend == "compact":
+            print(f"read 30 days:       {month_ms:.0f} ms ({len(month):,} records, decoded)")
+        else:
+            print(f"scan dl column:     {scan_ms:.0f} ms (mean {mean_dl:.1f})")
+
+
+# ---------------------------------------------------------------------------
+# plot – per-tick cost of the live graph update
+# ---------------------------------------------------------------------------
+
+def bench_plot(args) -> None:
+    """GUI-thread time per sample of the live graph, by history length.
+
+    Draws like :class:`gui.FritzMain` (offscreen, 1000 px wide: two curves,
+    two baselines, two fills) and feeds one new sample per tick into a full
+    history of *size* rows.  ``rebuild`` is the former pipeline – copy the
+    history, convert and negate it, decimate all of it and compute zero
+    baselines on every tick; ``incremental`` appends the sample to a
+    :class:`~fritzplot.PlotBuffer` and hands its views to ``setData()``.
+    Each tick includes the repaint.
+    """
+    import os
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    import numpy as np
+    import pyqtgraph as pg
+    from PyQt5.QtWidgets import QApplication
+
+    from fritzhistory import HistoryBuffer
+    from fritzplot import PlotBuffer, minmax_decimate
+
+    app = QApplication.instance() or QApplication([])
+    widget = pg.PlotWidget()
+    widget.resize(1080, 400)
+    widget.show()
+    curves = [pg.PlotCurveItem(pen=pg.mkPen(width=1)) for _ in range(4)]
+    for c in curves:
+        widget.addItem(c)
+    for c, zero in ((curves[0], curves[2]), (curves[1], curves[3])):
+        widget.addItem(pg.FillBetweenItem(c, zero, brush=pg.mkBrush(80, 80, 200, 80)))
+    widget.setXRange(0, 1)
+    widget.getViewBox().enableAutoRange(x=True)
+    app.processEvents()
+    columns = int(widget.getViewBox().width())
+
+    def rebuild(hist, plot):
+        t, dl, ul = hist.arrays()[:3]
+        x, dl_y, ul_y = t.astype(float), dl.astype(float), -ul.astype(float)
+        y_max = float(np.fmax.reduce(dl))
+        dl_x, dl_y = minmax_decimate(x, dl_y, columns)
+        ul_x, ul_y = minmax_decimate(x, ul_y, columns)
+        return (dl_x, dl_y, dl_y * 0), (ul_x, ul_y, ul_y * 0), y_max
+
+    def incremental(hist, plot):
+        x, dl_y, ul_y, base = plot.curves()
+        y_max = float(np.fmax.reduce(dl_y))
+        return (x, dl_y, base), (x, ul_y, base), y_max
+
+    print(f"plot benchmark  ({columns} px wide, median / p99 per tick in ms)")
+    print(f"{'points':>8} {'rebuild':>16} {'incremental':>16}")
+    rng = np.random.default_rng(1)
+    for size in args.sizes:
+        dl, ul = _traffic(rng, size + args.ticks)
+        t = time.time() - size + np.arange(size + args.ticks, dtype=np.float64)
+        row = []
+        for update in (rebuild, incremental):
+            hist = HistoryBuffer(size)
+            hist.extend(t[:size], dl[:size], ul[:size])
+            plot = PlotBuffer(size, columns)
+            plot.configure(columns, True)
+            plot.reset(t[:size], dl[:size], ul[:size])
+            ticks = []
+            for i in range(size, size + args.ticks):
+                start = time.perf_counter()
+                hist.append(t[i], dl[i], ul[i])
+                if update is incremental:
+                    plot.extend(t[i], dl[i], ul[i])
+                (dl_x, dl_y, dl_0), (ul_x, ul_y, ul_0), y_max = update(hist, plot)
+                curves[0].setData(dl_x, dl_y, connect="finite")
+                curves[1].setData(ul_x, ul_y, connect="finite")
+                curves[2].setData(dl_x, dl_0, connect="finite")
+                curves[3].setData(ul_x, ul_0, connect="finite")
+                widget.setYRange(-y_max, y_max)
+                widget.repaint()
+                ticks.append(time.perf_counter() - start)
+            ticks.sort()
+            row.append(f"{_median_ms(ticks):7.2f} / {ticks[int(len(ticks) * 0.99)] * 1000:6.2f}")
+        print(f"{size:>8,} {row[0]:>16} {row[1]:>16}")
+    widget.close()
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="FB Speed Monitor benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("transport", help="pooled vs. fresh HTTP transport")
+    p.add_argument("--rtt", type=float, default=0.02, help="artificial RTT in seconds")
+    p.add_argument("--samples", type=int, default=50)
+    p.set_defaults(func=bench_transport)
+
+    p = sub.add_parser("startup", help="time to first sample, cold vs. warm cache")
+    p.add_argument("--rtt", type=float, default=0.02, help="artificial RTT in seconds")
+    p.add_argument("--runs", type=int, default=5)
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("coldstart", help="fresh GUI process: first frame and first sample")
+    p.add_argument("--rtt", type=float, default=0.02, help="artificial RTT in seconds")
+    p.add_argument("--runs", type=int, default=5)
+    p.set_defaults(func=bench_coldstart)
+
+    p = sub.add_parser("async", help="many routers: blocking vs. asyncio reader")
+    p.add_argument("--rtt", type=float, default=0.05, help="artificial RTT in seconds")
+    p.add_argument("--routers", type=int, default=20)
+    p.add_argument("--rounds", type=int, default=10)
+    p.set_defaults(func=bench_async)
+
+    p = sub.add_parser("poll", help="multi-router polling at the refresh interval")
+    p.add_argument("--rtt", type=float, default=0.02, help="artificial RTT in seconds")
+    p.add_argument("--routers", type=int, default=50)
+    p.add_argument("--interval", type=float, default=2.0, help="refresh interval in seconds")
+    p.add_argument("--duration", type=float, default=20.0, help="measured period in seconds")
+    p.set_defaults(func=bench_poll)
+
+    p = sub.add_parser("store", help="persistent sample store: append and read")
+    p.add_argument("--backend", choices=("log", "sqlite", "compact"), default="log")
+    p.add_argument("--samples", type=int, default=10_000_000, help="rows written before measuring")
+    p.set_defaults(func=bench_store)
+
+    p = sub.add_parser("plot", help="live graph: per-tick cost by history length")
+    p.add_argument("--sizes", type=lambda s: [int(n) for n in s.split(",")],
+                   default=[360, 10_000, 100_000], help="comma-separated history lengths")
+    p.add_argument("--ticks", type=int, default=200, help="samples appended per size")
+    p.set_defaults(func=bench_plot)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,24 @@ getter methods.  The underlying :class:`configparser.ConfigParser` instance
 is kept as a public attribute (``self.config``) so that other modules can
 write to it directly when saving settings.
 
+Settings snapshot
+-----------------
+:attr:`Config.settings` holds the ``[APP]`` / ``[WINDOW]`` settings as an
+immutable :class:`AppSettings` with enums (:class:`UploadMode`,
+:class:`YAxisScaling`, :class:`CurveStyle`, :class:`Background`) instead of
+the display strings of the file.  It is built from the getters once and
+rebuilt only by :meth:`Config.reload` and :meth:`Config.save`, so code that
+runs per sample reads plain attributes instead of parsing the INI values
+again.  When a rebuild changes it, the callbacks registered with
+:meth:`Config.add_listener` get the new snapshot.
+
 Config file sections
 --------------------
 ``[FRITZBOX]``
     Connection credentials for the router.
+``[FRITZBOX:<name>]``
+    Optional, one section per router when several routers are monitored.
+    Missing ``username`` / ``password`` keys are taken from ``[FRITZBOX]``.
 ``[WINDOW]``
     Last known window position and *always-on-top* flag.
 ``[APP]``
@@ -19,11 +33,138 @@ Config file sections
 """
 
 import configparser
+from dataclasses import dataclass
+from enum import Enum
 from pathlib import Path
 
 #: Absolute path to the INI file, located next to this module.
 CONFIG_PATH = Path(__file__).resolve().parent / "config.ini"
 
+#: Section name prefix of per-router sections (``[FRITZBOX:<name>]``).
+ROUTER_SECTION_PREFIX = "FRITZBOX:"
+
+#: Router name used for the plain ``[FRITZBOX]`` section.
+DEFAULT_ROUTER = "FRITZ!Box"
+
+
+@dataclass(frozen=True)
+class RouterSettings:
+    """Connection settings of one monitored router.
+
+    Attributes
+    ----------
+    name : str
+        Display name and key of the router (``<name>`` of the section).
+    address : str
+        IP address or hostname.
+    username : str
+        Login name (may be empty).
+    password : str
+        Router password.
+    port : int | None
+        TR-064 port; ``None`` uses the default (49000).
+    """
+
+    name: str
+    address: str
+    username: str = ""
+    password: str = ""
+    port: int | None = None
+
+
+class UploadMode(Enum):
+    """Upload display mode (``[APP] ulmode``); values are the file strings."""
+
+    OVERLAY = "Überlagert"
+    MIRROR = "Spiegeln unter 0"
+
+    @classmethod
+    def _missing_(cls, value):
+        return cls.MIRROR if str(value).startswith("Spiegel") else cls.OVERLAY
+
+
+class YAxisScaling(Enum):
+    """Upper bound of the Y axis (``[APP] yaxis_scaling``)."""
+
+    #: Line capacity reported by the router (or the peak, if higher).
+    LINK_CAPACITY = "An Leitungskapazität anpassen"
+    #: Peak of the shown history.
+    PEAK = "Dynamisch an Spitzenwert"
+
+    @classmethod
+    def _missing_(cls, value):
+        return cls.LINK_CAPACITY if str(value).startswith("An Leitungs") else cls.PEAK
+
+
+class CurveStyle(Enum):
+    """Curve rendering style (``[APP] style``)."""
+
+    NEON_LINES = "Neon-Lines"
+    FILLED = "Gefüllte Flächen"
+
+    @classmethod
+    def _missing_(cls, value):
+        return cls.FILLED if str(value).startswith("Gefüllte") else cls.NEON_LINES
+
+
+class Background(Enum):
+    """Plot background (``[APP] bg``)."""
+
+    BLACK = "schwarz"
+    WHITE = "weiss"
+
+    @classmethod
+    def _missing_(cls, value):
+        return cls.WHITE
+
+
+@dataclass(frozen=True)
+class AppSettings:
+    """Immutable snapshot of the ``[APP]`` and ``[WINDOW]`` settings.
+
+    Built by :class:`Config` from its getters (same names and fallbacks,
+    see there); see :attr:`Config.settings`.  Unknown display strings in
+    the file map to the enum member the GUI used to fall back to (e.g.
+    anything not starting with ``"Spiegel"`` is :attr:`UploadMode.OVERLAY`).
+
+    Attributes
+    ----------
+    refresh_interval : int
+        Polling interval in seconds.
+    history_store : str
+        ``"log"``, ``"sqlite"``, ``"compact"`` or ``"none"``.
+    retention_days : float
+        Age after which stored samples are deleted (``0`` = never).
+    smoothing : bool
+        PChip curve smoothing.
+    yaxis_scaling, bg, style, ulmode
+        Display settings as enums.
+    """
+
+    always_on_top: bool
+    refresh_interval: int
+    adaptive_polling: bool
+    history_store: str
+    retention_days: float
+    smoothing: bool
+    yaxis_scaling: YAxisScaling
+    animation: bool
+    bg: Background
+    style: CurveStyle
+    ulmode: UploadMode
+
+
+def _port(value, section: str) -> int | None:
+    # Like the other getters, a bad value falls back (default TR-064 port)
+    # instead of failing the connect in the worker.
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        print(f"[Config] Invalid port {value!r} in [{section}], using the default.")
+        return None
+
 
 class Config:
     """Thin wrapper around :class:`configparser.ConfigParser`.
@@ -44,6 +185,45 @@ class Config:
         if not CONFIG_PATH.exists():
             raise FileNotFoundError(f"config.ini not found at: {CONFIG_PATH}")
         self.config.read(str(CONFIG_PATH), encoding="utf-8")
+        #: Current :class:`AppSettings`; replaced (never modified) by
+        #: :meth:`reload` and :meth:`save`.
+        self.settings = self._build_settings()
+        self._listeners = []
+
+    def _build_settings(self) -> AppSettings:
+        return AppSettings(
+            always_on_top=self.get_always_on_top(),
+            refresh_interval=self.get_refresh_interval(),
+            adaptive_polling=self.get_adaptive_polling(),
+            history_store=self.get_history_store(),
+            retention_days=self.get_retention_days(),
+            smoothing=self.get_smoothing_enabled(),
+            yaxis_scaling=YAxisScaling(self.get_yaxis_scaling_mode()),
+            animation=self.get_animation_enabled(),
+            bg=Background(self.get_bg()),
+            style=CurveStyle(self.get_style()),
+            ulmode=UploadMode(self.get_ulmode()),
+        )
+
+    def _refresh_settings(self) -> None:
+        settings = self._build_settings()
+        if settings == self.settings:
+            return
+        self.settings = settings
+        for callback in list(self._listeners):
+            callback(settings)
+
+    def add_listener(self, callback) -> None:
+        """Call ``callback(settings)`` whenever :attr:`settings` changes.
+
+        Listeners run in the thread that calls :meth:`reload` or
+        :meth:`save`.  In this application only the GUI thread does: the
+        worker thread reads the configuration but never writes it (an
+        address picked in the discovery dialog is saved by the GUI before
+        it is handed to the worker), so :attr:`config` is never written
+        concurrently and listeners may touch widgets.
+        """
+        self._listeners.append(callback)
 
     # ------------------------------------------------------------------
     # File I/O
@@ -52,10 +232,28 @@ class Config:
     def reload(self) -> None:
         """Re-read the INI file from disk.
 
-        Called after the settings dialog saves new values so that the
-        in-memory state stays consistent with the file.
+        Picks up manual edits of the file; :attr:`settings` is rebuilt and
+        the listeners are notified if it changed.
         """
         self.config.read(str(CONFIG_PATH), encoding="utf-8")
+        self._refresh_settings()
+
+    def save(self) -> None:
+        """Write :attr:`config` to the INI file and rebuild :attr:`settings`.
+
+        Called after values were changed in :attr:`config`, e.g. by the
+        settings dialog; the listeners are notified if :attr:`settings`
+        changed.
+
+        Raises
+        ------
+        OSError
+            When the file cannot be written; :attr:`settings` is then
+            left unchanged.
+        """
+        with CONFIG_PATH.open("w", encoding="utf-8") as f:
+            self.config.write(f)
+        self._refresh_settings()
 
     # ------------------------------------------------------------------
     # [FRITZBOX] section
@@ -73,6 +271,46 @@ class Config:
         section = self.config["FRITZBOX"]
         return section.get("address"), section.get("username"), section.get("password")
 
+    def get_routers(self) -> list:
+        """Return the settings of all routers to monitor.
+
+        Every ``[FRITZBOX:<name>]`` section with an ``address`` defines one
+        router; ``username`` and ``password`` default to the values of
+        ``[FRITZBOX]``, so a fleet sharing one login only needs the
+        address per section.  Without such sections the single
+        ``[FRITZBOX]`` section is returned as router :data:`DEFAULT_ROUTER`.
+
+        Returns
+        -------
+        list[RouterSettings]
+            In file order; empty when no address is configured at all.
+        """
+        base = self.config["FRITZBOX"] if self.config.has_section("FRITZBOX") else {}
+        routers = []
+        for section_name in self.config.sections():
+            if not section_name.startswith(ROUTER_SECTION_PREFIX):
+                continue
+            section = self.config[section_name]
+            name = section_name[len(ROUTER_SECTION_PREFIX):].strip()
+            if not name or not section.get("address"):
+                continue
+            routers.append(RouterSettings(
+                name=name,
+                address=section.get("address"),
+                username=section.get("username", base.get("username", "")) or "",
+                password=section.get("password", base.get("password", "")) or "",
+                port=_port(section.get("port"), section_name),
+            ))
+        if not routers and base.get("address"):
+            routers.append(RouterSettings(
+                name=DEFAULT_ROUTER,
+                address=base.get("address"),
+                username=base.get("username", "") or "",
+                password=base.get("password", "") or "",
+                port=_port(base.get("port"), "FRITZBOX"),
+            ))
+        return routers
+
     # ------------------------------------------------------------------
     # [WINDOW] section
     # ------------------------------------------------------------------
@@ -94,11 +332,41 @@ class Config:
         """Return the polling interval in **seconds** (default: 2)."""
         return int(self.config.get("APP", "refresh_interval", fallback=2))
 
+    def get_adaptive_polling(self) -> bool:
+        """Return ``True`` when the polling rate follows the traffic.
+
+        Bursting routers are then polled twice as often, idle ones a
+        quarter as often (see :mod:`fritzscheduler`).  Default: off.
+        """
+        return self.config.getboolean("APP", "adaptive_polling", fallback=False)
+
+    def get_history_store(self) -> str:
+        """Return the persistent history backend: ``"log"``, ``"sqlite"``, ``"compact"`` or ``"none"``.
+
+        ``"log"`` writes every sample to the append-only files of
+        :mod:`fritzstore`, ``"sqlite"`` to its SQLite database,
+        ``"compact"`` to the encoded block files of :mod:`fritzblocks`;
+        ``"none"`` keeps history in memory only.
+        """
+        store = self.config.get("APP", "history_store", fallback="log").strip().lower()
+        return store if store in ("log", "sqlite", "compact", "none") else "log"
+
+    def get_retention_days(self) -> float:
+        """Return the age in days after which stored samples are deleted.
+
+        Applies to ``history_store = sqlite``; ``0`` keeps samples forever.
+        Default: 90.
+        """
+        try:
+            days = self.config.getfloat("APP", "retention_days", fallback=90.0)
+        except ValueError:
+            return 90.0
+        return max(days, 0.0)
+
     def get_smoothing_enabled(self) -> bool:
         """Return ``True`` when PChip curve smoothing is active.
 
-        Smoothing requires ``scipy`` to be installed.  The settings dialog
-        disables the checkbox automatically when scipy is unavailable.
+        Smoothing is built in (:func:`fritzplot.smooth`, NumPy only).
         """
         return self.config.getboolean("APP", "smoothing", fallback=False)
 
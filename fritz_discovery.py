@@ -14,9 +14,10 @@ Discovery strategy
    (``192.168.178.1``, ``fritz.box`` …) is probed sequentially after the
    multicast phase.  Addresses already found via SSDP are skipped.
 
-For each candidate IP, a short :class:`fritzconnection.FritzConnection` is
-attempted (no credentials required for device-description retrieval).
-Successful connections are enriched with model-specific metadata from the
+For each candidate IP, only the root description ``tr64desc.xml`` is fetched
+via :func:`fritzcache.fetch_root_description` (one unauthenticated request –
+no full service-description crawl, no credentials required).  Successful
+probes are enriched with model-specific metadata from the
 built-in :data:`MODEL_DB` lookup table and returned as :class:`DeviceInfo`
 dataclass instances.
 
@@ -191,10 +192,10 @@ def _ssdp_search(timeout: float = 2.5) -> List[str]:
 
 
 def _try_connect(ip: str, timeout: float = 5.0) -> Optional[DeviceInfo]:
-    """Attempt a credential-free :class:`fritzconnection.FritzConnection`.
+    """Probe *ip* for a TR-064 root description.
 
-    Only the device-description endpoint (``/igddesc.xml``) is fetched,
-    which does not require authentication.  If the connection succeeds the
+    Only the device-description endpoint (``/tr64desc.xml``) is fetched,
+    which does not require authentication.  If the request succeeds the
     model name is looked up in :data:`MODEL_DB` and a :class:`DeviceInfo`
     is returned.
 
@@ -212,9 +213,9 @@ def _try_connect(ip: str, timeout: float = 5.0) -> Optional[DeviceInfo]:
         Populated dataclass on success, ``None`` on any exception.
     """
     try:
-        from fritzconnection import FritzConnection
-        fc = FritzConnection(address=ip, timeout=timeout)
-        modelname = fc.modelname or "FRITZ!Box"
+        from fritzcache import fetch_root_description
+        description = fetch_root_description(ip, timeout=timeout)
+        modelname = description.device_model_name or "FRITZ!Box"
         tech, features = _get_model_caps(modelname)
         return DeviceInfo(ip=ip, model=modelname, tech=tech, features=features)
     except Exception:
@@ -0,0 +1,615 @@
+"""
+fritzasync.py
+=============
+Asyncio-native TR-064 client and :class:`AsyncFritzReader`.
+
+Why
+---
+:class:`~fritzreader.FritzReader` talks to the router through fritzconnection
+and ``requests``, i.e. with blocking sockets.  One slow call therefore stalls
+its thread, and polling several routers needs one OS thread per router.  This
+module provides an optional backend that runs entirely on an asyncio event
+loop: any number of requests – to one or to many routers – can be in flight
+at the same time, each with its own deadline.
+
+Scope
+-----
+:class:`AsyncTR064Client` is deliberately small.  It implements exactly what
+the monitor needs:
+
+* reading the two root descriptions (``igddesc.xml``, ``tr64desc.xml``) to
+  map service names to control URLs – the SCPD files are not needed because
+  argument names are known and values are converted heuristically,
+* SOAP calls over HTTP/1.1 keep-alive connections (at most
+  :data:`MAX_CONNECTIONS` per router) with HTTP digest authentication that
+  re-uses the server nonce, and
+* a deadline per call (:func:`asyncio.wait_for`); a call that runs out of
+  time closes its connection instead of returning it to the pool.
+
+The actions used are ``GetAddonInfos``, ``X_AVM-DE_GetOnlineMonitor``,
+``GetTotalBytesReceived`` / ``GetTotalBytesSent``,
+``GetCommonLinkProperties`` (all ``WANCommonIFC1``) and ``GetInfo``
+(``WANPPPConnection1``), but :meth:`AsyncTR064Client.call_action` accepts any
+service / action found in the descriptions.
+
+:class:`AsyncFritzReader` is a :class:`~fritzreader.FritzReader` whose I/O
+methods are coroutines.  Method selection, byte counters, plausibility filter,
+history and maxima are inherited unchanged, so both readers behave the same.
+
+Usage::
+
+    reader = AsyncFritzReader("192.168.178.1", "user", "password")
+    if await reader.connect():
+        dl, ul = await reader.get_bandwidth()
+
+    # many routers, one thread:
+    samples = await asyncio.gather(*(r.get_bandwidth() for r in readers))
+"""
+
+import asyncio
+import hashlib
+import re
+import secrets
+import time
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from fritzconnection.core.processor import Description
+from fritzconnection.core.utils import get_xml_root
+
+from fritzcache import DEFAULT_PORT
+from fritzreader import FritzReader
+
+#: Default deadline of a single SOAP call in seconds.
+DEFAULT_CALL_TIMEOUT = 5.0
+
+#: Maximum number of simultaneously open keep-alive connections per router
+#: (same as :data:`fritztransport.POOL_MAXSIZE`).
+MAX_CONNECTIONS = 4
+
+_SOAP_ENVELOPE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<s:Envelope s:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/" '
+    'xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">'
+    "<s:Body><u:{action} xmlns:u=\"{service_type}\">{arguments}</u:{action}></s:Body>"
+    "</s:Envelope>"
+)
+
+_CHALLENGE_FIELD = re.compile(r'(\w+)=(?:"([^"]*)"|([^,\s]*))')
+_INTEGER = re.compile(r"0|-?[1-9]\d*")
+
+
+class TR064Error(Exception):
+    """SOAP fault or unexpected HTTP response from the router.
+
+    Attributes
+    ----------
+    status : int
+        HTTP status code (``0`` when not applicable).
+    code : str
+        UPnP error code from a SOAP fault, or ``""``.
+    """
+
+    def __init__(self, message: str, status: int = 0, code: str = "") -> None:
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+def _md5(text: str) -> str:
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _convert(text):
+    """Return integer-looking SOAP values as ``int``, everything else as ``str``."""
+    if text is None:
+        return ""
+    return int(text) if _INTEGER.fullmatch(text) else text
+
+
+class AsyncTR064Client:
+    """Minimal asyncio TR-064 / SOAP client for one router.
+
+    Parameters
+    ----------
+    address : str
+        IP address or hostname, with or without ``http://`` prefix.
+    port : int | None
+        TR-064 port, default 49000.
+    user, password : str
+        Digest credentials; an empty *password* sends no authorisation.
+    timeout : float
+        Default deadline per call in seconds.
+    max_connections : int
+        Upper bound of concurrently open connections to the router.
+
+    Attributes
+    ----------
+    address : str
+        ``http://<host>`` – same form as ``FritzConnection.address``.
+    modelname : str | None
+        Model name from the device description (set by :meth:`open`).
+    services : dict[str, tuple[str, str]]
+        Service name → ``(serviceType, controlURL)``.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        port: int | None = None,
+        user: str = "",
+        password: str = "",
+        timeout: float = DEFAULT_CALL_TIMEOUT,
+        max_connections: int = MAX_CONNECTIONS,
+    ) -> None:
+        self.host = address.split("//")[-1]
+        self.address = f"http://{self.host}"
+        self.port = port or DEFAULT_PORT
+        self.user = user or ""
+        self.password = password or ""
+        self.timeout = timeout
+        self.modelname = None
+        self.system_info = None
+        self.services: dict = {}
+
+        self._idle: list = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self._challenge: dict | None = None
+        self._nc = 0
+        self._requests = 0
+        self._connections = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def open(self, timeout: float | None = None) -> None:
+        """Read both root descriptions and build :attr:`services`.
+
+        ``igddesc.xml`` and ``tr64desc.xml`` are fetched concurrently;
+        only ``tr64desc.xml`` is mandatory.
+
+        Raises
+        ------
+        TR064Error, OSError, asyncio.TimeoutError
+            When ``tr64desc.xml`` cannot be read.
+        """
+        igd, tr64 = await asyncio.wait_for(
+            asyncio.gather(
+                self._fetch_description("/igddesc.xml"),
+                self._fetch_description("/tr64desc.xml"),
+                return_exceptions=True,
+            ),
+            timeout or self.timeout,
+        )
+        if isinstance(tr64, BaseException):
+            raise tr64
+        services = {}
+        for description in (igd, tr64):
+            if isinstance(description, Description):
+                for name, service in description.services.items():
+                    services[name] = (service.serviceType, service.controlURL)
+        self.services = services
+        self.system_info = tr64.system_info
+        self.modelname = (
+            igd.device_model_name if isinstance(igd, Description) and igd.device_model_name
+            else tr64.device_model_name
+        )
+
+    async def call_action(
+        self, service_name: str, action_name: str, *, timeout: float | None = None, **arguments
+    ) -> dict:
+        """Execute one SOAP action and return its output arguments.
+
+        Parameters
+        ----------
+        service_name : str
+            Service name as in the descriptions, e.g. ``"WANCommonIFC1"``.
+        action_name : str
+            Action name, e.g. ``"GetAddonInfos"``.
+        timeout : float | None
+            Deadline for the whole call including a digest retry; default
+            :attr:`timeout`.
+        **arguments
+            Input arguments of the action.
+
+        Returns
+        -------
+        dict
+            Output argument name → value (``int`` for integer values).
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            When the deadline passed.
+        TR064Error
+            For unknown services, SOAP faults and authorisation failures.
+        """
+        return await asyncio.wait_for(
+            self._call(service_name, action_name, arguments), timeout or self.timeout
+        )
+
+    def transport_stats(self) -> dict:
+        """Return connection re-use statistics.
+
+        Same keys as :meth:`fritztransport.SessionPool.stats`.
+        """
+        reused = max(self._requests - self._connections, 0)
+        return {
+            "requests": self._requests,
+            "connections": self._connections,
+            "reused": reused,
+            "reuse_ratio": reused / self._requests if self._requests else 0.0,
+            "session_reuses": 0,
+        }
+
+    async def close(self) -> None:
+        """Close all idle keep-alive connections."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------
+    # SOAP
+    # ------------------------------------------------------------------
+
+    async def _call(self, service_name: str, action_name: str, arguments: dict) -> dict:
+        try:
+            service_type, control_url = self.services[service_name]
+        except KeyError:
+            raise TR064Error(f"Unknown service '{service_name}'") from None
+        body = _SOAP_ENVELOPE.format(
+            action=action_name,
+            service_type=service_type,
+            arguments="".join(f"<{k}>{escape(str(v))}</{k}>" for k, v in arguments.items()),
+        ).encode("utf-8")
+        headers = {
+            "Content-Type": 'text/xml; charset="utf-8"',
+            "SOAPACTION": f'"{service_type}#{action_name}"',
+        }
+
+        for _ in range(2):
+            if self._challenge and self.password:
+                headers["Authorization"] = self._authorization("POST", control_url)
+            status, resp_headers, data = await self._request("POST", control_url, body, headers)
+            if status != 401 or not self.password:
+                break
+            challenge = resp_headers.get("www-authenticate", "")
+            if not challenge.lower().startswith("digest"):
+                break
+            # First call or stale nonce: take the new challenge and retry once.
+            self._challenge = {m[0].lower(): m[1] or m[2] for m in _CHALLENGE_FIELD.findall(challenge)}
+            self._nc = 0
+
+        if status == 401:
+            raise TR064Error(f"{action_name}: authorisation failed", status)
+        if status != 200:
+            raise self._fault(action_name, status, data)
+        try:
+            root = ElementTree.fromstring(data)
+        except ElementTree.ParseError as e:
+            raise TR064Error(f"{action_name}: malformed response ({e})", status) from None
+        for element in root.iter():
+            if _local_name(element.tag) == f"{action_name}Response":
+                return {_local_name(child.tag): _convert(child.text) for child in element}
+        raise TR064Error(f"{action_name}: response element missing", status)
+
+    @staticmethod
+    def _fault(action_name: str, status: int, data: bytes) -> TR064Error:
+        """Build a :class:`TR064Error` from a SOAP fault body."""
+        code = description = ""
+        try:
+            for element in ElementTree.fromstring(data).iter():
+                name = _local_name(element.tag)
+                if name == "errorCode":
+                    code = element.text or ""
+                elif name == "errorDescription":
+                    description = element.text or ""
+        except ElementTree.ParseError:
+            pass
+        detail = f"UPnP error {code}: {description}" if code else f"HTTP {status}"
+        return TR064Error(f"{action_name}: {detail}", status, code)
+
+    def _authorization(self, method: str, uri: str) -> str:
+        """Return a digest ``Authorization`` header for the stored challenge."""
+        c = self._challenge
+        self._nc += 1
+        realm, nonce = c.get("realm", ""), c.get("nonce", "")
+        ha1 = _md5(f"{self.user}:{realm}:{self.password}")
+        ha2 = _md5(f"{method}:{uri}")
+        header = (
+            f'Digest username="{self.user}", realm="{realm}", nonce="{nonce}", '
+            f'uri="{uri}", algorithm=MD5'
+        )
+        if "auth" in c.get("qop", "").split(","):
+            nc = f"{self._nc:08x}"
+            cnonce = secrets.token_hex(8)
+            response = _md5(f"{ha1}:{nonce}:{nc}:{cnonce}:auth:{ha2}")
+            header += f', qop="auth", nc={nc}, cnonce="{cnonce}"'
+        else:
+            response = _md5(f"{ha1}:{nonce}:{ha2}")
+        header += f', response="{response}"'
+        if c.get("opaque"):
+            header += f', opaque="{c["opaque"]}"'
+        return header
+
+    async def _fetch_description(self, path: str) -> Description:
+        status, _, data = await self._request("GET", path)
+        if status != 200:
+            raise TR064Error(f"{path}: HTTP {status}", status)
+        return Description(get_xml_root(data.decode("utf-8")))
+
+    # ------------------------------------------------------------------
+    # HTTP/1.1 keep-alive transport
+    # ------------------------------------------------------------------
+
+    async def _request(self, method: str, path: str, body: bytes = b"", headers=None) -> tuple:
+        """Send one request and return ``(status, headers, body)``.
+
+        Uses an idle keep-alive connection when available.  When such a
+        connection turns out to be closed by the router, the request is
+        repeated once on a new connection.
+        """
+        async with self._slots:
+            for attempt in range(2):
+                reused = bool(self._idle)
+                if reused:
+                    reader, writer = self._idle.pop()
+                else:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                    self._connections += 1
+                try:
+                    self._requests += 1
+                    status, resp_headers, data = await self._roundtrip(
+                        reader, writer, method, path, body, headers or {}
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    # Timeout / cancellation mid-response: the connection is
+                    # in an unknown state and must not go back to the pool.
+                    writer.close()
+                    raise
+                if resp_headers.get("connection", "").lower() == "close":
+                    writer.close()
+                else:
+                    self._idle.append((reader, writer))
+                return status, resp_headers, data
+
+    async def _roundtrip(self, reader, writer, method, path, body, headers) -> tuple:
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            f"Content-Length: {len(body)}",
+        ]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by router")
+        status = int(status_line.split()[1])
+        resp_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            resp_headers[key.strip().lower()] = value.strip()
+
+        if "chunked" in resp_headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            data = b"".join(chunks)
+        elif "content-length" in resp_headers:
+            data = await reader.readexactly(int(resp_headers["content-length"]))
+        else:
+            data = await reader.read()
+            resp_headers["connection"] = "close"
+        return status, resp_headers, data
+
+
+class AsyncFritzReader(FritzReader):
+    """:class:`~fritzreader.FritzReader` with coroutine-based I/O.
+
+    Constructor arguments, attributes and the synchronous accessors
+    (:meth:`get_history`, :meth:`get_maxima`, :meth:`get_method_stats`, …)
+    are inherited.  :meth:`connect`, :meth:`get_bandwidth`,
+    :meth:`get_recent_samples`, :meth:`get_ip_addresses` and
+    :meth:`get_detailed_info` are coroutines with the same results as their
+    blocking counterparts.
+
+    Attributes
+    ----------
+    call_timeout : float
+        Deadline of each SOAP call in seconds.
+    """
+
+    def __init__(self, *args, call_timeout: float = DEFAULT_CALL_TIMEOUT, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.call_timeout = call_timeout
+        #: Active :class:`AsyncTR064Client` or ``None``.
+        self.fc: AsyncTR064Client | None = None
+
+    # ------------------------------------------------------------------
+    # Connection lifecycle
+    # ------------------------------------------------------------------
+
+    async def connect(self) -> bool:
+        """Read the router's service list and fetch line properties.
+
+        On reconnect the existing client – and with it its open
+        keep-alive connections and digest nonce – is re-used.
+
+        Returns
+        -------
+        bool
+            ``True`` on success, ``False`` when any exception occurs.
+        """
+        t0 = time.perf_counter()
+        self._reset_counters()
+        client = self.fc or AsyncTR064Client(
+            self.address, self.port, self.username, self.password, timeout=self.call_timeout
+        )
+        try:
+            # Description download of a cold start may be slow (VPN) –
+            # same generous limit as the blocking reader.
+            await client.open(timeout=12.0)
+            self.fc = client
+            await self._fetch_link_properties()
+            self.connect_duration = time.perf_counter() - t0
+            print(
+                f"[FritzReader] Connected to {client.modelname} at {client.address} "
+                f"in {self.connect_duration:.2f} s (asyncio)"
+            )
+            return True
+        except Exception as e:
+            print(f"[FritzReader] Connection error: {e!r}")
+            return False
+
+    async def close(self) -> None:
+        """Close the keep-alive connections of the client."""
+        if self.fc:
+            await self.fc.close()
+
+    async def _call(self, service_name: str, action_name: str) -> dict:
+        return await self.fc.call_action(service_name, action_name, timeout=self.call_timeout)
+
+    # ------------------------------------------------------------------
+    # Bandwidth measurement
+    # ------------------------------------------------------------------
+
+    async def get_bandwidth(self) -> tuple:
+        """Coroutine version of :meth:`FritzReader.get_bandwidth`."""
+        if not self.fc:
+            return self._disconnected_sample()
+        plan = self._method_plan()
+        try:
+            method = next(plan)
+            while True:
+                method = plan.send(await self._call_method(method))
+        except StopIteration as stop:
+            return self._finish_sample(stop.value)
+
+    async def _call_method(self, method):
+        t0 = time.perf_counter()
+        try:
+            result = await method()
+        except Exception as e:
+            return self._record_call(method, None, time.perf_counter() - t0, e)
+        return self._record_call(method, result, time.perf_counter() - t0)
+
+    async def _get_bandwidth_addon_infos(self) -> tuple:
+        return self._rates_from_addon_infos(await self._call("WANCommonIFC1", "GetAddonInfos"))
+
+    async def _get_bandwidth_traffic_stats(self) -> tuple:
+        return self._rates_from_online_monitor(
+            await self._call("WANCommonIFC1", "X_AVM-DE_GetOnlineMonitor")
+        )
+
+    async def _get_bandwidth_total_bytes(self) -> tuple:
+        if self._addon_counters:
+            t0 = time.monotonic()
+            status = await self._call("WANCommonIFC1", "GetAddonInfos")
+            result = self._rates_from_addon_counters(status, (t0 + time.monotonic()) / 2)
+            if result is not None:
+                return result
+
+        async def timed(action):
+            t0 = time.monotonic()
+            status = await self._call("WANCommonIFC1", action)
+            return status, (t0 + time.monotonic()) / 2
+
+        # Both counters are requested concurrently; each keeps its own midpoint.
+        (status_rx, t_rx), (status_tx, t_tx) = await asyncio.gather(
+            timed("GetTotalBytesReceived"), timed("GetTotalBytesSent")
+        )
+        return self._rates_from_total_bytes(status_rx, t_rx, status_tx, t_tx)
+
+    async def _fetch_link_properties(self) -> None:
+        try:
+            self._apply_link_properties(await self._call("WANCommonIFC1", "GetCommonLinkProperties"))
+        except Exception as e:
+            self._apply_link_properties(None, e)
+
+    # ------------------------------------------------------------------
+    # Accessors
+    # ------------------------------------------------------------------
+
+    def get_transport_stats(self) -> dict:
+        """Return :meth:`AsyncTR064Client.transport_stats` (``{}`` when not connected)."""
+        return self.fc.transport_stats() if self.fc else {}
+
+    async def get_recent_samples(self) -> tuple:
+        """Coroutine version of :meth:`FritzReader.get_recent_samples`."""
+        if not self.fc:
+            return [], [], []
+        try:
+            status = await self._call("WANCommonIFC1", "X_AVM-DE_GetOnlineMonitor")
+            return self._history_from_online_monitor(status, time.time())
+        except Exception as e:
+            print(f"[FritzReader] Online monitor history unavailable: {e!r}")
+            return [], [], []
+
+    async def get_ip_addresses(self) -> tuple:
+        """Coroutine version of :meth:`FritzReader.get_ip_addresses`."""
+        try:
+            status = await self._call("WANPPPConnection1", "GetInfo")
+            return self.fc.address, status.get("NewExternalIPAddress", "N/A")
+        except Exception as e:
+            print(f"[FritzReader] IP address query failed: {e!r}")
+            return (self.fc.address if self.fc else "N/A"), f"Error: {e.__class__.__name__}"
+
+    async def get_detailed_info(self) -> str:
+        """Coroutine version of :meth:`FritzReader.get_detailed_info`.
+
+        Without SCPD files the action list of a service is unknown, so
+        instead of scanning all WAN services this reports the results of
+        the actions the reader uses, queried concurrently.
+        """
+        if not self.fc:
+            return "Not connected"
+        info = self._detail_header()
+        info.append("\n──────────────────────────────────────")
+        calls = [
+            ("WANCommonIFC1", "GetCommonLinkProperties"),
+            ("WANCommonIFC1", "GetAddonInfos"),
+            ("WANCommonIFC1", "X_AVM-DE_GetOnlineMonitor"),
+            ("WANCommonIFC1", "GetTotalBytesReceived"),
+            ("WANCommonIFC1", "GetTotalBytesSent"),
+            ("WANPPPConnection1", "GetInfo"),
+        ]
+        results = await asyncio.gather(
+            *(self._call(service, action) for service, action in calls), return_exceptions=True
+        )
+        service_shown = None
+        for (service_name, action_name), result in zip(calls, results):
+            if service_name != service_shown:
+                info.append(f"\n─── Service: {service_name} ───")
+                service_shown = service_name
+            if isinstance(result, BaseException):
+                info.append(f"  {action_name}: (error: {result!r})")
+                continue
+            info.append(f"  {action_name}:")
+            for key, value in result.items():
+                info.append(f"    {key}: {value}")
+        return "\n".join(info)
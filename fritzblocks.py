@@ -0,0 +1,646 @@
+"""
+fritzblocks.py
+==============
+Compact sample store: columnar blocks with delta / zigzag-varint encoding.
+
+Why
+---
+The sample logs of :mod:`fritzstore` spend 24 bytes per sample – about
+750 MB per router and year at 1 s.  The samples carry far less
+information: rates are quantised to 0.01 Mbit/s (``round(rx, 2)`` in
+:meth:`~fritzreader.FritzReader.get_bandwidth`), a home line is idle most
+of the time, and the timestamps advance by the refresh interval.
+``[APP] history_store = compact`` selects :class:`BlockStore`, which keeps
+the same samples in a few bytes each and offers the same interface as
+:class:`~fritzstore.LogStore`.
+
+Encoding
+--------
+Samples are grouped into blocks of up to :data:`BLOCK_SIZE`.  A block stores
+its columns one after the other, each as integers:
+
+* ``t`` – milliseconds, **delta-of-delta** coded: a steady interval
+  becomes 0, jitter a few units;
+* ``dl`` / ``ul`` – hundredths of a Mbit/s, **delta** coded: idle runs
+  become 0 (``NaN`` of a gap row is stored as the value -1);
+* ``method`` / ``flags`` (gap reason) – delta coded, i.e. 0 except where
+  they change.
+
+The signed deltas are **zigzag** mapped (0, -1, 1, -2 … → 0, 1, 2, 3 …) and
+written as **varints** (LEB128, 7 bits per byte), so every small delta
+takes a single byte.  Finally the block is deflated with :mod:`zlib`, which
+folds the long runs of zero bytes of idle periods and constant columns.
+Rates are kept to 0.01 Mbit/s and times to 1 ms – the resolution of the
+samples themselves.
+
+Encoding and decoding are vectorised with NumPy (:func:`encode_block`,
+:func:`decode_block`): no Python code runs per sample, so decoding a month
+of 1 s samples (≈ 630 blocks) takes a fraction of a second.
+
+File format
+-----------
+One file ``<router>.fbc`` per router: the 64-byte header of the sample logs
+(:data:`~fritzstore.HEADER_DTYPE`, magic ``FBSBLK``), then the blocks, each
+a 32-byte :data:`BLOCK_DTYPE` header (first / last time, sample count,
+payload size, CRC-32) followed by its payload.
+
+Block index
+-----------
+When a file is opened, the block headers are read once into an in-memory
+index (offset, first / last time, count per block).  A range read finds its
+blocks by binary search on the index and decodes only those; blocks are
+contiguous, so their payloads are fetched with a single ``read()``.
+
+Open block and crash safety
+---------------------------
+The samples of the block being filled stay in memory and are also written,
+in batches like :class:`~fritzstore.SampleLog`, to a journal
+``<router>.fbj`` (sample log record format).  Once :data:`BLOCK_SIZE`
+samples are collected, they are encoded and appended to the block file and
+the journal is emptied.  On open, a torn or corrupt last block is cut off,
+and journal samples that already made it into the last block (crash
+between both steps) are dropped.  A crash loses at most the pending
+journal batch, as with the sample logs.
+
+Existing ``.fbl`` logs are imported with ``python fritzblocks.py``.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+import fritzstore
+from fritzstore import (
+    BATCH_SIZE, DATA_DIR, FLUSH_INTERVAL, HEADER_DTYPE, MAGIC, RECORD_DTYPE, SCAN_CHUNK,
+    method_code,
+)
+
+#: File name suffix of the block files.
+BLOCK_SUFFIX = ".fbc"
+
+#: File name suffix of the journals of the open blocks.
+JOURNAL_SUFFIX = ".fbj"
+
+#: Magic bytes (6) plus format version (2).
+BLOCK_MAGIC = b"FBSBLK\x00\x01"
+
+#: Samples per block.
+BLOCK_SIZE = 4096
+
+#: zlib level of the block payloads.
+COMPRESS_LEVEL = 6
+
+#: Header in front of every block payload (32 bytes).
+BLOCK_DTYPE = np.dtype([
+    ("t_first", "<f8"),
+    ("t_last", "<f8"),
+    ("count", "<u4"),
+    ("size", "<u4"),
+    ("crc", "<u4"),
+    ("pad", "V4"),
+])
+
+# In-memory block index: file offset of the block header plus its fields.
+_INDEX_DTYPE = np.dtype([
+    ("offset", "<i8"),
+    ("t_first", "<f8"),
+    ("t_last", "<f8"),
+    ("count", "<u4"),
+    ("size", "<u4"),
+])
+
+_COLUMNS = 5
+_NAN = -1   # quantised value standing for NaN
+
+
+def _file_name(router: str) -> str:
+    return fritzstore._file_name(router)[:-len(fritzstore.LOG_SUFFIX)] + BLOCK_SUFFIX
+
+
+# ---------------------------------------------------------------------------
+# Codec
+# ---------------------------------------------------------------------------
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    # int64 → uint64: 0, -1, 1, -2 … → 0, 1, 2, 3 …
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    return (values >> np.uint64(1)).view(np.int64) ^ -(values & np.uint64(1)).view(np.int64)
+
+
+# Smallest value needing 2, 3 … 10 varint bytes.
+_VARINT_LIMITS = np.array([1 << (7 * k) for k in range(1, 10)], dtype=np.uint64)
+
+
+def _varint_encode(values: np.ndarray) -> np.ndarray:
+    # LEB128 bytes of the uint64 *values*; as in _varint_decode, only the
+    # few values longer than one byte take further passes.
+    nbytes = np.searchsorted(_VARINT_LIMITS, values, "right") + 1
+    starts = np.cumsum(nbytes) - nbytes
+    out = np.empty(int(starts[-1] + nbytes[-1]) if len(values) else 0, dtype=np.uint8)
+    out[starts] = (values & np.uint64(0x7F)) | ((nbytes > 1).astype(np.uint64) << np.uint64(7))
+    longer = np.flatnonzero(nbytes > 1)
+    k = 1
+    while len(longer):
+        byte = (values[longer] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (nbytes[longer] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[longer] + k] = byte | more
+        longer = longer[nbytes[longer] > k + 1]
+        k += 1
+    return out
+
+
+def _varint_decode(buf: np.ndarray) -> np.ndarray:
+    # uint64 values of a LEB128 byte stream.  Nearly all values are one
+    # byte long, so the few longer ones are completed one byte position
+    # at a time.
+    last = buf < 0x80
+    if last.all():
+        return buf.astype(np.uint64)
+    ends = np.flatnonzero(last)
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    values = (buf[starts] & 0x7F).astype(np.uint64)
+    longer = np.flatnonzero(ends > starts)
+    k = 1
+    while len(longer):
+        pos = starts[longer] + k
+        values[longer] |= (buf[pos] & 0x7F).astype(np.uint64) << np.uint64(7 * k)
+        longer = longer[ends[longer] > pos]
+        k += 1
+    return values
+
+
+def encode_block(records: np.ndarray) -> bytes:
+    """Encode :data:`~fritzstore.RECORD_DTYPE` *records* into a block payload."""
+    n = len(records)
+    cols = np.empty((_COLUMNS, n), dtype=np.int64)
+    t = np.rint(records["t"] * 1000).astype(np.int64)
+    cols[0] = np.diff(np.diff(t, prepend=0), prepend=0)
+    for i, name in ((1, "dl"), (2, "ul")):
+        v = records[name].astype(np.float64)
+        q = np.maximum(np.rint(np.nan_to_num(v, nan=0.0) * 100), 0).astype(np.int64)
+        q[np.isnan(v)] = _NAN
+        cols[i] = np.diff(q, prepend=0)
+    cols[3] = np.diff(records["method"].astype(np.int64), prepend=0)
+    cols[4] = np.diff(records["flags"].astype(np.int64), prepend=0)
+    return zlib.compress(_varint_encode(_zigzag(cols.ravel())).tobytes(), COMPRESS_LEVEL)
+
+
+def decode_block(payload: bytes, count: int) -> np.ndarray:
+    """Decode a block payload of *count* samples into :data:`~fritzstore.RECORD_DTYPE`.
+
+    Raises
+    ------
+    ValueError
+        When the payload does not hold *count* samples.
+    zlib.error
+        When the payload is not valid deflate data.
+    """
+    values = _varint_decode(np.frombuffer(zlib.decompress(payload), dtype=np.uint8))
+    if len(values) != _COLUMNS * count:
+        raise ValueError(f"block holds {len(values)} values, expected {_COLUMNS * count}")
+    cols = np.cumsum(_unzigzag(values).reshape(_COLUMNS, count), axis=1)
+    records = np.zeros(count, dtype=RECORD_DTYPE)
+    records["t"] = np.cumsum(cols[0]) / 1000
+    for i, name in ((1, "dl"), (2, "ul")):
+        records[name] = np.where(cols[i] == _NAN, np.nan, cols[i] / 100)
+    records["method"] = cols[3]
+    records["flags"] = cols[4]
+    return records
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class BlockLog:
+    """Compact log of one router's samples.
+
+    Same interface as :class:`~fritzstore.SampleLog`; thread-safe.
+
+    Parameters
+    ----------
+    path : str | Path
+        Block file; created with a fresh header when missing.  The journal
+        sits next to it with :data:`JOURNAL_SUFFIX`.
+    router : str
+        Router name stored in the header of a new file.
+    read_only : bool
+        Open an existing block file for reading only: nothing is created
+        or repaired (a torn last block and journal samples beyond the open
+        block are skipped, not cut off) and :meth:`append` raises
+        :class:`OSError`.
+
+    Raises
+    ------
+    ValueError
+        When *path* exists but is not a block file of this format.
+    OSError
+        When *path* cannot be opened (read-only: does not exist).
+    """
+
+    def __init__(self, path, router: str = "", read_only: bool = False) -> None:
+        self.path = Path(path)
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._file = self._open(self.path, BLOCK_MAGIC, BLOCK_DTYPE.itemsize, router, read_only)
+        header = np.frombuffer(self._file.read(HEADER_DTYPE.itemsize), dtype=HEADER_DTYPE)[0]
+        #: Router name from the file header.
+        self.router: str = header["router"].decode("utf-8", "replace")
+        self._index = self._load_index()
+
+        self._tail = np.zeros(BLOCK_SIZE, dtype=RECORD_DTYPE)
+        self._tail_n = 0       # samples of the open block
+        self._journaled = 0    # ... of which are in the journal
+        self._pending_since = 0.0
+        journal = self.path.with_suffix(JOURNAL_SUFFIX)
+        if read_only and not journal.exists():
+            self._journal = None   # no open block yet
+        else:
+            self._journal = self._open(journal, MAGIC, RECORD_DTYPE.itemsize, router, read_only)
+            self._load_journal()
+        if self._tail_n:
+            self._last_t = float(self._tail["t"][self._tail_n - 1])
+        elif len(self._index):
+            self._last_t = float(self._index["t_last"][-1])
+        else:
+            self._last_t = float("-inf")
+
+    def __len__(self) -> int:
+        """Number of samples in blocks plus the open block."""
+        return int(self._index["count"].sum()) + self._tail_n
+
+    @staticmethod
+    def _open(path: Path, magic: bytes, record_size: int, router: str, read_only: bool):
+        # Open a file with the sample log header, writing one when new;
+        # positioned at the start.
+        what = "block file" if magic == BLOCK_MAGIC else "journal"
+        f = open(path, "rb" if read_only else "a+b")
+        if f.seek(0, os.SEEK_END) < HEADER_DTYPE.itemsize and read_only:
+            f.close()
+            raise ValueError(f"{path} is not a {what} of this version")
+        if f.seek(0, os.SEEK_END) < HEADER_DTYPE.itemsize:
+            f.truncate(0)
+            header = np.zeros(1, dtype=HEADER_DTYPE)
+            header["magic"] = magic
+            header["record_size"] = record_size
+            header["reserved"] = BLOCK_SIZE
+            header["router"] = router.encode("utf-8")[:48]
+            f.write(header.tobytes())
+            f.flush()
+        f.seek(0)
+        header = np.frombuffer(f.read(HEADER_DTYPE.itemsize), dtype=HEADER_DTYPE)[0]
+        f.seek(0)
+        if header["magic"] != magic or header["record_size"] != record_size:
+            f.close()
+            raise ValueError(f"{path} is not a {what} of this version")
+        return f
+
+    def _load_index(self) -> np.ndarray:
+        # Walk the block headers; cut off a torn or corrupt last block
+        # (read-only: leave it out of the index).
+        f = self._file
+        size = f.seek(0, os.SEEK_END)
+        entries = []
+        pos = HEADER_DTYPE.itemsize
+        while pos + BLOCK_DTYPE.itemsize <= size:
+            f.seek(pos)
+            h = np.frombuffer(f.read(BLOCK_DTYPE.itemsize), dtype=BLOCK_DTYPE)[0]
+            end = pos + BLOCK_DTYPE.itemsize + int(h["size"])
+            if not h["count"] or end > size:
+                break
+            entries.append((pos, h["t_first"], h["t_last"], h["count"], h["size"]))
+            pos = end
+        if entries and pos == size:
+            # Only the last block can be half-written: check its checksum.
+            last = entries[-1]
+            f.seek(last[0])
+            h = np.frombuffer(f.read(BLOCK_DTYPE.itemsize), dtype=BLOCK_DTYPE)[0]
+            if zlib.crc32(f.read(int(h["size"]))) != h["crc"]:
+                entries.pop()
+                pos = last[0]
+        if pos < size and not self.read_only:
+            print(f"[Store] {self.path.name}: dropping incomplete block ({size - pos} bytes) after crash.")
+            f.truncate(pos)
+        f.seek(0, os.SEEK_END)
+        return np.array(entries, dtype=_INDEX_DTYPE)
+
+    def _load_journal(self) -> None:
+        j = self._journal
+        j.seek(HEADER_DTYPE.itemsize)
+        raw = j.read()
+        torn = len(raw) % RECORD_DTYPE.itemsize
+        records = np.frombuffer(raw[:len(raw) - torn], dtype=RECORD_DTYPE)
+        if len(self._index) and len(records):
+            last = self._index[-1]
+            if records["t"][0] == last["t_first"]:
+                records = records[last["count"]:]   # already sealed before a crash
+        records = records[:BLOCK_SIZE]
+        if (torn or len(records) * RECORD_DTYPE.itemsize != len(raw)) and not self.read_only:
+            # Rewrite the journal to exactly the open block.
+            j.truncate(HEADER_DTYPE.itemsize)
+            j.write(records.tobytes())
+            j.flush()
+        self._tail[:len(records)] = records
+        self._tail_n = self._journaled = len(records)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, t, dl, ul, method: int = 0, flags=0) -> None:
+        """Queue one or more samples (scalars or equally long arrays).
+
+        *flags* (scalar or array) holds the gap reason per row.  Timestamps
+        older than the previous sample (wall clock set back) are raised to
+        that sample's time, so the blocks stay sorted.
+        """
+        if self.read_only:
+            raise OSError(f"{self.path.name} is open read-only")
+        t = np.atleast_1d(np.asarray(t, dtype=np.float64))
+        dl = np.broadcast_to(np.asarray(dl, dtype=np.float32), t.shape)
+        ul = np.broadcast_to(np.asarray(ul, dtype=np.float32), t.shape)
+        flags = np.broadcast_to(np.asarray(flags, dtype=np.uint8), t.shape)
+        with self._lock:
+            t = np.maximum.accumulate(np.maximum(t, self._last_t))
+            if len(t):
+                self._last_t = float(t[-1])
+            pos = 0
+            while pos < len(t):
+                if self._tail_n == self._journaled:
+                    self._pending_since = time.monotonic()
+                n = min(BLOCK_SIZE - self._tail_n, len(t) - pos)
+                rows = self._tail[self._tail_n:self._tail_n + n]
+                rows["t"] = t[pos:pos + n]
+                rows["dl"] = dl[pos:pos + n]
+                rows["ul"] = ul[pos:pos + n]
+                rows["method"] = method
+                rows["flags"] = flags[pos:pos + n]
+                self._tail_n += n
+                pos += n
+                if self._tail_n == BLOCK_SIZE:
+                    self._seal()
+                elif self._tail_n - self._journaled >= BATCH_SIZE:
+                    self._write_journal()
+            if (
+                self._tail_n > self._journaled
+                and time.monotonic() - self._pending_since >= FLUSH_INTERVAL
+            ):
+                self._write_journal()
+
+    def flush(self) -> None:
+        """Write the pending samples of the open block to the journal."""
+        with self._lock:
+            self._write_journal()
+
+    def _write_journal(self) -> None:
+        if self._tail_n > self._journaled:
+            self._journal.write(self._tail[self._journaled:self._tail_n].tobytes())
+            self._journal.flush()
+            self._journaled = self._tail_n
+
+    def _seal(self) -> None:
+        # Encode the open block, append it and empty the journal.
+        records = self._tail[:self._tail_n]
+        payload = encode_block(records)
+        header = np.zeros(1, dtype=BLOCK_DTYPE)
+        header["t_first"] = records["t"][0]
+        header["t_last"] = records["t"][-1]
+        header["count"] = len(records)
+        header["size"] = len(payload)
+        header["crc"] = zlib.crc32(payload)
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write(header.tobytes() + payload)
+        self._file.flush()
+        entry = np.array(
+            [(offset, header["t_first"][0], header["t_last"][0], len(records), len(payload))],
+            dtype=_INDEX_DTYPE,
+        )
+        self._index = np.concatenate([self._index, entry])
+        self._journal.truncate(HEADER_DTYPE.itemsize)
+        self._journal.flush()
+        self._tail_n = self._journaled = 0
+
+    def close(self) -> None:
+        """Write pending samples to the journal and close both files.
+
+        The open block is not sealed; it is continued after the next open.
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._write_journal()
+            if self._journal is not None:
+                self._journal.close()
+            self._file.close()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _decoded(self, start: float | None, end: float | None, group: int):
+        # Yield the decoded blocks overlapping [start, end] and finally the
+        # open block, each cut to the range.  Payloads are fetched *group*
+        # blocks per read() while holding the lock.
+        with self._lock:
+            index = self._index
+            tail = self._tail[:self._tail_n].copy()
+        i = int(np.searchsorted(index["t_last"], start, "left")) if start is not None else 0
+        j = int(np.searchsorted(index["t_first"], end, "right")) if end is not None else len(index)
+        for g in range(i, j, group):
+            blocks = index[g:min(g + group, j)]
+            first = int(blocks["offset"][0])
+            with self._lock:
+                self._file.seek(first)
+                raw = self._file.read(int(blocks["offset"][-1]) + BLOCK_DTYPE.itemsize
+                                      + int(blocks["size"][-1]) - first)
+                self._file.seek(0, os.SEEK_END)
+            for block in blocks:
+                pos = int(block["offset"]) - first + BLOCK_DTYPE.itemsize
+                records = decode_block(raw[pos:pos + int(block["size"])], int(block["count"]))
+                yield _cut(records, start, end)
+        yield _cut(tail, start, end)
+
+    def read(self, start: float | None = None, end: float | None = None) -> np.ndarray:
+        """Return the samples with ``start <= t <= end`` (a new array).
+
+        Decodes the blocks overlapping the range; the open block is
+        included.
+
+        Parameters
+        ----------
+        start, end : float | None
+            Wall-clock bounds; ``None`` means unbounded.
+        """
+        return np.concatenate(list(self._decoded(start, end, group=1 << 30)))
+
+    def scan(self, start: float | None = None, end: float | None = None, chunk: int = SCAN_CHUNK):
+        """Yield the samples of :meth:`read` as consecutive chunks of *chunk* records.
+
+        Blocks are decoded as the chunks are consumed, so memory stays flat
+        for any range.
+        """
+        pending, have = [], 0
+        for records in self._decoded(start, end, group=max(chunk // BLOCK_SIZE, 1)):
+            pending.append(records)
+            have += len(records)
+            while have >= chunk:
+                joined = np.concatenate(pending)
+                yield joined[:chunk]
+                pending, have = [joined[chunk:]], have - chunk
+        if have:
+            yield np.concatenate(pending)
+
+
+def _cut(records: np.ndarray, start: float | None, end: float | None) -> np.ndarray:
+    t = records["t"]
+    i = int(np.searchsorted(t, start, "left")) if start is not None else 0
+    j = int(np.searchsorted(t, end, "right")) if end is not None else len(t)
+    return records[i:j]
+
+
+class BlockStore:
+    """All routers' :class:`BlockLog` files in one directory.
+
+    Same interface as :class:`~fritzstore.LogStore`.
+
+    Parameters
+    ----------
+    directory : str | Path | None
+        Default :data:`~fritzstore.DATA_DIR`.
+    read_only : bool
+        Open the block files with ``read_only`` (see :class:`BlockLog`) and
+        do not create the directory.
+    """
+
+    def __init__(self, directory=None, read_only: bool = False) -> None:
+        self.directory = Path(directory) if directory else DATA_DIR
+        self.read_only = read_only
+        if not read_only:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._logs: dict = {}
+        self._lock = threading.Lock()
+
+    def _log(self, router: str, create: bool = True) -> BlockLog | None:
+        # Readers pass create=False: an unknown router gets no file.
+        with self._lock:
+            log = self._logs.get(router)
+            if log is None:
+                path = self.directory / _file_name(router)
+                if not create and not path.exists():
+                    return None
+                log = self._logs[router] = BlockLog(path, router, self.read_only)
+            return log
+
+    def append(self, router: str, t, dl, ul, method: str | None = None, flags=0) -> None:
+        """Queue samples of *router*; see :meth:`BlockLog.append`."""
+        self._log(router).append(t, dl, ul, method_code(method), flags)
+
+    def read(self, router: str, start: float | None = None, end: float | None = None) -> np.ndarray:
+        """Return *router*'s samples in ``[start, end]``; see :meth:`BlockLog.read`.
+
+        An unknown router yields an empty array; no file is created.
+        """
+        log = self._log(router, create=False)
+        if log is None:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return log.read(start, end)
+
+    def scan(self, router: str, start: float | None = None, end: float | None = None, chunk: int = SCAN_CHUNK):
+        """Yield *router*'s samples in chunks; see :meth:`BlockLog.scan`."""
+        log = self._log(router, create=False)
+        if log is None:
+            return iter(())
+        return log.scan(start, end, chunk)
+
+    def routers(self) -> list:
+        """Return the names of all routers with a block file in the directory."""
+        names = set(self._logs)
+        for path in self.directory.glob("*" + BLOCK_SUFFIX):
+            try:
+                with open(path, "rb") as f:
+                    header = np.frombuffer(f.read(HEADER_DTYPE.itemsize), dtype=HEADER_DTYPE)
+            except OSError:
+                continue
+            if len(header) and header[0]["magic"] == BLOCK_MAGIC:
+                names.add(header[0]["router"].decode("utf-8", "replace"))
+        return sorted(names)
+
+    def flush(self) -> None:
+        """Write the pending samples of all routers."""
+        with self._lock:
+            logs = list(self._logs.values())
+        for log in logs:
+            log.flush()
+
+    def close(self) -> None:
+        """Flush and close all logs."""
+        with self._lock:
+            logs = list(self._logs.values())
+            self._logs.clear()
+        for log in logs:
+            log.close()
+
+
+# ---------------------------------------------------------------------------
+# Import of existing sample logs
+# ---------------------------------------------------------------------------
+
+def import_logs(directory=None) -> dict:
+    """Copy the samples of all ``.fbl`` logs in *directory* into block files.
+
+    Only samples newer than the newest one already in a router's block file
+    are copied, so the import can be repeated.  The logs are left in place.
+
+    Returns
+    -------
+    dict
+        ``{router: samples copied}``.
+    """
+    logs = fritzstore.LogStore(directory)
+    blocks = BlockStore(logs.directory)
+    copied = {}
+    try:
+        for router in logs.routers():
+            log = blocks._log(router)
+            for chunk in logs.scan(router, None, None):
+                chunk = chunk[chunk["t"] > log._last_t]
+                # One append per run of the same measurement method.
+                starts = np.flatnonzero(np.diff(chunk["method"].astype(np.int16), prepend=-1))
+                for a, b in zip(starts, list(starts[1:]) + [len(chunk)]):
+                    part = chunk[a:b]
+                    log.append(part["t"], part["dl"], part["ul"], int(part["method"][0]), part["flags"])
+                copied[router] = copied.get(router, 0) + len(chunk)
+    finally:
+        logs.close()
+        blocks.close()
+    return copied
+
+
+def main(argv=None) -> int:
+    """Import the sample logs of the data directory; returns the exit code."""
+    parser = argparse.ArgumentParser(description="Import FB Speed Monitor sample logs into the compact store")
+    parser.add_argument("--data", default=str(DATA_DIR), help="data directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+    try:
+        copied = import_logs(args.data)
+    except (OSError, ValueError) as e:
+        print(f"[Store] Import failed: {e}", file=sys.stderr)
+        return 1
+    for router, n in copied.items():
+        print(f"[Store] {router}: {n} samples imported.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+fritzcache.py
+=============
+Persistent cache of TR-064 service descriptions.
+
+Why
+---
+Building a :class:`fritzconnection.FritzConnection` downloads the two root
+descriptions (``igddesc.xml``, ``tr64desc.xml``) plus one SCPD file per
+service – 42+ HTTP requests on current FRITZ!OS.  Over a VPN this takes
+several seconds and happens again on every reconnect.  The API description
+only changes with the router model or a firmware update, so it is cached on
+disk.
+
+Cache key and validation
+------------------------
+One JSON file per router address/port lives in :data:`CACHE_DIR`.  It stores
+the serialised descriptions together with a key of
+
+``(address, model name, firmware build)``
+
+where *firmware build* is the ``systemVersion`` block of ``tr64desc.xml``
+(hardware code, major/minor/patch, build number).  Validation costs a single
+unauthenticated GET of ``tr64desc.xml``: if model or firmware differ from
+the cached key, the full description crawl runs and the file is rewritten.
+
+fritzconnection's built-in cache is not used because its validation fetches
+``jason_boxinfo.xml`` from port 80, which is often not reachable through the
+same VPN path / port forwarding as the TR-064 port.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from fritzconnection.core.processor import Description
+from fritzconnection.core.utils import get_xml_root
+
+#: Directory holding one ``<address>_<port>.json`` file per router.
+CACHE_DIR = Path(__file__).resolve().parent / "cache"
+
+#: Bump when the file layout changes; older files are then ignored.
+CACHE_VERSION = 1
+
+#: Default TR-064 port (same as fritzconnection).
+DEFAULT_PORT = 49000
+
+
+def fetch_root_description(address: str, port=None, timeout: float = 5.0, session=None) -> Description:
+    """Download and parse ``tr64desc.xml`` – a single, unauthenticated GET.
+
+    Parameters
+    ----------
+    address : str
+        IP address or hostname, with or without ``http://`` prefix.
+    port : int | None
+        TR-064 port, default 49000.
+    timeout : float
+        HTTP timeout in seconds.
+    session : requests.Session | None
+        Optional session to re-use an open connection.
+
+    Returns
+    -------
+    fritzconnection.core.processor.Description
+        Provides ``device_model_name`` and ``system_info``.
+    """
+    if "//" not in address:
+        address = f"http://{address}"
+    url = f"{address}:{port or DEFAULT_PORT}/tr64desc.xml"
+    return Description(get_xml_root(url, timeout=timeout, session=session))
+
+
+def cache_key(address: str, description: Description) -> list:
+    """Return the cache key for a router (JSON-compatible list)."""
+    return [address.split("//")[-1], description.device_model_name, list(description.system_info)]
+
+
+def _cache_path(address: str, port) -> Path:
+    host = address.split("//")[-1].replace(".", "_").replace(":", "_")
+    return CACHE_DIR / f"{host}_{port or DEFAULT_PORT}.json"
+
+
+def load(address: str, port, key: list):
+    """Return cached serialised descriptions, or ``None`` on miss / mismatch."""
+    try:
+        with _cache_path(address, port).open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != CACHE_VERSION or data.get("key") != key:
+        return None
+    return data.get("descriptions")
+
+
+def store(address: str, port, key: list, descriptions: list) -> None:
+    """Write serialised descriptions atomically (write + rename)."""
+    path = _cache_path(address, port)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "key": key, "descriptions": descriptions}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[FritzCache] Could not write {path.name}: {e}")
+
+
+def load_router_api(fc) -> bool:
+    """Populate *fc*'s device manager from the cache or the router.
+
+    Called from :meth:`fritztransport.PooledFritzConnection._load_router_api`
+    in place of fritzconnection's own loader.
+
+    Parameters
+    ----------
+    fc : fritzconnection.FritzConnection
+        Connection under construction; its ``session``, ``timeout``,
+        ``address`` and ``port`` are used.
+
+    Returns
+    -------
+    bool
+        ``True`` on a cache hit, ``False`` when the full crawl ran.
+    """
+    root = fetch_root_description(fc.address, fc.port, timeout=fc.timeout, session=fc.session)
+    key = cache_key(fc.address, root)
+    cached = load(fc.address, fc.port, key)
+    dm = fc.device_manager
+    if cached is not None:
+        try:
+            dm.deserialize(cached)
+            dm.scan()
+            return True
+        except Exception as e:
+            print(f"[FritzCache] Ignoring unreadable cache entry: {e}")
+            dm.descriptions = []
+            dm.services = {}
+    fc._load_api_from_router()
+    store(fc.address, fc.port, key, dm.serialize())
+    return False
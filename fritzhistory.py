@@ -0,0 +1,214 @@
+"""
+fritzhistory.py
+===============
+Preallocated ring buffer for the bandwidth history of one router.
+
+Why
+---
+A ``deque`` of ``(dl, ul)`` tuples stores every sample as three Python
+objects, and every consumer has to turn it back into arrays (list
+comprehensions, ``zip(*history)``) on each tick – work that grows with the
+history depth.  :class:`HistoryBuffer` keeps the samples in fixed NumPy
+columns instead:
+
+* **O(1) append** – one write per column at the head index, no allocation.
+* **Zero-copy reads** – :meth:`HistoryBuffer.segments` returns the rows in
+  chronological order as at most two slices (before / after the wrap-around
+  point) that are views into the buffer, not copies.
+* **Compact** – 17 bytes per row, so 24 hours at 1 s resolution
+  (86 400 rows) take about 1.5 MB.
+
+Columns
+-------
+``t``
+    Wall-clock time of the sample (:func:`time.time`).  Stored as
+    ``float64``: ``float32`` resolves epoch seconds only to about two
+    minutes.
+``dl``, ``ul``
+    Download / upload rate in Mbit/s as ``float32`` (7 significant digits,
+    more than the two decimals a sample carries).  ``NaN`` in a gap row.
+``flags``
+    ``0`` for a sample, else the :data:`GAP_REASONS` code of a gap row.
+
+Gaps
+----
+A tick without a usable value is not papered over with the previous value
+or zeros: :meth:`HistoryBuffer.append_gap` stores a **gap row** – ``NaN``
+rates plus the reason (:data:`GAP_IMPLAUSIBLE`, :data:`GAP_TIMEOUT`,
+:data:`GAP_DISCONNECTED`).  The plot breaks its line at ``NaN``
+(``connect="finite"``), aggregations skip these rows, and the stores keep
+the reason in their ``flags`` byte.
+
+Sequence numbers
+----------------
+Every row gets a sequence number (``1, 2, 3 …``; :attr:`HistoryBuffer.total`
+is the newest).  :meth:`HistoryBuffer.since` copies only the rows after a
+given number, and :meth:`HistoryBuffer.extend` appends such a delta to a
+second buffer – this is how the poll threads hand new samples to the GUI,
+which keeps its own mirror of each router's history.  Both are O(new rows)
+regardless of the history depth.
+
+The buffer is not synchronised; it is written by the single poll task of its
+router.  Readers in other threads must work on a copy (:meth:`HistoryBuffer.since`,
+:meth:`HistoryBuffer.arrays`).
+"""
+
+import numpy as np
+
+#: Gap reason names by code; code 0 marks a regular sample.
+GAP_REASONS = ("", "implausible", "timeout", "disconnected")
+
+#: Value failed the plausibility filter.
+GAP_IMPLAUSIBLE = 1
+
+#: The router did not deliver a value (poll failed, or no measurement
+#: method answered).
+GAP_TIMEOUT = 2
+
+#: No connection to the router.
+GAP_DISCONNECTED = 3
+
+
+class HistoryBuffer:
+    """Fixed-capacity ring buffer of ``(t, dl, ul, flags)`` rows.
+
+    Parameters
+    ----------
+    capacity : int
+        Maximum number of rows; the oldest row is overwritten when full.
+
+    Attributes
+    ----------
+    total : int
+        Number of rows ever appended (not reset by overwriting), usable as
+        a sequence number of the newest row.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._t = np.zeros(capacity, dtype=np.float64)
+        self._dl = np.zeros(capacity, dtype=np.float32)
+        self._ul = np.zeros(capacity, dtype=np.float32)
+        self._flags = np.zeros(capacity, dtype=np.uint8)
+        self._head = 0   # index of the next write
+        self._count = 0
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, t: float, dl: float, ul: float, flags: int = 0) -> None:
+        """Store one sample, overwriting the oldest row when full."""
+        i = self._head
+        self._t[i] = t
+        self._dl[i] = dl
+        self._ul[i] = ul
+        self._flags[i] = flags
+        self._head = i + 1 if i + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+        self.total += 1
+
+    def append_gap(self, t: float, reason: int) -> None:
+        """Store a gap row (``NaN`` rates) with a :data:`GAP_REASONS` code."""
+        self.append(t, np.nan, np.nan, reason)
+
+    def last(self) -> tuple | None:
+        """Return the newest row as ``(t, dl, ul)`` floats, or ``None``.
+
+        The rates are ``NaN`` when the newest row is a gap.
+        """
+        if not self._count:
+            return None
+        i = self._head - 1
+        return float(self._t[i]), float(self._dl[i]), float(self._ul[i])
+
+    def extend(self, t, dl, ul, flags=None, seq: int | None = None) -> None:
+        """Append several rows at once (O(rows)).
+
+        Parameters
+        ----------
+        t, dl, ul : array-like
+            Columns of the new rows, oldest first.
+        flags : array-like | None
+            Gap reason per row; ``None`` for regular samples only.
+        seq : int | None
+            Sequence number of the last given row.  When the rows do not
+            directly follow :attr:`total` (rows were missed, or the source
+            buffer was replaced), the buffer is cleared first and continues
+            the source's numbering.
+        """
+        k = len(t)
+        if seq is not None and seq - k != self.total:
+            self.clear()
+            self.total = seq - k
+        skip = max(k - self.capacity, 0)
+        pos = 0
+        for start, stop in self._spans(self._head, k - skip):
+            n = stop - start
+            for col, src in ((self._t, t), (self._dl, dl), (self._ul, ul)):
+                col[start:stop] = src[skip + pos:skip + pos + n]
+            self._flags[start:stop] = 0 if flags is None else flags[skip + pos:skip + pos + n]
+            pos += n
+        self._head = (self._head + k - skip) % self.capacity
+        self._count = min(self._count + k - skip, self.capacity)
+        self.total += k
+
+    def clear(self) -> None:
+        """Forget all rows (the columns stay allocated)."""
+        self._head = 0
+        self._count = 0
+        self.total = 0
+
+    def _spans(self, start: int, n: int) -> list:
+        # Index ranges of n consecutive rows from *start*, split at the wrap.
+        if n <= 0:
+            return []
+        if start + n <= self.capacity:
+            return [(start, start + n)]
+        return [(start, self.capacity), (0, start + n - self.capacity)]
+
+    def segments(self) -> list:
+        """Return the rows oldest-first as at most two ``(t, dl, ul, flags)`` views.
+
+        The views are read-only and share memory with the buffer, so they
+        are only valid until the next :meth:`append` overwrites them.
+        """
+        result = []
+        for start, stop in self._spans((self._head - self._count) % self.capacity, self._count):
+            views = tuple(col[start:stop] for col in self._cols())
+            for view in views:
+                view.flags.writeable = False
+            result.append(views)
+        return result
+
+    def arrays(self) -> tuple:
+        """Return contiguous copies ``(t, dl, ul, flags)`` of all rows, oldest first."""
+        return self._tail(self._count)
+
+    def since(self, seq: int) -> tuple:
+        """Return read-only copies ``(t, dl, ul, flags)`` of the rows after *seq*.
+
+        Rows already overwritten are not included, so at most
+        :attr:`capacity` rows are returned.
+        """
+        rows = self._tail(min(self.total - seq, self._count))
+        for col in rows:
+            col.flags.writeable = False
+        return rows
+
+    def _tail(self, n: int) -> tuple:
+        # Copies of the newest n rows, oldest first.
+        spans = self._spans((self._head - n) % self.capacity, n)
+        cols = self._cols()
+        if len(spans) == 2:
+            return tuple(np.concatenate([col[a:b] for a, b in spans]) for col in cols)
+        if spans:
+            (a, b), = spans
+            return tuple(col[a:b].copy() for col in cols)
+        return tuple(np.empty(0, dtype=col.dtype) for col in cols)
+
+    def _cols(self) -> tuple:
+        return self._t, self._dl, self._ul, self._flags
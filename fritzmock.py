@@ -0,0 +1,512 @@
+"""
+fritzmock.py
+============
+Local mock of a FRITZ!Box TR-064 interface for benchmarks and development.
+
+:class:`MockFritzBox` serves just enough of the TR-064 API for
+:class:`~fritzreader.FritzReader` (and :class:`fritzconnection.FritzConnection`
+underneath it) to connect and poll bandwidth data without a real router:
+
+* ``/tr64desc.xml`` – root device description with model name and
+  ``systemVersion``; ``/igddesc.xml`` – the UPnP IGD description.
+* ``/<service>SCPD.xml`` – service control point definitions.
+* ``/upnp/control/<service>`` – SOAP control endpoints protected by HTTP
+  digest authentication (``qop="auth"``), like the real box.
+
+Network latency
+---------------
+To make transport-level optimisations measurable on ``localhost``, the server
+adds an artificial round-trip time (*rtt*):
+
+* once when a TCP connection is accepted (emulating the handshake), and
+* once per HTTP request (emulating request/response travel time).
+
+A request on a fresh connection that first has to be answered with a digest
+challenge therefore costs three round-trips, a request on a kept-alive,
+already authenticated connection only one.
+
+Traffic model
+-------------
+Download and upload rates follow a slow sine wave with random noise.  The
+simulated byte counters integrate those rates, so ``GetAddonInfos``,
+``GetTotalBytes*`` and ``X_AVM-DE_GetOnlineMonitor`` return mutually
+consistent values.  ``GetTotalBytes*`` report 32-bit counters that wrap
+around like on real hardware.
+
+This module is not imported by the application itself.
+"""
+
+import hashlib
+import math
+import random
+import secrets
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.etree import ElementTree
+
+# ---------------------------------------------------------------------------
+# API description served by the mock
+# ---------------------------------------------------------------------------
+
+#: ``(service_id, service_type, control/scpd slug, {action: [out args]})``.
+#: All arguments are declared as ``ui4`` except the 64-bit counters, the
+#: comma-separated online-monitor lists and the external IP address.
+SERVICES = [
+    (
+        "WANCommonIFC1",
+        "urn:dslforum-org:service:WANCommonInterfaceConfig:1",
+        "wancommonifconfig1",
+        {
+            "GetCommonLinkProperties": [
+                "NewWANAccessType", "NewLayer1UpstreamMaxBitRate",
+                "NewLayer1DownstreamMaxBitRate", "NewPhysicalLinkStatus",
+            ],
+            "GetTotalBytesSent": ["NewTotalBytesSent"],
+            "GetTotalBytesReceived": ["NewTotalBytesReceived"],
+            "GetAddonInfos": [
+                "NewByteSendRate", "NewByteReceiveRate",
+                "NewTotalBytesSent", "NewTotalBytesReceived",
+                "NewX_AVM_DE_TotalBytesSent64", "NewX_AVM_DE_TotalBytesReceived64",
+            ],
+            "X_AVM-DE_GetOnlineMonitor": [
+                "NewTotalNumberSyncGroups", "NewSyncgroupName", "NewSyncgroupMode",
+                "Newmax_ds", "Newmax_us", "Newds_current_bps", "Newus_current_bps",
+            ],
+        },
+    ),
+    (
+        "WANPPPConnection1",
+        "urn:dslforum-org:service:WANPPPConnection:1",
+        "wanpppconn1",
+        {"GetInfo": ["NewEnable", "NewConnectionStatus", "NewExternalIPAddress"]},
+    ),
+    (
+        "DeviceInfo1",
+        "urn:dslforum-org:service:DeviceInfo:1",
+        "deviceinfo",
+        {"GetInfo": ["NewModelName", "NewSoftwareVersion", "NewUpTime"]},
+    ),
+]
+
+_STRING_ARGS = {
+    "NewWANAccessType", "NewPhysicalLinkStatus", "NewSyncgroupName",
+    "NewSyncgroupMode", "Newds_current_bps", "Newus_current_bps",
+    "NewConnectionStatus", "NewExternalIPAddress", "NewModelName",
+    "NewSoftwareVersion",
+}
+_UI8_ARGS = {"NewX_AVM_DE_TotalBytesSent64", "NewX_AVM_DE_TotalBytesReceived64"}
+
+#: Number of entries in the online-monitor history lists (5 s apart).
+ONLINE_MONITOR_SAMPLES = 20
+
+_REALM = "F!Box SOAP-Auth"
+
+
+def _md5(text: str) -> str:
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def _parse_digest(header: str) -> dict:
+    """Split an ``Authorization: Digest k="v", …`` header into a dict."""
+    fields = {}
+    for part in header[len("Digest "):].split(","):
+        if "=" in part:
+            key, value = part.strip().split("=", 1)
+            fields[key] = value.strip('"')
+    return fields
+
+
+# ---------------------------------------------------------------------------
+# Traffic simulation
+# ---------------------------------------------------------------------------
+
+class _Traffic:
+    """Synthetic traffic source with consistent rates and byte counters."""
+
+    def __init__(self, link_dl_bps: int, link_ul_bps: int, seed=None) -> None:
+        self.link_dl = link_dl_bps
+        self.link_ul = link_ul_bps
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic()
+        self._last = self._t0
+        self.rx_bytes = self._rng.randrange(2 ** 40)
+        self.tx_bytes = self._rng.randrange(2 ** 38)
+        self.rx_rate = 0.0  # bytes/s
+        self.tx_rate = 0.0
+        self._monitor_ds = [0] * ONLINE_MONITOR_SAMPLES
+        self._monitor_us = [0] * ONLINE_MONITOR_SAMPLES
+        self._next_monitor = self._t0
+
+    def advance(self) -> None:
+        """Integrate the counters up to *now*."""
+        with self._lock:
+            now = time.monotonic()
+            phase = (now - self._t0) / 60.0 * 2 * math.pi
+            load = 0.35 + 0.3 * math.sin(phase) + self._rng.uniform(-0.05, 0.05)
+            self.rx_rate = max(load, 0.0) * self.link_dl / 8
+            self.tx_rate = max(load * 0.4, 0.0) * self.link_ul / 8
+            dt = now - self._last
+            self._last = now
+            self.rx_bytes += int(self.rx_rate * dt)
+            self.tx_bytes += int(self.tx_rate * dt)
+            while now >= self._next_monitor:
+                # Newest value first, like the real X_AVM-DE_GetOnlineMonitor.
+                self._monitor_ds = [int(self.rx_rate)] + self._monitor_ds[:-1]
+                self._monitor_us = [int(self.tx_rate)] + self._monitor_us[:-1]
+                self._next_monitor += 5.0
+
+    def monitor_lists(self) -> tuple:
+        with self._lock:
+            return list(self._monitor_ds), list(self._monitor_us)
+
+
+# ---------------------------------------------------------------------------
+# HTTP handler
+# ---------------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FRITZ!Box-Mock"
+
+    def setup(self) -> None:
+        # Emulates the TCP three-way handshake of a new connection.
+        box = self.server.box
+        box._count("connections")
+        self.server.open_sockets.add(self.request)
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if box.rtt:
+            time.sleep(box.rtt)
+        super().setup()
+
+    def finish(self) -> None:
+        self.server.open_sockets.discard(self.request)
+        super().finish()
+
+    def log_message(self, *args) -> None:
+        # Keep stderr quiet; the benchmarks print their own summary.
+        pass
+
+    # -- helpers ---------------------------------------------------------
+
+    def _send(self, status: int, body: bytes, ctype: str = "text/xml", extra=None) -> None:
+        box = self.server.box
+        if box.rtt:
+            time.sleep(box.rtt)
+        self.send_response(status)
+        self.send_header("Content-Type", f'{ctype}; charset="utf-8"')
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        box = self.server.box
+        if not box.password:
+            return True
+        header = self.headers.get("Authorization", "")
+        if not header.startswith("Digest "):
+            return False
+        f = _parse_digest(header)
+        if f.get("nonce") not in box._nonces or f.get("username") != box.user:
+            return False
+        ha1 = _md5(f"{box.user}:{_REALM}:{box.password}")
+        ha2 = _md5(f"{self.command}:{f.get('uri', '')}")
+        expected = _md5(
+            f"{ha1}:{f['nonce']}:{f.get('nc', '')}:{f.get('cnonce', '')}:{f.get('qop', '')}:{ha2}"
+        )
+        return expected == f.get("response")
+
+    # -- GET: description files -----------------------------------------
+
+    def do_GET(self) -> None:
+        box = self.server.box
+        box._count("requests")
+        doc = box._documents.get(self.path.split("?")[0])
+        if doc is None:
+            self._send(404, b"<html>404 Not Found</html>", "text/html")
+        else:
+            box._count("description_requests")
+            self._send(200, doc)
+
+    # -- POST: SOAP actions ---------------------------------------------
+
+    def do_POST(self) -> None:
+        box = self.server.box
+        box._count("requests")
+        # Drain the request body so the keep-alive connection stays usable.
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self._authorized():
+            box._count("challenges")
+            nonce = secrets.token_hex(8)
+            box._nonces.add(nonce)
+            self._send(
+                401, b"<html>401 Unauthorized</html>", "text/html",
+                {"WWW-Authenticate": f'Digest realm="{_REALM}", nonce="{nonce}", algorithm=MD5, qop="auth"'},
+            )
+            return
+
+        soapaction = self.headers.get("soapaction", "").strip('"')
+        service_type, _, action = soapaction.partition("#")
+        values = box._action_values(service_type, action)
+        if values is None:
+            self._send(500, b"<s:Envelope>UPnPError 401 Invalid Action</s:Envelope>")
+            return
+        box._count("soap_calls")
+        args = "".join(f"<{k}>{v}</{k}>" for k, v in values.items())
+        envelope = (
+            '<?xml version="1.0"?>'
+            '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/" '
+            's:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/"><s:Body>'
+            f'<u:{action}Response xmlns:u="{service_type}">{args}</u:{action}Response>'
+            "</s:Body></s:Envelope>"
+        ).encode("utf-8")
+        self._send(200, envelope)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, *args, **kwargs) -> None:
+        #: Sockets of live keep-alive connections (closed by ``stop()``).
+        self.open_sockets: set = set()
+        super().__init__(*args, **kwargs)
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients that hit a deadline close the socket mid-response; that is
+        # expected and not worth a traceback.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+class MockFritzBox:
+    """A TR-064 mock server running in a background thread.
+
+    Parameters
+    ----------
+    rtt : float
+        Artificial round-trip time in seconds (see module docstring).
+    user, password : str
+        Digest credentials.  An empty *password* disables authentication.
+    model : str
+        Model name reported in the device description.
+    version : str
+        FRITZ!OS version as ``"<major>.<minor>.<patch>"``, e.g.
+        ``"154.07.57"``.
+    link_dl_mbit, link_ul_mbit : float
+        Line capacity reported by ``GetCommonLinkProperties``.
+    port : int
+        TCP port to bind on ``127.0.0.1``; ``0`` picks a free port.
+    seed : int | None
+        Seed for the traffic noise, for reproducible runs.
+
+    Use as a context manager or call :meth:`start` / :meth:`stop`::
+
+        with MockFritzBox(rtt=0.02) as box:
+            reader = FritzReader(box.address, box.user, box.password, port=box.port)
+    """
+
+    def __init__(
+        self,
+        rtt: float = 0.0,
+        user: str = "admin",
+        password: str = "secret",
+        model: str = "FRITZ!Box 7590",
+        version: str = "154.07.57",
+        link_dl_mbit: float = 250.0,
+        link_ul_mbit: float = 40.0,
+        port: int = 0,
+        seed=None,
+    ) -> None:
+        self.rtt = rtt
+        self.user = user
+        self.password = password
+        self.model = model
+        self.version = version
+        self.address = "127.0.0.1"
+        self.traffic = _Traffic(int(link_dl_mbit * 1e6), int(link_ul_mbit * 1e6), seed)
+        self.stats = {
+            "connections": 0, "requests": 0, "challenges": 0,
+            "soap_calls": 0, "description_requests": 0,
+        }
+        self._stats_lock = threading.Lock()
+        self._nonces: set = set()
+        self._documents = self._build_documents()
+        self._server = _Server((self.address, port), _Handler)
+        self._server.box = self
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        """TCP port the server is listening on."""
+        return self._server.server_address[1]
+
+    # -- lifecycle -------------------------------------------------------
+
+    def start(self) -> "MockFritzBox":
+        """Start serving in a daemon thread and return ``self``."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down and drop all connections, like a router reboot."""
+        self._server.shutdown()
+        self._server.server_close()
+        for sock in list(self._server.open_sockets):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "MockFritzBox":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        """Zero all request counters in :attr:`stats`."""
+        with self._stats_lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    # -- documents -------------------------------------------------------
+
+    def _build_documents(self) -> dict:
+        major, minor, patch = self.version.split(".")
+        services = "".join(
+            "<service>"
+            f"<serviceType>{stype}</serviceType>"
+            f"<serviceId>urn:{sid[:-1]}-com:serviceId:{sid}</serviceId>"
+            f"<controlURL>/upnp/control/{slug}</controlURL>"
+            f"<eventSubURL>/upnp/control/{slug}</eventSubURL>"
+            f"<SCPDURL>/{slug}SCPD.xml</SCPDURL>"
+            "</service>"
+            for sid, stype, slug, _ in SERVICES
+        )
+        docs = {
+            "/tr64desc.xml": (
+                '<?xml version="1.0"?>'
+                '<root xmlns="urn:dslforum-org:device-1-0">'
+                "<specVersion><major>1</major><minor>0</minor></specVersion>"
+                "<systemVersion>"
+                f"<HW>226</HW><Major>{int(major)}</Major><Minor>{int(minor)}</Minor>"
+                f"<Patch>{int(patch)}</Patch><Buildnumber>100000</Buildnumber>"
+                f"<Display>{self.version}</Display>"
+                "</systemVersion>"
+                "<device>"
+                "<deviceType>urn:dslforum-org:device:InternetGatewayDevice:1</deviceType>"
+                f"<friendlyName>{self.model}</friendlyName>"
+                "<manufacturer>AVM</manufacturer>"
+                f"<modelName>{self.model}</modelName>"
+                "<UDN>uuid:00000000-0000-0000-0000-000000000000</UDN>"
+                f"<serviceList>{services}</serviceList>"
+                "</device></root>"
+            ).encode("utf-8"),
+        }
+        docs["/igddesc.xml"] = (
+            '<?xml version="1.0"?>'
+            '<root xmlns="urn:schemas-upnp-org:device-1-0">'
+            "<specVersion><major>1</major><minor>0</minor></specVersion>"
+            "<device>"
+            "<deviceType>urn:schemas-upnp-org:device:InternetGatewayDevice:1</deviceType>"
+            f"<friendlyName>{self.model}</friendlyName>"
+            "<manufacturer>AVM</manufacturer>"
+            f"<modelName>{self.model}</modelName>"
+            "<UDN>uuid:00000000-0000-0000-0000-000000000001</UDN>"
+            "</device></root>"
+        ).encode("utf-8")
+        for _, _, slug, actions in SERVICES:
+            action_xml = []
+            variables = {}
+            for name, outs in actions.items():
+                args = "".join(
+                    f"<argument><name>{a}</name><direction>out</direction>"
+                    f"<relatedStateVariable>{a[3:]}</relatedStateVariable></argument>"
+                    for a in outs
+                )
+                action_xml.append(f"<action><name>{name}</name><argumentList>{args}</argumentList></action>")
+                for a in outs:
+                    dtype = "string" if a in _STRING_ARGS else "ui8" if a in _UI8_ARGS else "ui4"
+                    variables[a[3:]] = dtype
+            table = "".join(
+                f"<stateVariable><name>{n}</name><dataType>{t}</dataType></stateVariable>"
+                for n, t in variables.items()
+            )
+            docs[f"/{slug}SCPD.xml"] = (
+                '<?xml version="1.0"?>'
+                '<scpd xmlns="urn:dslforum-org:service-1-0">'
+                "<specVersion><major>1</major><minor>0</minor></specVersion>"
+                f"<actionList>{''.join(action_xml)}</actionList>"
+                f"<serviceStateTable>{table}</serviceStateTable>"
+                "</scpd>"
+            ).encode("utf-8")
+        # Validate once so a typo fails loudly instead of confusing a client.
+        for doc in docs.values():
+            ElementTree.fromstring(doc)
+        return docs
+
+    # -- actions ---------------------------------------------------------
+
+    def _action_values(self, service_type: str, action: str):
+        t = self.traffic
+        t.advance()
+        if service_type.endswith("WANCommonInterfaceConfig:1"):
+            if action == "GetCommonLinkProperties":
+                return {
+                    "NewWANAccessType": "DSL",
+                    "NewLayer1UpstreamMaxBitRate": t.link_ul,
+                    "NewLayer1DownstreamMaxBitRate": t.link_dl,
+                    "NewPhysicalLinkStatus": "Up",
+                }
+            if action == "GetTotalBytesSent":
+                return {"NewTotalBytesSent": t.tx_bytes % 2 ** 32}
+            if action == "GetTotalBytesReceived":
+                return {"NewTotalBytesReceived": t.rx_bytes % 2 ** 32}
+            if action == "GetAddonInfos":
+                return {
+                    "NewByteSendRate": int(t.tx_rate),
+                    "NewByteReceiveRate": int(t.rx_rate),
+                    "NewTotalBytesSent": t.tx_bytes % 2 ** 32,
+                    "NewTotalBytesReceived": t.rx_bytes % 2 ** 32,
+                    "NewX_AVM_DE_TotalBytesSent64": t.tx_bytes,
+                    "NewX_AVM_DE_TotalBytesReceived64": t.rx_bytes,
+                }
+            if action == "X_AVM-DE_GetOnlineMonitor":
+                ds, us = t.monitor_lists()
+                return {
+                    "NewTotalNumberSyncGroups": 1,
+                    "NewSyncgroupName": "sg0",
+                    "NewSyncgroupMode": "VDSL",
+                    "Newmax_ds": t.link_dl // 8,
+                    "Newmax_us": t.link_ul // 8,
+                    "Newds_current_bps": ",".join(map(str, ds)),
+                    "Newus_current_bps": ",".join(map(str, us)),
+                }
+        elif service_type.endswith("WANPPPConnection:1") and action == "GetInfo":
+            return {
+                "NewEnable": 1,
+                "NewConnectionStatus": "Connected",
+                "NewExternalIPAddress": "203.0.113.7",
+            }
+        elif service_type.endswith("DeviceInfo:1") and action == "GetInfo":
+            return {
+                "NewModelName": self.model,
+                "NewSoftwareVersion": self.version,
+                "NewUpTime": int(time.monotonic() - t._t0),
+            }
+        return None
@@ -0,0 +1,508 @@
+"""
+fritzplot.py
+============
+Plot data preparation for the bandwidth graph: level-of-detail decimation,
+PCHIP smoothing and the incrementally updated curve data of the live view.
+
+Why
+---
+:meth:`gui.FritzMain._update_plot` used to hand every history point to
+:meth:`pyqtgraph.PlotCurveItem.setData`.  Drawing cost grows with the
+number of points, although a plot a thousand pixels wide cannot show more
+than a couple of values per pixel column.  Plain subsampling (every *k*-th
+point) would be cheap but drops short peaks – exactly the spikes a
+bandwidth monitor is for.
+
+Min/max decimation
+------------------
+:func:`minmax_decimate` splits the visible x-range into one bin per pixel
+column and keeps two points per bin: its minimum and its maximum, in the
+order in which the series passes them (rising bins min → max, falling bins
+max → min).  Every peak and dip survives, the drawn envelope is identical
+to the full-resolution curve at that zoom level, and the output never has
+more than ``2 × columns`` points however long the history is.
+
+The work is restricted to the visible part (:func:`visible_slice`, binary
+search on the sorted x values, plus one point beyond each edge so the curve
+runs off the plot instead of ending inside it) and is fully vectorised
+(``np.minimum.reduceat`` / ``np.maximum.reduceat``), so zooming and panning
+through 10⁶ points stays interactive.  The GUI recomputes it whenever the
+user zooms or pans.
+
+Incremental updates
+-------------------
+Decimating the whole history on every new sample costs O(history) per
+tick.  The live view therefore uses a :class:`PlotBuffer`: rows, plotted
+upload and fill baselines live in preallocated :class:`SlidingColumns`,
+and the min/max envelope uses a fixed time grid, so a new sample only
+changes the newest bin and an evicted one the oldest.  Per tick the work
+is proportional to the new samples and the curves get views without a
+copy; ``python bench.py plot`` compares it with the full rebuild.
+
+Gaps
+----
+Missing samples are ``NaN`` (gap rows of :mod:`fritzhistory`) and the
+curves are drawn with ``connect="finite"``, so the line breaks there.  The
+decimation takes min / max with ``np.fmin`` / ``np.fmax``, which ignore
+``NaN``: a bin keeps its real extremes and only a bin without any value
+stays ``NaN`` (a gap at least one pixel wide).  :func:`break_gaps` inserts
+the ``NaN`` for sources that simply leave missing steps out, such as the
+rollup buckets.
+
+Smoothing
+---------
+:func:`smooth` draws a monotone cubic (PCHIP) through the samples with
+:data:`SMOOTH_STEPS` points per sample interval.  The slope at a sample
+depends only on its two neighbouring intervals (at the end of a run, on
+the two intervals next to it), so an interval's curve is fixed by the
+samples up to two positions away.  The slopes follow Fritsch–Carlson as
+in SciPy's :class:`~scipy.interpolate.PchipInterpolator` (weighted
+harmonic mean, limited three-point end formula; the curves agree to about
+1e-12), computed with a few NumPy operations for all runs at once.  SciPy
+is not needed – importing it would cost a tray app more start-up time and
+memory than smoothing ever does, and constructing an interpolator costs
+more than a whole tick's update.  :class:`PlotBuffer` caches the smoothed
+rows per interval: a new sample changes only the last two intervals, an
+evicted one only the first, and just those are evaluated again – O(1) per
+tick instead of a new spline over the whole history.  Gaps split the
+curve into runs that are smoothed separately.
+"""
+
+import numpy as np
+
+#: Points per sample interval of the smoothed curves.
+SMOOTH_STEPS = 6
+
+# Cubic Hermite basis at the SMOOTH_STEPS fractions of an interval.
+_F = np.arange(SMOOTH_STEPS) / SMOOTH_STEPS
+_H00 = 2 * _F**3 - 3 * _F**2 + 1
+_H10 = _F**3 - 2 * _F**2 + _F
+_H01 = -2 * _F**3 + 3 * _F**2
+_H11 = _F**3 - _F**2
+
+
+def visible_slice(x: np.ndarray, x0: float, x1: float) -> tuple:
+    """Return ``(i, j)`` so that ``x[i:j]`` covers ``[x0, x1]``.
+
+    *x* must be sorted.  One point on either side of the range is included
+    when it exists.
+    """
+    i = max(int(np.searchsorted(x, x0, "left")) - 1, 0)
+    j = min(int(np.searchsorted(x, x1, "right")) + 1, len(x))
+    return i, j
+
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, columns: int) -> tuple:
+    """Reduce a series to its min and max per pixel column.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Sorted x values.
+    y : np.ndarray
+        Values, same length as *x*.
+    columns : int
+        Number of bins (the plot width in pixels).
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        ``(x, y)`` with at most ``2 × columns`` points; the input itself
+        when it is not longer than that.
+    """
+    n = len(x)
+    if n <= 2 * columns or columns < 1:
+        return x, y
+    # Bin start indices on an even grid over x; empty bins (gaps in x)
+    # collapse into their neighbour.
+    edges = np.linspace(x[0], x[-1], columns + 1)[:-1]
+    starts = np.unique(np.searchsorted(x, edges, "left"))
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:] - 1
+    ends[-1] = n - 1
+
+    y_min = np.fmin.reduceat(y, starts)
+    y_max = np.fmax.reduceat(y, starts)
+    rising = y[starts] <= y[ends]
+
+    out_x = np.empty(2 * len(starts), dtype=x.dtype)
+    out_y = np.empty(2 * len(starts), dtype=y.dtype)
+    out_x[0::2] = x[starts]
+    out_x[1::2] = x[ends]
+    out_y[0::2] = np.where(rising, y_min, y_max)
+    out_y[1::2] = np.where(rising, y_max, y_min)
+    return out_x, out_y
+
+
+def break_gaps(x: np.ndarray, *cols, step: float) -> tuple:
+    """Insert a ``NaN`` row wherever *x* advances by more than *step*.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Sorted x values.
+    *cols : np.ndarray
+        Value columns, same length as *x*.
+    step : float
+        Largest regular spacing of *x*.
+
+    Returns
+    -------
+    tuple[np.ndarray, ...]
+        ``(x, *cols)``; unchanged (no copy) when there is no gap.  The
+        inserted rows sit in the middle of their gap.
+    """
+    gaps = np.flatnonzero(np.diff(x) > step) + 1
+    if not len(gaps):
+        return (x, *cols)
+    mid = (x[gaps - 1] + x[gaps]) / 2
+    return (np.insert(x, gaps, mid), *(np.insert(c, gaps, np.nan) for c in cols))
+
+
+class SlidingColumns:
+    """The newest *capacity* rows of several ``float64`` columns, contiguous.
+
+    Rows are written behind the current window into a buffer twice the
+    capacity; only when the buffer end is reached is the window moved back
+    to the front.  That is one copy of at most *capacity* rows per
+    *capacity* appended rows, so appending is amortised O(rows appended) and
+    :attr:`columns` are always plain views – ready for ``setData()``
+    without a copy.
+
+    Parameters
+    ----------
+    capacity : int
+        Rows kept; older ones drop out when more are appended.
+    width : int
+        Number of columns.
+    """
+
+    def __init__(self, capacity: int, width: int) -> None:
+        self.capacity = max(int(capacity), 1)
+        self._buf = np.empty((width, 2 * self.capacity))
+        self._start = self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def columns(self) -> tuple:
+        """Views of the kept rows, one array per column (oldest first)."""
+        return tuple(self._buf[:, self._start:self._end])
+
+    def clear(self) -> None:
+        self._start = self._end = 0
+
+    def extend(self, *cols) -> None:
+        """Append rows; *cols* are equally long arrays, one per column."""
+        k = len(cols[0])
+        if k >= self.capacity:
+            self._buf[:, :self.capacity] = [c[k - self.capacity:] for c in cols]
+            self._start, self._end = 0, self.capacity
+            return
+        if self._end + k > self._buf.shape[1]:
+            # Buffer end reached: move the rows that stay to the front.
+            keep = min(len(self), self.capacity - k)
+            self._buf[:, :keep] = self._buf[:, self._end - keep:self._end]
+            self._start, self._end = 0, keep
+        self._buf[:, self._end:self._end + k] = cols
+        self._end += k
+        self._start = max(self._start, self._end - self.capacity)
+
+    def drop(self, n: int) -> None:
+        """Remove the *n* oldest rows."""
+        self._start = min(self._start + n, self._end)
+
+    def truncate(self, n: int) -> None:
+        """Remove the *n* newest rows."""
+        self._end = max(self._end - n, self._start)
+
+
+def _edge_slope(h0, h1, m0, m1):
+    # Three-point end slope, limited to keep the end monotone.
+    d = ((2 * h0 + h1) * m0 - h0 * m1) / (h0 + h1)
+    d = np.where(d * m0 > 0, d, 0.0)
+    return np.where((m0 * m1 < 0) & (np.abs(d) > np.abs(3 * m0)), 3 * m0, d)
+
+
+def _pchip_slopes(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # PCHIP slopes at the points of y (one series per row of a 2-D y).
+    # NaN points split a series into runs; each run gets the slopes SciPy
+    # would compute for it alone.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h = np.full(len(x) + 3, np.nan)
+        m = np.full(y.shape[:-1] + (len(x) + 3,), np.nan)
+        h[2:-2] = np.diff(x)
+        m[..., 2:-2] = np.diff(y) / h[2:-2]
+        # Point i: intervals i-2, i-1 (left) and i, i+1 (right)
+        hl2, hl, hr, hr2 = h[:-3], h[1:-2], h[2:-1], h[3:]
+        ml2, ml, mr, mr2 = m[..., :-3], m[..., 1:-2], m[..., 2:-1], m[..., 3:]
+        w1, w2 = 2 * hr + hl, hr + 2 * hl
+        inner = np.where(ml * mr > 0, (w1 + w2) / (w1 / ml + w2 / mr), 0.0)
+        start = np.where(mr2 == mr2, _edge_slope(hr, hr2, mr, mr2), mr)
+        end = np.where(ml2 == ml2, _edge_slope(hl, hl2, ml, ml2), ml)
+    left, right = ml == ml, mr == mr   # not NaN
+    return np.where(left & right, inner, np.where(right, start, np.where(left, end, np.nan)))
+
+
+def _smooth(x: np.ndarray, ys, spans, last: bool) -> tuple:
+    # Smoothed rows of the intervals a … b-1 of every (a, b) in *spans*
+    # (SMOOTH_STEPS rows each, starting at the sample), plus the last
+    # sample when *last*.  The slope at a sample depends only on the
+    # samples up to two positions away, so just the points a-2 … b+1 of
+    # each span are read; spans at least five intervals apart share one
+    # pass (the false interval between their windows only affects slopes
+    # at the window edges, which are not used).  Intervals touching a gap
+    # (NaN) are NaN apart from their start.
+    pts = np.concatenate([np.arange(max(a - 2, 0), min(b + 2, len(x))) for a, b in spans])
+    i = np.concatenate([np.arange(a, b) for a, b in spans])
+    j = np.searchsorted(pts, i)   # position of sample i in pts
+    y = np.stack([c[pts] for c in ys])
+    d = _pchip_slopes(x[pts], y)
+    h = (x[i + 1] - x[i])[:, None]
+    y0, y1 = y[:, j, None], y[:, j + 1, None]
+    v = y0 * _H00 + h * d[:, j, None] * _H10 + y1 * _H01 + h * d[:, j + 1, None] * _H11
+    v[..., 0] = y0[..., 0]
+    v = v.reshape(len(ys), -1)
+    xs = (x[i, None] + h * _F).ravel()
+    if last:
+        return (np.append(xs, x[-1]), *np.concatenate([v, y[:, -1:]], axis=1))
+    return (xs, *v)
+
+
+def smooth(x: np.ndarray, *ys) -> tuple:
+    """Return ``(x, *ys)`` smoothed by PCHIP, :data:`SMOOTH_STEPS` points per interval.
+
+    *x* must be increasing; ``NaN`` in a column splits it into runs that
+    are smoothed separately.  Fewer than two points are returned as they
+    are.
+    """
+    if len(x) < 2:
+        return (x, *ys)
+    return _smooth(x, ys, [(0, len(x) - 1)], True)
+
+
+def _envelope(x, ys, starts, ends, first: int) -> tuple:
+    # Two rows per bin (first and last x, min/max in the order the series
+    # passes them) plus the absolute first / last index of every bin.
+    # *ys* are the columns of ``x``, *first* the absolute index of x[0].
+    out = [np.repeat(x[starts], 2)]
+    out[0][1::2] = x[ends]
+    for y in ys:
+        lo = np.fmin.reduceat(y, starts)
+        hi = np.fmax.reduceat(y, starts)
+        rising = y[starts] <= y[ends]
+        v = np.empty(2 * len(starts))
+        v[0::2] = np.where(rising, lo, hi)
+        v[1::2] = np.where(rising, hi, lo)
+        out.append(v)
+    out.append(np.where(np.isfinite(out[1]), 0.0, np.nan))   # Basislinie
+    out.append(np.repeat(starts + float(first), 2))
+    out.append(np.repeat(ends + float(first), 2))
+    return tuple(out)
+
+
+def _grid_bins(x: np.ndarray, width: float) -> tuple:
+    # First / last index of the runs of x on the grid floor(x / width).
+    k = np.floor(x / width)
+    starts = np.flatnonzero(np.diff(k, prepend=-np.inf))
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:] - 1
+    ends[-1] = len(x) - 1
+    return starts, ends
+
+
+class PlotBuffer:
+    """Curve data of the live graph, updated in place sample by sample.
+
+    Keeps the newest *capacity* rows of ``(t, dl, ul)`` together with the
+    plotted upload (negated when mirrored) and the zero baseline of the
+    fills (``NaN`` at gaps, so fill and line break at the same place) in
+    :class:`SlidingColumns`.  Once there are more than ``2 × columns`` rows,
+    it also keeps a min/max envelope like :func:`minmax_decimate`, but on a
+    fixed time grid (bin *k* covers ``[k · w, (k + 1) · w)``): a new sample
+    only changes the newest bin, an evicted one only the oldest.
+    :meth:`extend` therefore re-bins just the tail and drops or recomputes
+    the head – its cost depends on the number of new samples, not on the
+    history length.  The grid (``w = span / columns``) is rebuilt when the
+    plot width or the mirror mode changes or the bin count drifts out of
+    ``columns / 2 … 2 × columns``; while the history fills up that happens
+    each time the span doubles.
+
+    With smoothing on and no envelope, :meth:`curves` returns the
+    :func:`smooth` rows instead, cached per sample interval and updated at
+    both ends only (see the module notes).
+
+    Parameters
+    ----------
+    capacity : int
+        Rows kept (the history size).
+    columns : int
+        Plot width in pixels.
+    """
+
+    def __init__(self, capacity: int, columns: int = 1000) -> None:
+        self.raw = SlidingColumns(capacity, 5)   # t, dl, ul, ul geplottet, Basislinie
+        self.columns = max(int(columns), 1)
+        self.mirrored = False
+        self.smoothing = False
+        self.total = 0          # rows appended since the last reset
+        self._lod = None        # SlidingColumns: x, dl, ul geplottet, Basislinie, i0, i1
+        self._width = 0.0       # bin width in seconds, 0 = no envelope
+        self._smooth = None     # SlidingColumns: x, dl, ul geplottet, Basislinie
+        self._smooth_first = 0  # absolute index of the first row _smooth covers
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    @property
+    def capacity(self) -> int:
+        return self.raw.capacity
+
+    @property
+    def decimated(self) -> bool:
+        """Whether :meth:`curves` returns the envelope instead of the rows."""
+        return self._lod is not None
+
+    @property
+    def smoothed(self) -> bool:
+        """Whether :meth:`curves` returns the smoothed rows."""
+        return self._smooth is not None
+
+    def rows(self) -> tuple:
+        """``(t, dl, ul, ul_plot, base)`` views of the kept rows."""
+        return self.raw.columns
+
+    def curves(self) -> tuple:
+        """``(x, dl, ul_plot, base)`` views to draw: the rows, smoothed or their envelope."""
+        if self._lod is not None:
+            return self._lod.columns[:4]
+        if self._smooth is not None:
+            return self._smooth.columns
+        return tuple(self.raw.columns[i] for i in (0, 1, 3, 4))
+
+    def reset(self, t, dl, ul) -> None:
+        """Replace the contents with ``(t, dl, ul)``."""
+        self.raw.clear()
+        self.total = 0
+        self._lod = None
+        self._smooth = None
+        self.extend(t, dl, ul)
+
+    def extend(self, t, dl, ul) -> None:
+        """Append rows (arrays or scalars) and update envelope and smoothing."""
+        t = np.atleast_1d(np.asarray(t, dtype=np.float64))
+        if not len(t):
+            return
+        dl = np.broadcast_to(np.asarray(dl, dtype=np.float64), t.shape)
+        ul = np.broadcast_to(np.asarray(ul, dtype=np.float64), t.shape)
+        base = np.where(np.isfinite(dl), 0.0, np.nan)
+        self.raw.extend(t, dl, ul, -ul if self.mirrored else ul, base)
+        self.total += len(t)
+        if self._lod is not None:
+            self._update_envelope()
+        elif len(self.raw) > 2 * self.columns:
+            self._rebuild_envelope()
+        self._update_smooth(len(t))
+
+    def configure(self, columns: int, mirrored: bool, smoothing: bool = False) -> None:
+        """Set plot width, mirror mode and smoothing; recomputes only what they change."""
+        columns = max(int(columns), 1)
+        if (columns, mirrored, smoothing) == (self.columns, self.mirrored, self.smoothing):
+            return
+        if mirrored != self.mirrored:
+            t, dl, ul, ul_plot, base = self.raw.columns
+            if mirrored:
+                np.negative(ul, out=ul_plot)
+            else:
+                ul_plot[:] = ul
+        self.columns, self.mirrored, self.smoothing = columns, mirrored, smoothing
+        self._rebuild_envelope()
+        self._rebuild_smooth()
+
+    def _rebuild_envelope(self) -> None:
+        t, dl, ul, ul_plot, base = self.raw.columns
+        span = float(t[-1] - t[0]) if len(t) else 0.0
+        if len(t) <= 2 * self.columns or not span > 0:
+            self._lod = None
+            return
+        self._width = span / self.columns
+        starts, ends = _grid_bins(t, self._width)
+        if self._lod is None or self._lod.capacity != 4 * self.columns + 4:
+            self._lod = SlidingColumns(4 * self.columns + 4, 6)
+        self._lod.clear()
+        self._lod.extend(*_envelope(t, (dl, ul_plot), starts, ends, self.total - len(t)))
+
+    def _update_envelope(self) -> None:
+        lod = self._lod
+        t, dl, ul, ul_plot, base = self.raw.columns
+        first = self.total - len(t)   # absolute index of t[0]
+
+        # Tail: the newest bin may have grown – bin again from its first row.
+        i0 = max(int(lod.columns[4][-1]), first) if len(lod) else first
+        lod.truncate(2)
+        s = i0 - first
+        starts, ends = _grid_bins(t[s:], self._width)
+        if len(lod) + 2 * len(starts) > lod.capacity:
+            self._rebuild_envelope()
+            return
+        lod.extend(*_envelope(t[s:], (dl[s:], ul_plot[s:]), starts, ends, i0))
+
+        # Head: drop bins that left the window, recompute a partly left one.
+        lod.drop(int(np.searchsorted(lod.columns[5], first, "left")))
+        b0, b1 = lod.columns[4:]
+        if b0[0] < first:
+            end = int(b1[0]) - first + 1
+            head = _envelope(t[:end], (dl[:end], ul_plot[:end]), np.array([0]), np.array([end - 1]), first)
+            for col, value in zip(lod.columns, head):
+                col[:2] = value
+
+        bins = len(lod) // 2
+        if not self.columns // 2 <= bins <= 2 * self.columns:
+            self._rebuild_envelope()
+
+    def _smoothed(self, spans, last: bool) -> tuple:
+        # _smooth() rows of the interval spans with clipping and baseline.
+        t, dl, ul, ul_plot, base = self.raw.columns
+        x, d, u = _smooth(t, (dl, ul_plot), spans, last)
+        np.maximum(d, 0.0, out=d)
+        if not self.mirrored:   # gespiegelt ist der Upload negativ
+            np.maximum(u, 0.0, out=u)
+        return x, d, u, np.where(np.isfinite(d), 0.0, np.nan)
+
+    def _rebuild_smooth(self) -> None:
+        self._smooth = None
+        n = len(self.raw)
+        if not self.smoothing or self._lod is not None or not n:
+            return
+        self._smooth = SlidingColumns(SMOOTH_STEPS * self.capacity, 4)
+        self._smooth.extend(*self._smoothed([(0, n - 1)], True))
+        self._smooth_first = self.total - n
+
+    def _update_smooth(self, k: int) -> None:
+        # After *k* appended rows the curve changes from the old
+        # second-to-last sample on, and in the first interval when rows
+        # were evicted.  Both are evaluated in one pass.
+        if self._lod is not None:
+            self._smooth = None
+            return
+        if not self.smoothing:
+            return
+        sm = self._smooth
+        n = len(self.raw)
+        first = self.total - n
+        a = n - k - 2
+        if sm is None or a < 5:
+            self._rebuild_smooth()
+            return
+        dropped = first - self._smooth_first
+        sm.drop(SMOOTH_STEPS * dropped)
+        self._smooth_first = first
+        sm.truncate(SMOOTH_STEPS + 1)
+        if not dropped:
+            sm.extend(*self._smoothed([(a, n - 1)], True))
+            return
+        rows = self._smoothed([(0, 1), (a, n - 1)], True)
+        for col, value in zip(sm.columns, rows):
+            col[:SMOOTH_STEPS] = value[:SMOOTH_STEPS]
+        sm.extend(*(value[SMOOTH_STEPS:] for value in rows))
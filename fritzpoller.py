@@ -0,0 +1,499 @@
+"""
+fritzpoller.py
+==============
+Qt-free polling core for one or many routers.
+
+Design
+------
+:class:`RouterPoller` owns one :class:`~fritzreader.FritzReader` per
+configured router (:class:`~config.RouterSettings`) and a bounded
+:class:`~concurrent.futures.ThreadPoolExecutor`.  Every :meth:`RouterPoller.tick`
+submits one poll task per router, so all routers are queried concurrently
+and a slow or unreachable router only occupies its own pool thread.
+
+* A router whose previous task is still running (slow VPN, connect timeout)
+  is **skipped** for this tick instead of queueing a second task; the skip
+  is counted in :attr:`RouterState.skipped`.  The tick itself never blocks.
+* Each router keeps its own history inside its reader.
+* With a :class:`~fritzscheduler.PollScheduler` attached, :meth:`RouterPoller.tick`
+  only polls routers that are due at the tick's boundary, and every outcome
+  is reported back to the scheduler (adaptive rate).
+
+Reconnect state machine
+-----------------------
+Every router is in one of three phases (:attr:`RouterState.phase`)::
+
+    OFFLINE ──(tick, retry time reached)──► CONNECTING ──(ok)──► ONLINE
+       ▲                                        │                   │
+       └──────────(failed, backoff)─────────────┘◄──(poll failed)───┘
+
+* A failed poll moves the router to CONNECTING and reconnects right away
+  in the same pool task, so a short outage costs a single tick.
+* Every further failure schedules the next attempt with a capped,
+  jittered :class:`~fritzscheduler.Backoff` (2 s, 4 s, 8 s … 60 s at the
+  default interval), so an unreachable or rebooting box is not hammered.
+* :meth:`FritzReader.connect <fritzreader.FritzReader.connect>` keeps the old
+  connection until the new one is ready; debug queries during a reconnect
+  use the old one.
+* While a router is not ONLINE, each of its ticks emits an explicit **gap
+  sample** instead of nothing, so the GUI can mark the outage.  Connect
+  attempts run on the pool like polls; the tick never waits for them.
+* The outage is also recorded in the history, once: the failed poll
+  appends a gap row (:meth:`HistoryBuffer.append_gap
+  <fritzhistory.HistoryBuffer.append_gap>`, reason
+  :data:`~fritzhistory.GAP_TIMEOUT`), a failed connect after a sample one
+  with :data:`~fritzhistory.GAP_DISCONNECTED`.  The gap sample of that pool
+  task carries it as ``"rows"`` like a regular sample.
+
+Results are delivered through two callbacks, invoked from the pool threads:
+
+``on_status(dict)``
+    After every (re-)connect attempt – same keys as
+    :attr:`fritzworker.FritzWorker.connection_status` plus ``"router"``.
+``on_sample(dict)``
+    After every poll – same keys as :attr:`fritzworker.FritzWorker.data_updated`
+    plus ``"router"`` – or a gap sample ``{"router", "gap": True, "reason",
+    "time", "retry_in", "error"}`` where ``reason`` is ``"connecting"``
+    or ``"disconnected"`` and ``retry_in`` the seconds until the next connect
+    attempt (``None`` while one is running); plus ``"rows"``, ``"seq"`` and
+    ``"capacity"`` when it brings a new gap row – or, after a connect, a
+    backfill payload (see below).
+
+Backfill
+--------
+A new poller's histories start empty.  Before :meth:`RouterPoller.start`,
+the owner may seed them with earlier rows (:meth:`RouterPoller.preload`,
+e.g. from the sample store); the rows count as already emitted.  After
+every successful connect, the router's own recent-sample buffer
+(:meth:`FritzReader.get_recent_samples
+<fritzreader.FritzReader.get_recent_samples>`) fills the history from its
+newest row up to now, and these rows go out right away as a backfill
+payload of their own (``"backfill": True``, ``"method": None`` – they were
+not measured with the method of the following sample).  A restart therefore shows the graph at once, and a
+reconnect closes the outage with the router's values where it has them.
+
+Samples do not carry the history, only the rows appended since the previous
+sample of the router (``"rows"``, read-only copies from
+:meth:`HistoryBuffer.since <fritzhistory.HistoryBuffer.since>`) and the
+sequence number ``"seq"`` of the newest one.  The receiver keeps its own
+mirror and appends them with :meth:`HistoryBuffer.extend
+<fritzhistory.HistoryBuffer.extend>`, so handing a sample across threads
+costs O(new rows) at any history depth.
+
+:class:`~fritzworker.FritzWorker` wires these callbacks to its Qt signals;
+``bench.py poll`` drives the poller directly against mock routers.
+"""
+
+import bisect
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from fritzhistory import GAP_DISCONNECTED, GAP_TIMEOUT
+from fritzreader import HISTORY_SIZE, FritzReader
+from fritzscheduler import Backoff
+
+#: Upper bound of the worker threads, independent of the number of routers.
+MAX_POOL_WORKERS = 16
+
+#: Base retry delay in seconds when no scheduler provides the interval.
+RETRY_BASE = 2.0
+
+# Phases of the reconnect state machine (see module docstring).
+OFFLINE = "offline"
+CONNECTING = "connecting"
+ONLINE = "online"
+
+
+@dataclass
+class RouterState:
+    """Per-router bookkeeping of :class:`RouterPoller`.
+
+    Attributes
+    ----------
+    name : str
+        Router name (key of all emitted dicts).
+    reader : fritzreader.FritzReader
+        Reader holding connection, history and maxima.
+    phase : str
+        :data:`OFFLINE`, :data:`CONNECTING` or :data:`ONLINE`.
+    busy : bool
+        ``True`` while a task of this router is queued or running.
+    polls : int
+        Samples taken.
+    skipped : int
+        Ticks skipped because the previous task was still running.
+    errors : int
+        Failed polls and connect attempts.
+    gaps : int
+        Gap samples emitted.
+    retry_at : float
+        Wall-clock time of the next connect attempt while OFFLINE.
+    backoff : fritzscheduler.Backoff | None
+        Spacing of connect attempts; reset by a successful connect.
+    last_error : str
+        Reason of the last failure, repeated in the gap samples.
+    connect_started : float | None
+        :func:`time.perf_counter` at the start of the last connect; cleared
+        once the first sample after it was delivered.
+    boundary : float | None
+        Scheduler boundary of the running task (``None`` outside the grid).
+    emitted_seq : int
+        Sequence number of the newest history row already emitted.
+    """
+
+    name: str
+    reader: FritzReader
+    phase: str = OFFLINE
+    busy: bool = False
+    polls: int = 0
+    skipped: int = 0
+    errors: int = 0
+    gaps: int = 0
+    retry_at: float = 0.0
+    backoff: Backoff | None = None
+    last_error: str = ""
+    connect_started: float | None = None
+    boundary: float | None = None
+    emitted_seq: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def connected(self) -> bool:
+        """``True`` while the router is ONLINE."""
+        return self.phase == ONLINE
+
+
+class RouterPoller:
+    """Poll several routers concurrently on a bounded thread pool.
+
+    Parameters
+    ----------
+    routers : list[config.RouterSettings]
+        Routers to monitor; names must be unique.
+    on_status, on_sample : callable
+        Callbacks receiving one ``dict`` each (see module docstring).
+    history_size : int
+        Passed to every reader.
+    max_workers : int | None
+        Pool size; default ``min(len(routers), MAX_POOL_WORKERS)``.
+    reader_factory : callable
+        ``(settings, history_size) -> FritzReader``; default
+        :meth:`FritzReader.from_settings`.
+    scheduler : fritzscheduler.PollScheduler | None
+        Optional schedule deciding which routers a tick polls.
+    retry_base : float | None
+        First backoff delay in seconds; default the scheduler's interval,
+        else :data:`RETRY_BASE`.
+    """
+
+    def __init__(
+        self,
+        routers: list,
+        on_status,
+        on_sample,
+        history_size: int = HISTORY_SIZE,
+        max_workers: int | None = None,
+        reader_factory=None,
+        scheduler=None,
+        retry_base: float | None = None,
+    ) -> None:
+        factory = reader_factory or FritzReader.from_settings
+        if retry_base is None:
+            retry_base = scheduler.interval if scheduler is not None else RETRY_BASE
+        self.routers: dict = {
+            r.name: RouterState(r.name, factory(r, history_size), backoff=Backoff(retry_base))
+            for r in routers
+        }
+        self.on_status = on_status
+        self.on_sample = on_sample
+        self.scheduler = scheduler
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or max(1, min(len(routers), MAX_POOL_WORKERS)),
+            thread_name_prefix="poll",
+        )
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Connect all routers concurrently (non-blocking)."""
+        for state in self.routers.values():
+            self._submit(state)
+
+    def tick(self, boundary: float | None = None) -> None:
+        """Advance every router by one tick (non-blocking).
+
+        ONLINE routers get a poll task unless the previous one is still
+        running (counted as skipped).  All other routers emit a gap sample;
+        an OFFLINE router whose backoff has expired also gets a connect
+        task.
+
+        Parameters
+        ----------
+        boundary : float | None
+            Scheduler boundary of this tick.  With a scheduler attached,
+            routers not due at *boundary* (slower adaptive rate) are left
+            out; they are not counted as skipped.
+        """
+        now = time.time()
+        for state in self.routers.values():
+            if (
+                self.scheduler is not None and boundary is not None
+                and not self.scheduler.is_due(state.name, boundary)
+            ):
+                continue
+            if state.phase == ONLINE:
+                if not self._submit(state, boundary):
+                    state.skipped += 1
+                continue
+            if state.phase == OFFLINE or state.reader.fc is not None:
+                # No gaps while the very first connect is still running.
+                self._emit_gap(state, boundary)
+            if self.scheduler is not None and boundary is not None:
+                self.scheduler.record_failure(state.name, boundary)
+            if state.phase == OFFLINE and now >= state.retry_at:
+                self._submit(state, boundary)
+
+    def preload(self, name: str, t, dl, ul) -> dict:
+        """Seed the history of router *name* with earlier rows.
+
+        Call before :meth:`start`.  The rows count as emitted, so they are
+        not repeated in the first sample.  A gap row
+        (:data:`~fritzhistory.GAP_DISCONNECTED`) after them keeps the graph
+        from bridging the time the monitor was not running.
+
+        Parameters
+        ----------
+        t, dl, ul : array-like
+            Columns of the rows, oldest first; only the newest
+            ``capacity`` rows are kept.
+
+        Returns
+        -------
+        dict
+            Backfill payload for the receiver: ``{"router", "backfill": True,
+            "rows", "seq", "capacity", "error": None}``.
+        """
+        state = self.routers[name]
+        history = state.reader.history
+        history.extend(t, dl, ul)
+        if len(history):
+            history.append_gap(history.last()[0], GAP_DISCONNECTED)
+        state.emitted_seq = history.total
+        return {
+            "router": name,
+            "backfill": True,
+            "rows": history.since(0),
+            "seq": history.total,
+            "capacity": history.capacity,
+            "error": None,
+        }
+
+    def reader(self, name: str) -> FritzReader | None:
+        """Return the reader of router *name*, or ``None``."""
+        state = self.routers.get(name)
+        return state.reader if state else None
+
+    def run_task(self, fn, *args):
+        """Run *fn* on the pool (e.g. a debug query) and return the future."""
+        return self._pool.submit(fn, *args)
+
+    def stats(self) -> dict:
+        """Return ``{name: {"polls", "skipped", "errors", "gaps", "phase", "connected"}}``."""
+        return {
+            name: {
+                "polls": s.polls,
+                "skipped": s.skipped,
+                "errors": s.errors,
+                "gaps": s.gaps,
+                "phase": s.phase,
+                "connected": s.connected,
+            }
+            for name, s in self.routers.items()
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting ticks; running tasks finish but emit nothing."""
+        self._closed = True
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Tasks (executed in pool threads)
+    # ------------------------------------------------------------------
+
+    def _submit(self, state: RouterState, boundary: float | None = None) -> bool:
+        with state.lock:
+            if state.busy or self._closed:
+                return False
+            state.busy = True
+            state.boundary = boundary
+        try:
+            self._pool.submit(self._run, state)
+        except RuntimeError:  # pool already shut down
+            state.busy = False
+            return False
+        return True
+
+    def _run(self, state: RouterState) -> None:
+        try:
+            if state.phase == ONLINE and self._poll(state):
+                return
+            # Not connected, or the poll just failed: (re-)connect and take
+            # the first sample right away.
+            if self._connect(state):
+                self._backfill(state)
+                self._poll(state)
+            elif self._mark_gap(state, GAP_DISCONNECTED):
+                self._emit_gap(state, state.boundary, rows=True)
+        except Exception as e:
+            print(f"[Poller] {state.name}: unexpected error: {e}")
+        finally:
+            state.busy = False
+
+    def _connect(self, state: RouterState) -> bool:
+        reader = state.reader
+        state.phase = CONNECTING
+        state.connect_started = time.perf_counter()
+        if reader.connect():
+            state.backoff.reset()
+            state.retry_at = 0.0
+            state.last_error = ""
+            state.phase = ONLINE
+        else:
+            state.errors += 1
+            delay = state.backoff.next_delay()
+            state.retry_at = time.time() + delay
+            state.last_error = "Connection to FRITZ!Box failed"
+            state.phase = OFFLINE
+            print(f"[Poller] {state.name}: unreachable, next attempt in {delay:.0f} s")
+        if self._closed:
+            return state.connected
+        if state.connected:
+            self.on_status({
+                "router": state.name,
+                "connected": True,
+                "message": "Connected",
+                "details": {
+                    "link_dl": reader.link_max_dl,
+                    "link_ul": reader.link_max_ul,
+                    "wan_ip": reader.get_ip_addresses()[1],
+                    "model": reader.fc.modelname if reader.fc else "",
+                    "connect_ms": reader.connect_duration * 1000,
+                    "cache_hit": reader.cache_hit,
+                },
+            })
+        else:
+            self.on_status({
+                "router": state.name,
+                "connected": False,
+                "message": state.last_error,
+                "details": None,
+                "retry_in": delay,
+            })
+        return state.connected
+
+    def _backfill(self, state: RouterState) -> None:
+        # Rows of the router's own buffer newer than the history's newest
+        # row.  They go out as a backfill payload of their own: they were
+        # not measured with the method of the next sample ("method": None).
+        history = state.reader.history
+        t, dl, ul = state.reader.get_recent_samples()
+        last = history.last()
+        i = bisect.bisect_right(t, last[0]) if last is not None else 0
+        if i < len(t):
+            history.extend(t[i:], dl[i:], ul[i:])
+            print(f"[Poller] {state.name}: {len(t) - i} samples backfilled from the router.")
+            data = {
+                "router": state.name,
+                "backfill": True,
+                "rows": history.since(state.emitted_seq),
+                "seq": history.total,
+                "capacity": history.capacity,
+                "method": None,
+                "error": None,
+            }
+            state.emitted_seq = history.total
+            if not self._closed:
+                self.on_sample(data)
+
+    def _mark_gap(self, state: RouterState, reason: int) -> bool:
+        # One gap row per outage, after the last sample; the line stays
+        # broken until the next one.
+        history = state.reader.history
+        last = history.last()
+        if last is None or math.isnan(last[1]):
+            return False
+        history.append_gap(time.time(), reason)
+        return True
+
+    def _poll(self, state: RouterState) -> bool:
+        reader = state.reader
+        try:
+            down, up = reader.get_bandwidth()
+            if down is None or up is None:
+                raise ConnectionError("Invalid data received from FRITZ!Box")
+        except Exception as e:
+            print(f"[Poller] {state.name}: data fetch error: {e}")
+            state.errors += 1
+            state.last_error = str(e) or e.__class__.__name__
+            state.phase = CONNECTING  # the caller reconnects right away
+            if self.scheduler is not None:
+                self.scheduler.record_failure(state.name, state.boundary)
+            self._mark_gap(state, GAP_TIMEOUT)
+            self._emit_gap(state, state.boundary, rows=True)
+            return False
+
+        state.polls += 1
+        if self.scheduler is not None:
+            self.scheduler.record_success(
+                state.name, state.boundary, down, up, reader.link_max_dl, reader.link_max_ul
+            )
+        history = reader.history
+        data = {
+            "router": state.name,
+            "down": down,
+            "up": up,
+            "max_dl": reader.max_dl,
+            "max_ul": reader.max_ul,
+            # Delta copied in the only thread that appends to this history.
+            "rows": history.since(state.emitted_seq),
+            "seq": history.total,
+            "capacity": history.capacity,
+            "method": reader.sample_method,
+            "error": None,
+        }
+        state.emitted_seq = history.total
+        if state.connect_started is not None:
+            data["first_sample_ms"] = (time.perf_counter() - state.connect_started) * 1000
+            state.connect_started = None
+            print(f"[Poller] {state.name}: time to first sample: {data['first_sample_ms']:.0f} ms")
+        if not self._closed:
+            self.on_sample(data)
+        return True
+
+    def _emit_gap(self, state: RouterState, boundary: float | None, rows: bool = False) -> None:
+        # *rows* only from the router's pool task, the history's writer.
+        if self._closed:
+            return
+        state.gaps += 1
+        offline = state.phase == OFFLINE
+        data = {
+            "router": state.name,
+            "gap": True,
+            "reason": "disconnected" if offline else "connecting",
+            "time": boundary if boundary is not None else time.time(),
+            "retry_in": max(state.retry_at - time.time(), 0.0) if offline else None,
+            "error": state.last_error or "Not connected",
+        }
+        history = state.reader.history
+        if rows and history.total > state.emitted_seq:
+            data["rows"] = history.since(state.emitted_seq)
+            data["seq"] = history.total
+            data["capacity"] = history.capacity
+            state.emitted_seq = history.total
+        self.on_sample(data)
@@ -0,0 +1,235 @@
+"""
+fritzquery.py
+=============
+Range queries over the recorded history: samples between two times at a
+chosen resolution.
+
+Usage::
+
+    from fritzquery import HistoryQuery
+
+    with HistoryQuery.open() as history:          # configured store + rollups
+        t, dl, ul = history.query("FRITZ!Box", start, end, resolution=900, agg="max")
+
+The GUI uses the same object (:attr:`fritzworker.FritzWorker.history`) for
+its time ranges and the startup backfill.
+
+Sources
+-------
+:meth:`HistoryQuery.query` picks the cheapest source that has the requested
+resolution:
+
+* **Raw samples** (``resolution=None``) come from the sample store
+  (:mod:`fritzstore` / :mod:`fritzblocks`); without a store, or when it has
+  nothing in the range, from the finest rollup tier instead.
+* **Aggregates** come from the coarsest rollup tier (:data:`fritzrollup.TIERS`)
+  that is not coarser than *resolution* and still reaches back to *start*;
+  if no tier fits that well, the finest one that covers *start*.  A
+  resolution between two tier widths is built from the finer tier,
+  one below the finest tier from the raw samples.
+
+Buckets of the source are merged into bins of *resolution* seconds aligned
+to multiples of it (sum / count / min / max combine exactly), then *agg*
+selects ``avg``, ``min`` or ``max`` per bin.
+
+Gaps
+----
+Raw results keep the gap rows of the store (``NaN`` rates, see
+:data:`fritzhistory.GAP_REASONS`).  Aggregation skips them without a
+Python loop: a gap row becomes a bucket with ``count = 0``, zero sums and
+±∞ as min / max, which drop out of every combination; a bin with no valid
+sample at all comes out as ``NaN``, so plots break there too.  The rollups
+never contain gap rows.
+
+Lookups never scan a whole source: the stores find the range by binary
+search on the timestamps (or the block index / SQLite index), and a rollup
+tier is addressed directly by bucket number (see
+:meth:`fritzrollup.Rollups.read`).  Binning the sorted result is one
+vectorised ``reduceat`` pass.
+"""
+
+import time
+
+import numpy as np
+
+from fritzrollup import BUCKET_DTYPE, TIERS, RollupStore
+from fritzstore import DATA_DIR, open_store
+
+#: Aggregations :meth:`HistoryQuery.query` accepts.
+AGGREGATES = ("avg", "min", "max")
+
+
+def _as_buckets(records: np.ndarray) -> np.ndarray:
+    # Raw records as one-sample buckets; gap rows as empty ones.
+    buckets = np.zeros(len(records), dtype=BUCKET_DTYPE)
+    buckets["t"] = records["t"]
+    valid = np.isfinite(records["dl"]) & np.isfinite(records["ul"])
+    buckets["count"] = valid
+    for d in ("dl", "ul"):
+        buckets[d + "_sum"] = np.where(valid, records[d], 0.0)
+        buckets[d + "_min"] = np.where(valid, records[d], np.inf)
+        buckets[d + "_max"] = np.where(valid, records[d], -np.inf)
+    return buckets
+
+
+def rebin(buckets: np.ndarray, width: float) -> np.ndarray:
+    """Merge time-sorted :data:`~fritzrollup.BUCKET_DTYPE` *buckets* into bins of *width* seconds.
+
+    Bin *k* covers ``[k · width, (k + 1) · width)``; empty bins are left
+    out.
+    """
+    if not len(buckets):
+        return buckets
+    k = np.floor(buckets["t"] / width)
+    starts = np.flatnonzero(np.diff(k, prepend=-np.inf))   # first bucket of each bin
+    out = np.zeros(len(starts), dtype=BUCKET_DTYPE)
+    out["t"] = k[starts] * width
+    out["count"] = np.add.reduceat(buckets["count"], starts)
+    for d in ("dl", "ul"):
+        out[d + "_sum"] = np.add.reduceat(buckets[d + "_sum"], starts)
+        out[d + "_min"] = np.minimum.reduceat(buckets[d + "_min"], starts)
+        out[d + "_max"] = np.maximum.reduceat(buckets[d + "_max"], starts)
+    return out
+
+
+def aggregate(buckets: np.ndarray, agg: str = "avg") -> tuple:
+    """Return ``(t, dl, ul)`` of *buckets* with *agg* (``"avg"``, ``"min"``, ``"max"``).
+
+    ``t`` is the bucket start (``float64``), the rates are ``float32``;
+    buckets without a valid sample give ``NaN``.
+    """
+    count = buckets["count"]
+    if agg == "avg":
+        dl = buckets["dl_sum"] / np.maximum(count, 1)
+        ul = buckets["ul_sum"] / np.maximum(count, 1)
+    else:
+        dl, ul = buckets["dl_" + agg], buckets["ul_" + agg]
+    empty = count == 0
+    return (buckets["t"].copy(), np.where(empty, np.nan, dl).astype(np.float32),
+            np.where(empty, np.nan, ul).astype(np.float32))
+
+
+class HistoryQuery:
+    """Query samples and aggregates of the sample store and the rollups.
+
+    Parameters
+    ----------
+    store : LogStore | SQLiteStore | BlockStore | None
+        Source of the raw samples.
+    rollups : RollupStore | None
+        Source of the aggregates.
+    """
+
+    def __init__(self, store=None, rollups=None) -> None:
+        self.store = store
+        self.rollups = rollups
+        self._owned = False
+
+    @classmethod
+    def open(cls, directory=None, kind: str | None = None) -> "HistoryQuery":
+        """Open the store and rollups in *directory* read-only for a script.
+
+        The files are left exactly as the monitor writes them (see
+        :func:`~fritzstore.open_store`), so a script may run next to it.
+
+        Parameters
+        ----------
+        directory : str | Path | None
+            Data directory; default :data:`~fritzstore.DATA_DIR`.
+        kind : str | None
+            Store backend; default ``[APP] history_store`` of ``config.ini``.
+
+        Raises
+        ------
+        OSError, sqlite3.Error
+            When the store cannot be opened.
+        """
+        if kind is None:
+            from config import Config
+            kind = Config().get_history_store()
+        store = open_store(kind, directory, read_only=True)
+        rollups = RollupStore((directory or DATA_DIR) if store is not None else None, read_only=True)
+        query = cls(store, rollups)
+        query._owned = True
+        return query
+
+    def close(self) -> None:
+        """Close the sources opened by :meth:`open` (no-op otherwise)."""
+        if self._owned:
+            if self.store is not None:
+                self.store.close()
+            self.rollups.close()
+            self._owned = False
+
+    def __enter__(self) -> "HistoryQuery":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def tier(self, resolution: float, start: float, now: float | None = None) -> int:
+        """Return the width of the rollup tier :meth:`query` reads for *resolution*.
+
+        The coarsest tier not coarser than *resolution* whose span reaches
+        back to *start*; else the finest tier that does; else the coarsest.
+        """
+        now = time.time() if now is None else now
+        covering = [w for w, slots in TIERS if now - w * slots <= start]
+        fitting = [w for w in covering if w <= resolution]
+        if fitting:
+            return max(fitting)
+        return min(covering) if covering else TIERS[-1][0]
+
+    def query(self, router: str, start: float, end: float | None = None,
+              resolution: float | None = None, agg: str = "avg") -> tuple:
+        """Return *router*'s samples in ``[start, end]`` at *resolution*.
+
+        Parameters
+        ----------
+        start, end : float
+            Wall-clock bounds; *end* defaults to now.
+        resolution : float | None
+            Bin width in seconds; ``None`` (or 0) for the raw samples.
+        agg : str
+            One of :data:`AGGREGATES`; ignored for raw samples.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            ``(t, dl, ul)``: times (raw sample or bin start, ``float64``) and
+            rates in Mbit/s (``float32``), oldest first; ``NaN`` for gap
+            rows and bins without a valid sample.
+
+        Raises
+        ------
+        ValueError
+            For an unknown *agg* or a negative *resolution*.
+        """
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unknown aggregation: {agg}")
+        if resolution is not None and resolution < 0:
+            raise ValueError("resolution must not be negative")
+        now = time.time()
+        end = now if end is None else end
+        finest = TIERS[0][0]
+
+        if not resolution or (resolution < finest and self.store is not None):
+            records = self.store.read(router, start, end) if self.store is not None else ()
+            if len(records):
+                if not resolution:
+                    return tuple(records[c].astype(d) for c, d in (("t", np.float64), ("dl", np.float32),
+                                                                   ("ul", np.float32)))
+                return aggregate(rebin(_as_buckets(records), resolution), agg)
+            if not resolution:
+                # Nothing stored: the finest averages are the closest thing.
+                resolution, agg = finest, "avg"
+
+        if self.rollups is None:
+            return np.zeros(0), np.zeros(0, np.float32), np.zeros(0, np.float32)
+        width = self.tier(max(resolution, finest), start, now)
+        buckets = self.rollups.read(router, width, start, end)
+        if resolution > width:
+            buckets = rebin(buckets, resolution)
+        # Drop bins that end before *start*; partly covered ones stay.
+        first = int(np.searchsorted(buckets["t"], start - max(resolution, width), "right"))
+        return aggregate(buckets[first:], agg)
@@ -8,8 +8,8 @@ exposes a clean, unit-testable API to the rest of the application.
 
 Bandwidth measurement
 ---------------------
-Three independent methods are tried in order of preference.  If a method
-raises an exception **or** returns ``(None, None)``, the next one is
+Three independent methods are available, listed in order of preference.  If
+a method raises an exception **or** returns ``(None, None)``, the next one is
 attempted automatically.  This three-tier fallback ensures compatibility
 across FRITZ!Box firmware versions and model families:
 
@@ -22,22 +22,207 @@ across FRITZ!Box firmware versions and model families:
    Available on more recent firmware versions.
 
 3. :meth:`FritzReader._get_bandwidth_total_bytes`
-   Derives rates from cumulative byte counters using ``GetTotalBytesReceived``
-   / ``GetTotalBytesSent`` and a wall-clock time delta.  Always available but
-   requires two successive calls to produce a result.
+   Derives rates from cumulative byte counters via :class:`ByteCounter`.
+   Both directions are read with a single ``GetAddonInfos`` call (64-bit
+   ``X_AVM_DE_TotalBytes*64`` fields) where available, otherwise with
+   ``GetTotalBytesReceived`` / ``GetTotalBytesSent``.  Always available but
+   requires two successive samples to produce a result.
+
+Byte counters
+-------------
+:class:`ByteCounter` turns a cumulative counter into the exact average rate
+between two samples.  Each reading is timestamped with the midpoint of its
+request on the monotonic clock, so neither wall-clock jumps nor request
+latency skew the interval.  32-bit counters wrap every ≈34 s at 1 Gbit/s;
+a decreasing 32-bit value is therefore treated as one wrap-around, while a
+decreasing 64-bit value (router reboot) starts a new baseline.
+
+A rate is only taken from two readings of consecutive samples.  The
+counters are reset on :meth:`FritzReader.connect` and at the start of every
+sample whose predecessor did not read them (another method was active, or
+the reading failed); otherwise a re-probe would average over minutes – or
+an outage – during which a 32-bit counter may have wrapped several times.
+A reading that only sets the new baseline counts as a success for the
+method ranking but never becomes the sample.
+
+Sticky method selection
+-----------------------
+Walking the full list on every tick would cost two or three SOAP round-trips
+per sample on firmware where the preferred method is unsupported.  The reader
+therefore remembers the method that works on the connected box
+(:attr:`FritzReader.active_method`) and calls only that one in steady state.
+The other methods are probed again
+
+* every :data:`METHOD_REPROBE_INTERVAL` samples, where every method is called
+  once and the best one by success rate and latency is kept, and
+* after :data:`METHOD_FAILURE_LIMIT` consecutive failures of the active
+  method, where the list is walked in order of preference as before.
+
+Per-method statistics are kept in :class:`MethodStats` and exposed via
+:meth:`FritzReader.get_method_stats`.
+
+Transport
+---------
+All TR-064 requests go through :class:`~fritztransport.PooledFritzConnection`,
+which keeps one persistent, digest-authenticated HTTP/1.1 session per router
+in a process-wide pool.  The session – and with it the open TCP connection
+and the digest nonce – survives :meth:`FritzReader.connect` / reconnect
+cycles.  Re-use statistics are available via
+:meth:`FritzReader.get_transport_stats`.
+
+fritzconnection (and with it ``requests``) is imported by the first
+:meth:`FritzReader.connect`, not with this module, so the GUI can show its
+window before the worker thread pays for that import.
 
 Plausibility filter
 -------------------
 Each successfully obtained value pair is compared against 150 % of the
-reported line capacity.  Values outside that range are silently discarded
-and replaced by the most recent valid measurement to prevent spurious spikes
-in the graph.  If no prior measurement exists, ``(0.0, 0.0)`` is used.
+reported line capacity.  Values outside that range are discarded; the
+history gets a gap row (:data:`~fritzhistory.GAP_IMPLAUSIBLE`, ``NaN``
+rates) instead of a repeated or invented value, and ``(nan, nan)`` is
+returned.  The same happens with :data:`~fritzhistory.GAP_TIMEOUT` when no
+measurement method delivers a value.
+
+History
+-------
+Samples are stored with their wall-clock time in a preallocated
+:class:`~fritzhistory.HistoryBuffer` (:attr:`FritzReader.history`), so
+appending is O(1) and the plot reads NumPy columns without conversion.
+
+The router keeps a short rate history of its own: ``X_AVM-DE_GetOnlineMonitor``
+returns the last values per direction (newest first, every
+:data:`ONLINE_MONITOR_INTERVAL` seconds).  :meth:`FritzReader.get_recent_samples`
+turns them into timestamped rows, which the poller uses to fill the history
+right after a connect.
 """
 
-from fritzconnection import FritzConnection
-from collections import deque
+from fritzhistory import GAP_DISCONNECTED, GAP_IMPLAUSIBLE, GAP_TIMEOUT, HistoryBuffer
+from dataclasses import dataclass
 import time
 
+#: Default number of samples kept per router (12 minutes at 2 s).
+HISTORY_SIZE = 360
+
+#: Consecutive failures after which the active method is dropped and the
+#: full method list is walked again on the next sample.
+METHOD_FAILURE_LIMIT = 3
+
+#: Number of samples between two full re-probes of all measurement methods.
+#: At the default 2 s refresh interval this is roughly every 10 minutes.
+METHOD_REPROBE_INTERVAL = 300
+
+#: Spacing in seconds of the values in the router's own rate lists
+#: (``X_AVM-DE_GetOnlineMonitor``), see :meth:`FritzReader.get_recent_samples`.
+ONLINE_MONITOR_INTERVAL = 5.0
+
+#: Name of the byte-counter method, whose first reading only sets a baseline.
+_COUNTER_METHOD = "_get_bandwidth_total_bytes"
+
+#: Weight of the newest call in the exponentially smoothed latency.
+_LATENCY_ALPHA = 0.2
+
+
+class ByteCounter:
+    """Convert a cumulative byte counter into an average rate in Mbit/s.
+
+    The rate returned by :meth:`update` is the exact average over the
+    interval since the previous reading: ``Δbytes · 8 / Δt``.
+
+    Wrap-around handling depends on the counter width passed with each
+    reading.  A 32-bit counter that decreased is assumed to have wrapped
+    exactly once (the sampling interval must stay below the wrap period,
+    ≈34 s at 1 Gbit/s).  A 64-bit counter never wraps in practice, so a
+    decrease means the router restarted and the reading becomes the new
+    baseline.
+    """
+
+    def __init__(self) -> None:
+        self.value: int | None = None
+        self.time: float = 0.0
+        self.bits: int = 0
+
+    def reset(self) -> None:
+        """Forget the baseline; the next :meth:`update` returns ``None``."""
+        self.value = None
+
+    def update(self, value: int, t: float, bits: int = 64):
+        """Feed one reading and return the average rate since the last one.
+
+        Parameters
+        ----------
+        value : int
+            Cumulative byte count.
+        t : float
+            Reading time on the :func:`time.monotonic` clock, ideally the
+            midpoint of the request.
+        bits : int
+            Counter width, ``32`` or ``64``.
+
+        Returns
+        -------
+        float | None
+            Rate in Mbit/s, or ``None`` when this reading only established a
+            baseline (first reading, counter width changed, 64-bit reset or
+            non-increasing timestamp).
+        """
+        prev, prev_t, prev_bits = self.value, self.time, self.bits
+        self.value, self.time, self.bits = value, t, bits
+        if prev is None or bits != prev_bits or t <= prev_t:
+            return None
+        delta = value - prev
+        if delta < 0:
+            if bits >= 64:
+                return None  # counter reset (reboot) – new baseline
+            delta += 1 << bits
+        return delta * 8 / (t - prev_t) / 1_000_000
+
+
+@dataclass
+class MethodStats:
+    """Success and latency statistics of one bandwidth measurement method.
+
+    Attributes
+    ----------
+    calls : int
+        Total number of invocations.
+    successes : int
+        Invocations that produced a usable ``(rx, tx)`` pair.
+    consecutive_failures : int
+        Failures since the last success; reset to ``0`` on success.
+    latency : float
+        Exponentially smoothed call duration in seconds (``0.0`` until the
+        first call completed).
+    last_error : str
+        Message of the most recent exception, or ``""``.
+    """
+
+    calls: int = 0
+    successes: int = 0
+    consecutive_failures: int = 0
+    latency: float = 0.0
+    last_error: str = ""
+
+    @property
+    def success_rate(self) -> float:
+        """Fraction of successful calls (``0.0`` when never called)."""
+        return self.successes / self.calls if self.calls else 0.0
+
+    def record(self, ok: bool, duration: float, error: str = "") -> None:
+        """Account for one finished call that took *duration* seconds."""
+        self.calls += 1
+        if self.latency == 0.0:
+            self.latency = duration
+        else:
+            self.latency += _LATENCY_ALPHA * (duration - self.latency)
+        if ok:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.last_error = ""
+        else:
+            self.consecutive_failures += 1
+            if error:
+                self.last_error = error
+
 
 class FritzReader:
     """Manages a single TR-064 connection and provides bandwidth data.
@@ -51,9 +236,11 @@ class FritzReader:
     password : str
         Router password.
     history_size : int
-        Maximum number of ``(dl, ul)`` measurement tuples retained in
-        :attr:`history`.  At the default rate of one measurement every
-        2 seconds, 360 entries cover the last 12 minutes.
+        Maximum number of samples retained in :attr:`history`.  At the
+        default rate of one measurement every 2 seconds, 360 entries cover
+        the last 12 minutes; 86 400 entries (24 h at 1 s) take about 1.4 MB.
+    port : int | None
+        TR-064 port; ``None`` uses the fritzconnection default (49000).
     """
 
     def __init__(
@@ -61,22 +248,37 @@ class FritzReader:
         address: str,
         username: str,
         password: str,
-        history_size: int = 360,
+        history_size: int = HISTORY_SIZE,
+        port: int | None = None,
     ) -> None:
         self.address = address
         self.username = username
         self.password = password
+        self.port = port
 
-        #: Ring buffer of ``(dl_mbit, ul_mbit)`` tuples (most recent last).
-        self.history: deque = deque(maxlen=history_size)
+        #: Ring buffer of ``(t, dl_mbit, ul_mbit)`` rows (most recent last).
+        self.history = HistoryBuffer(history_size)
 
         #: Active :class:`fritzconnection.FritzConnection` or ``None``.
-        self.fc: FritzConnection | None = None
-
-        # Internal state for the delta-byte fallback method
-        self.last_rx_bytes: int = 0
-        self.last_tx_bytes: int = 0
-        self.last_time: float = 0.0
+        self.fc = None
+
+        # Internal state for the byte-counter method
+        self._rx_counter = ByteCounter()
+        self._tx_counter = ByteCounter()
+        #: Number of :meth:`get_bandwidth` rounds so far, and the round of
+        #: the counters' baseline reading (``-1`` = none).
+        self._round: int = 0
+        self._counter_round: int = -1
+        #: Methods whose call in the current round only set a baseline.
+        self._baselines: set = set()
+        #: ``False`` once ``GetAddonInfos`` turned out to lack byte counters,
+        #: so the counter method stops trying it first.
+        self._addon_counters: bool = True
+
+        #: Duration of the last successful :meth:`connect` in seconds.
+        self.connect_duration: float = 0.0
+        #: ``True`` when the last :meth:`connect` used the description cache.
+        self.cache_hit: bool = False
 
         #: When ``True``, successful method names are printed to stdout.
         self.debug: bool = False
@@ -91,12 +293,28 @@ class FritzReader:
         #: Upstream line capacity in Mbit/s (read once at connect time).
         self.link_max_ul: float = 0.0
 
+        #: Measurement methods in order of preference.
+        self._methods = [
+            self._get_bandwidth_addon_infos,
+            self._get_bandwidth_traffic_stats,
+            self._get_bandwidth_total_bytes,
+        ]
+        #: Per-method statistics, keyed by method name.
+        self.method_stats: dict = {m.__name__: MethodStats() for m in self._methods}
+        #: Method used in steady state, or ``None`` until one succeeded.
+        self.active_method = None
+        #: Name of the method that produced the last sample (``None`` when
+        #: all methods failed) – stored with the sample by :mod:`fritzstore`.
+        self.sample_method: str | None = None
+        self._samples_since_probe: int = 0
+        self._last_call_error: Exception | None = None
+
     # ------------------------------------------------------------------
     # Constructors
     # ------------------------------------------------------------------
 
     @classmethod
-    def from_config(cls, config_obj, history_size: int = 360) -> "FritzReader":
+    def from_config(cls, config_obj, history_size: int = HISTORY_SIZE) -> "FritzReader":
         """Create a :class:`FritzReader` from a :class:`~config.Config` object.
 
         Parameters
@@ -110,9 +328,20 @@ class FritzReader:
         address, username, password = config_obj.get_fritzbox_credentials()
         return cls(address, username, password, history_size=history_size)
 
+    @classmethod
+    def from_settings(cls, settings, history_size: int = HISTORY_SIZE) -> "FritzReader":
+        """Create a :class:`FritzReader` from a :class:`~config.RouterSettings`.
+
+        Used for the routers returned by :meth:`config.Config.get_routers`.
+        """
+        return cls(
+            settings.address, settings.username, settings.password,
+            history_size=history_size, port=settings.port,
+        )
+
     @classmethod
     def from_device_info(
-        cls, device_info, config_obj, history_size: int = 360
+        cls, device_info, config_obj, history_size: int = HISTORY_SIZE
     ) -> "FritzReader":
         """Create a :class:`FritzReader` from a discovery result.
 
@@ -146,22 +375,42 @@ class FritzReader:
 
         The connection timeout is intentionally generous (12 s) to handle
         FRITZ!Boxes reachable only via slow VPN tunnels, where fetching the
-        42+ service descriptions can take several seconds.
+        42+ service descriptions can take several seconds.  The HTTP session
+        is taken from :data:`~fritztransport.SESSION_POOL`, so a reconnect
+        re-uses the already open and authenticated connection, and the
+        service descriptions come from the :mod:`fritzcache` on-disk cache
+        whenever model and firmware are unchanged.  The elapsed time is
+        stored in :attr:`connect_duration`.
+
+        On a reconnect the previous connection stays in :attr:`fc` until the
+        new one is fully set up; after a failed attempt it is left in place,
+        so callers never see a half-initialised connection.
 
         Returns
         -------
         bool
             ``True`` on success, ``False`` when any exception occurs.
         """
+        t0 = time.perf_counter()
+        self._reset_counters()
         try:
-            self.fc = FritzConnection(
+            from fritztransport import PooledFritzConnection
+            fc = PooledFritzConnection(
                 address=self.address,
+                port=self.port,
                 user=self.username,
                 password=self.password,
                 timeout=12.0,
             )
-            print(f"[FritzReader] Connected to {self.fc.modelname} at {self.fc.address}")
-            self._fetch_link_properties()
+            self._fetch_link_properties(fc)
+            self.fc = fc
+            self.cache_hit = fc.cache_hit
+            self.connect_duration = time.perf_counter() - t0
+            print(
+                f"[FritzReader] Connected to {fc.modelname} at {fc.address} "
+                f"in {self.connect_duration:.2f} s"
+                f"{' (description cache)' if self.cache_hit else ''}"
+            )
             return True
         except Exception as e:
             print(f"[FritzReader] Connection error: {e}")
@@ -174,10 +423,19 @@ class FritzReader:
     def get_bandwidth(self) -> tuple:
         """Return the current ``(download, upload)`` rate in Mbit/s.
 
-        Tries up to three measurement methods in order.  Each method can
-        signal "not available" by returning ``(None, None)`` – in that case
-        the next method is tried.  After all methods are exhausted,
-        ``(0.0, 0.0)`` is stored in the history and returned.
+        In steady state only :attr:`active_method` is called.  When no
+        method is active yet, or the active one fails, the remaining
+        methods are tried in order of preference; each method can signal
+        "not available" by returning ``(None, None)``.  Every
+        :data:`METHOD_REPROBE_INTERVAL` samples all methods are probed and
+        re-ranked (see module docstring).  After all methods are exhausted,
+        a gap row (:data:`~fritzhistory.GAP_TIMEOUT`) is stored in the
+        history and ``(nan, nan)`` returned – unless the
+        last call failed on the transport (router unreachable), in which
+        case nothing is stored and :class:`ConnectionError` is raised so that
+        the caller can reconnect.  Without a connection (:meth:`connect`
+        not called or failed) a :data:`~fritzhistory.GAP_DISCONNECTED` row is
+        stored and ``(nan, nan)`` returned – never a measured-looking zero.
 
         The returned values are additionally filtered by the plausibility
         check (see module docstring).
@@ -185,59 +443,231 @@ class FritzReader:
         Returns
         -------
         tuple[float, float]
-            ``(dl_mbit, ul_mbit)`` rounded to two decimal places.
+            ``(dl_mbit, ul_mbit)`` rounded to two decimal places; ``NaN``
+            when the round produced a gap row.
+
+        Raises
+        ------
+        ConnectionError
+            When the router did not answer at all.
         """
         if not self.fc:
-            return 0.0, 0.0
+            return self._disconnected_sample()
+        plan = self._method_plan()
+        try:
+            method = next(plan)
+            while True:
+                method = plan.send(self._call_method(method))
+        except StopIteration as stop:
+            return self._finish_sample(stop.value)
 
-        methods = [
-            self._get_bandwidth_addon_infos,
-            self._get_bandwidth_traffic_stats,
-            self._get_bandwidth_total_bytes,
-        ]
+    def get_method_stats(self) -> dict:
+        """Return per-method statistics for diagnostics.
 
-        for method in methods:
-            try:
-                rx, tx = method()
-                if rx is None or tx is None:
-                    continue  # Method signalled "not available"
-
-                # --- Plausibility filter ---
-                # Values exceeding 150 % of the rated line capacity are almost
-                # certainly measurement artefacts (counter overflow, firmware
-                # bug, etc.).  Replace them with the last known-good reading.
-                brutto_limit_dl = (self.link_max_dl * 1.5) if self.link_max_dl > 0 else 2000
-                brutto_limit_ul = (self.link_max_ul * 1.5) if self.link_max_ul > 0 else 2000
-
-                if rx < 0 or tx < 0 or rx > brutto_limit_dl or tx > brutto_limit_ul:
-                    print(
-                        f"[FritzReader] Implausible value discarded: "
-                        f"DL={rx:.2f} UL={tx:.2f} Mbit/s – repeating last good value."
-                    )
-                    if self.history:
-                        last_good = self.history[-1]
-                        self.history.append(last_good)
-                        return last_good
-                    else:
-                        self.history.append((0.0, 0.0))
-                        return 0.0, 0.0
-
-                rx_r, tx_r = round(rx, 2), round(tx, 2)
-                self.history.append((rx_r, tx_r))
-                self.max_dl = max(self.max_dl, rx_r)
-                self.max_ul = max(self.max_ul, tx_r)
-                if self.debug:
-                    print(f"[FritzReader] Successful method: {method.__name__}")
-                return rx_r, tx_r
+        Returns
+        -------
+        dict[str, dict]
+            Keyed by method name, each value holding ``calls``,
+            ``success_rate`` (0 – 1), ``latency_ms`` (smoothed),
+            ``consecutive_failures``, ``last_error`` and ``active`` (bool).
+        """
+        active = self.active_method.__name__ if self.active_method else None
+        return {
+            name: {
+                "calls": st.calls,
+                "success_rate": st.success_rate,
+                "latency_ms": st.latency * 1000,
+                "consecutive_failures": st.consecutive_failures,
+                "last_error": st.last_error,
+                "active": name == active,
+            }
+            for name, st in self.method_stats.items()
+        }
+
+    def _method_plan(self):
+        """Generator implementing the method selection of :meth:`get_bandwidth`.
+
+        Yields the measurement method to call next and receives its result
+        (``(rx, tx)`` or ``None``) via ``send()``.  The generator's return
+        value is the final ``(rx, tx)`` pair, or ``None`` when all methods
+        failed.  Keeping the selection logic free of I/O lets the blocking
+        and the asyncio reader (:class:`fritzasync.AsyncFritzReader`) share
+        it; each only supplies its own :meth:`_call_method`.
+        """
+        self._round += 1
+        self._baselines.clear()
+        if self._counter_round != self._round - 1:
+            self._reset_counters()   # no reading in the previous round
+        self._samples_since_probe += 1
+        if self.active_method is not None and self._samples_since_probe >= METHOD_REPROBE_INTERVAL:
+            self._samples_since_probe = 0
+            result = yield from self._reprobe_plan()
+            if result is not None:
+                return result
+
+        tried = set()
+        if self.active_method is not None:
+            tried.add(self.active_method)
+            result = yield self.active_method
+            if result is not None:
+                return result
+            if self.method_stats[self.active_method.__name__].consecutive_failures >= METHOD_FAILURE_LIMIT:
+                print(
+                    f"[FritzReader] Method '{self.active_method.__name__}' failed "
+                    f"{METHOD_FAILURE_LIMIT}x in a row – probing all methods again."
+                )
+                self.active_method = None
+
+        for method in self._methods:
+            if method in tried:
+                continue
+            result = yield method
+            if result is not None:
+                if self.active_method is None:
+                    self.active_method = method
+                    self._samples_since_probe = 0
+                return result
+        return None
+
+    def _reset_counters(self) -> None:
+        """Drop the byte-counter baselines (see module docstring)."""
+        self._rx_counter.reset()
+        self._tx_counter.reset()
+        self._counter_round = -1
+
+    def _call_method(self, method):
+        """Invoke one measurement *method* and record its statistics.
 
-            except Exception as e:
-                if self.debug:
-                    print(f"[FritzReader] Method '{method.__name__}' failed: {e}")
-                continue  # Try next method
+        Returns
+        -------
+        tuple[float, float] | None
+            ``(rx, tx)`` in Mbit/s, or ``None`` when the method raised or
+            signalled "not available".
+        """
+        t0 = time.perf_counter()
+        try:
+            result = method()
+        except Exception as e:
+            return self._record_call(method, None, time.perf_counter() - t0, e)
+        return self._record_call(method, result, time.perf_counter() - t0)
+
+    def _record_call(self, method, result, duration: float, error: Exception | None = None):
+        """Update :attr:`method_stats` for one finished call of *method*.
+
+        Returns ``(rx, tx)`` when *result* is a usable pair, else ``None``.
+        """
+        stats = self.method_stats[method.__name__]
+        self._last_call_error = error
+        if error is not None:
+            message = str(error) or error.__class__.__name__
+            stats.record(False, duration, message)
+            if self.debug:
+                print(f"[FritzReader] Method '{method.__name__}' failed: {message}")
+            return None
+        rx, tx = result
+        ok = rx is not None and tx is not None
+        # Counter reading of this round that only set the baseline: the
+        # method works, but has no rate for this sample.
+        baseline = not ok and method.__name__ == _COUNTER_METHOD and self._counter_round == self._round
+        stats.record(ok or baseline, duration)
+        if baseline:
+            self._baselines.add(method)
+        if not ok:
+            return None  # Method signalled "not available"
+        if self.debug:
+            print(f"[FritzReader] Successful method: {method.__name__}")
+        self.sample_method = method.__name__
+        return rx, tx
+
+    def _reprobe_plan(self):
+        """Call every method once and make the best-ranked one active.
+
+        Sub-generator of :meth:`_method_plan`.  A different method replaces
+        :attr:`active_method` only when it has a clearly higher success rate
+        (≥ 10 percentage points) or the same rate at less than 75 % of the
+        active method's latency.  This hysteresis avoids flapping between
+        methods of similar quality.  A method that only set a counter
+        baseline takes part in the ranking, but the sample then comes from
+        another method.
+
+        Returns
+        -------
+        tuple[float, float] | None
+            The sample produced by the (new) active method, or by any method
+            that succeeded when the active one did not; ``None`` when all
+            methods failed.
+        """
+        results = {}
+        for method in self._methods:
+            result = yield method
+            if result is not None:
+                results[method] = result
+        if not results:
+            return None
+
+        candidates = [m for m in self._methods if m in results or m in self._baselines]
+        best = self.active_method if self.active_method in candidates else None
+        for method in candidates:
+            if best is None:
+                best = method
+                continue
+            cand, cur = self.method_stats[method.__name__], self.method_stats[best.__name__]
+            if cand.success_rate >= cur.success_rate + 0.1 or (
+                abs(cand.success_rate - cur.success_rate) < 0.1
+                and cand.latency < cur.latency * 0.75
+            ):
+                best = method
+
+        source = best
+        if source not in results:
+            # Baseline only: the rate comes from the next sample on.
+            source = self.active_method if self.active_method in results else next(iter(results))
+        if best is not self.active_method:
+            print(f"[FritzReader] Switching measurement method to '{best.__name__}'.")
+            self.active_method = best
+        self.sample_method = source.__name__
+        return results[source]
+
+    def _disconnected_sample(self) -> tuple:
+        # get_bandwidth() without a connection: a gap, not 0 Mbit/s.
+        self.sample_method = None
+        self.history.append_gap(time.time(), GAP_DISCONNECTED)
+        return float("nan"), float("nan")
+
+    def _finish_sample(self, result) -> tuple:
+        """Store the outcome of one :meth:`get_bandwidth` round."""
+        if result is None:
+            if isinstance(self._last_call_error, OSError):
+                # Timeouts and refused / reset connections: no answer at all.
+                raise ConnectionError(f"Router unreachable: {self._last_call_error}")
+            print("[FritzReader] All bandwidth methods failed.")
+            self.sample_method = None
+            self.history.append_gap(time.time(), GAP_TIMEOUT)
+            return float("nan"), float("nan")
+        return self._accept_sample(*result)
+
+    def _accept_sample(self, rx: float, tx: float) -> tuple:
+        """Apply the plausibility filter and store an accepted sample."""
+        # --- Plausibility filter ---
+        # Values exceeding 150 % of the rated line capacity are almost
+        # certainly measurement artefacts (counter overflow, firmware
+        # bug, etc.).  They become a gap, not a repeated old reading.
+        brutto_limit_dl = (self.link_max_dl * 1.5) if self.link_max_dl > 0 else 2000
+        brutto_limit_ul = (self.link_max_ul * 1.5) if self.link_max_ul > 0 else 2000
+
+        if rx < 0 or tx < 0 or rx > brutto_limit_dl or tx > brutto_limit_ul:
+            print(
+                f"[FritzReader] Implausible value discarded: "
+                f"DL={rx:.2f} UL={tx:.2f} Mbit/s – recorded as gap."
+            )
+            self.history.append_gap(time.time(), GAP_IMPLAUSIBLE)
+            return float("nan"), float("nan")
 
-        print("[FritzReader] All bandwidth methods failed.")
-        self.history.append((0.0, 0.0))
-        return 0.0, 0.0
+        rx_r, tx_r = round(rx, 2), round(tx, 2)
+        self.history.append(time.time(), rx_r, tx_r)
+        self.max_dl = max(self.max_dl, rx_r)
+        self.max_ul = max(self.max_ul, tx_r)
+        return rx_r, tx_r
 
     # ------------------------------------------------------------------
     # Private measurement methods
@@ -246,6 +676,68 @@ class FritzReader:
     def _get_bandwidth_addon_infos(self) -> tuple:
         """Method 1: Read instantaneous byte rates from ``GetAddonInfos``.
 
+        See :meth:`_rates_from_addon_infos` for the evaluation.
+        """
+        return self._rates_from_addon_infos(self.fc.call_action("WANCommonIFC1", "GetAddonInfos"))
+
+    def _get_bandwidth_traffic_stats(self) -> tuple:
+        """Method 2: Read current rates from ``X_AVM-DE_GetOnlineMonitor``.
+
+        See :meth:`_rates_from_online_monitor` for the evaluation.
+        """
+        return self._rates_from_online_monitor(
+            self.fc.call_action("WANCommonIFC1", "X_AVM-DE_GetOnlineMonitor")
+        )
+
+    def _get_bandwidth_total_bytes(self) -> tuple:
+        """Method 3: Derive rates from cumulative byte counters.
+
+        Prefers a single ``GetAddonInfos`` call, which returns both
+        directions at once – as 64-bit ``NewX_AVM_DE_TotalBytes*64`` values
+        on current firmware, else as 32-bit ``NewTotalBytes*``.  Falls back
+        to separate ``GetTotalBytesReceived`` / ``GetTotalBytesSent`` calls
+        (32-bit), each timed individually.
+
+        The first reading establishes the baseline and returns
+        ``(None, None)``; see :class:`ByteCounter` for the rate arithmetic.
+        """
+        if self._addon_counters:
+            t0 = time.monotonic()
+            status = self.fc.call_action("WANCommonIFC1", "GetAddonInfos")
+            result = self._rates_from_addon_counters(status, (t0 + time.monotonic()) / 2)
+            if result is not None:
+                return result
+
+        t0 = time.monotonic()
+        status_rx = self.fc.call_action("WANCommonIFC1", "GetTotalBytesReceived")
+        t1 = time.monotonic()
+        status_tx = self.fc.call_action("WANCommonIFC1", "GetTotalBytesSent")
+        t2 = time.monotonic()
+        return self._rates_from_total_bytes(status_rx, (t0 + t1) / 2, status_tx, (t1 + t2) / 2)
+
+    def _fetch_link_properties(self, fc=None) -> None:
+        """Query and cache the physical line capacity from the router.
+
+        Called once during :meth:`connect`, with the new connection *fc*
+        (default :attr:`fc`).  Sets :attr:`link_max_dl` and
+        :attr:`link_max_ul`.  On failure both values are left at ``0.0``,
+        which causes the plausibility filter to fall back to a 2 Gbit/s
+        ceiling and the Y-axis to use the dynamic scaling mode.
+        """
+        try:
+            fc = fc or self.fc
+            self._apply_link_properties(fc.call_action("WANCommonIFC1", "GetCommonLinkProperties"))
+        except Exception as e:
+            self._apply_link_properties(None, e)
+
+    # ------------------------------------------------------------------
+    # Response evaluation (shared with fritzasync.AsyncFritzReader)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _rates_from_addon_infos(status: dict) -> tuple:
+        """Evaluate a ``GetAddonInfos`` response for method 1.
+
         The ``NewByteReceiveRate`` / ``NewByteSendRate`` fields are
         directly in bytes/s.  If both are zero **and** no total-byte field
         is present the method is considered unavailable.
@@ -254,7 +746,6 @@ class FritzReader:
         filtered here (the plausibility check in :meth:`get_bandwidth` is
         sufficient).
         """
-        status = self.fc.call_action("WANCommonIFC1", "GetAddonInfos")
         rx_rate = int(status.get("NewByteReceiveRate", 0))
         tx_rate = int(status.get("NewByteSendRate", 0))
         # Both zero with no total-byte counter present → action not supported
@@ -262,15 +753,15 @@ class FritzReader:
             return None, None
         return rx_rate * 8 / 1_000_000, tx_rate * 8 / 1_000_000
 
-    def _get_bandwidth_traffic_stats(self) -> tuple:
-        """Method 2: Read current rates from ``X_AVM-DE_GetOnlineMonitor``.
+    @staticmethod
+    def _rates_from_online_monitor(status: dict) -> tuple:
+        """Evaluate an ``X_AVM-DE_GetOnlineMonitor`` response for method 2.
 
         The response dictionary contains keys whose names vary across
         firmware versions.  A flexible keyword search for ``"downstream"`` /
         ``"upstream"`` combined with ``"rate"`` / ``"bps"`` covers all known
         variants.  The largest matching value is used.
         """
-        status = self.fc.call_action("WANCommonIFC1", "X_AVM-DE_GetOnlineMonitor")
         down_rate = 0
         up_rate = 0
         for key, value in status.items():
@@ -283,52 +774,67 @@ class FritzReader:
             return down_rate / 1_000_000, up_rate / 1_000_000
         return None, None
 
-    def _get_bandwidth_total_bytes(self) -> tuple:
-        """Method 3: Derive rates from cumulative byte counters.
+    @staticmethod
+    def _history_from_online_monitor(status: dict, now: float) -> tuple:
+        """Turn the rate lists of an ``X_AVM-DE_GetOnlineMonitor`` response into rows.
 
-        Requires two consecutive calls separated by at least one tick of
-        the system clock.  The first call stores the baseline and returns
-        ``(None, None)``.  Subsequent calls compute the delta and convert
-        it to Mbit/s using the elapsed wall-clock time.
-        """
-        status_rx = self.fc.call_action("WANCommonIFC1", "GetTotalBytesReceived")
-        rx_total = int(status_rx.get("NewTotalBytesReceived", 0))
-        status_tx = self.fc.call_action("WANCommonIFC1", "GetTotalBytesSent")
-        tx_total = int(status_tx.get("NewTotalBytesSent", 0))
-
-        current_time = time.time()
-        if self.last_time > 0 and self.last_rx_bytes > 0:
-            time_diff = current_time - self.last_time
-            if time_diff > 0:
-                rx_rate = (rx_total - self.last_rx_bytes) / time_diff
-                tx_rate = (tx_total - self.last_tx_bytes) / time_diff
-                self.last_rx_bytes = rx_total
-                self.last_tx_bytes = tx_total
-                self.last_time = current_time
-                return rx_rate * 8 / 1_000_000, tx_rate * 8 / 1_000_000
-
-        # First call – store baseline, no rate available yet
-        self.last_rx_bytes = rx_total
-        self.last_tx_bytes = tx_total
-        self.last_time = current_time
-        return None, None
-
-    def _fetch_link_properties(self) -> None:
-        """Query and cache the physical line capacity from the router.
-
-        Called once during :meth:`connect`.  Sets :attr:`link_max_dl` and
-        :attr:`link_max_ul`.  On failure both values are left at ``0.0``,
-        which causes the plausibility filter to fall back to a 2 Gbit/s
-        ceiling and the Y-axis to use the dynamic scaling mode.
+        ``Newds_current_bps`` / ``Newus_current_bps`` are comma-separated
+        rates in bytes/s, newest first, :data:`ONLINE_MONITOR_INTERVAL`
+        seconds apart; the newest value is taken to end at *now*.  Returns
+        ``(t, dl, ul)`` lists, oldest first (empty if the lists are missing
+        or malformed).
         """
         try:
-            props = self.fc.call_action("WANCommonIFC1", "GetCommonLinkProperties")
-            self.link_max_dl = props.get("NewLayer1DownstreamMaxBitRate", 0) / 1_000_000
-            self.link_max_ul = props.get("NewLayer1UpstreamMaxBitRate", 0) / 1_000_000
-        except Exception as e:
-            print(f"[FritzReader] Failed to fetch line properties: {e}")
+            ds = [int(v) for v in str(status.get("Newds_current_bps") or "").split(",") if v.strip()]
+            us = [int(v) for v in str(status.get("Newus_current_bps") or "").split(",") if v.strip()]
+        except ValueError:
+            return [], [], []
+        n = min(len(ds), len(us))
+        t = [now - i * ONLINE_MONITOR_INTERVAL for i in range(n - 1, -1, -1)]
+        dl = [v * 8 / 1_000_000 for v in reversed(ds[:n])]
+        ul = [v * 8 / 1_000_000 for v in reversed(us[:n])]
+        return t, dl, ul
+
+    def _rates_from_addon_counters(self, status: dict, t_mid: float):
+        """Feed the byte counters of a ``GetAddonInfos`` response (method 3).
+
+        Returns the ``(rx, tx)`` pair from :class:`ByteCounter`, or ``None``
+        – and stops asking ``GetAddonInfos`` for counters – when the
+        response carries neither 64-bit nor 32-bit totals.
+        """
+        rx64 = status.get("NewX_AVM_DE_TotalBytesReceived64")
+        tx64 = status.get("NewX_AVM_DE_TotalBytesSent64")
+        if rx64 is not None and tx64 is not None:
+            self._counter_round = self._round
+            rx = self._rx_counter.update(int(rx64), t_mid, 64)
+            tx = self._tx_counter.update(int(tx64), t_mid, 64)
+            return rx, tx
+        rx32 = status.get("NewTotalBytesReceived")
+        tx32 = status.get("NewTotalBytesSent")
+        if rx32 is not None and tx32 is not None:
+            self._counter_round = self._round
+            rx = self._rx_counter.update(int(rx32), t_mid, 32)
+            tx = self._tx_counter.update(int(tx32), t_mid, 32)
+            return rx, tx
+        self._addon_counters = False
+        return None
+
+    def _rates_from_total_bytes(self, status_rx: dict, t_rx: float, status_tx: dict, t_tx: float) -> tuple:
+        """Feed separate ``GetTotalBytesReceived`` / ``…Sent`` readings (method 3)."""
+        self._counter_round = self._round
+        rx = self._rx_counter.update(int(status_rx["NewTotalBytesReceived"]), t_rx, 32)
+        tx = self._tx_counter.update(int(status_tx["NewTotalBytesSent"]), t_tx, 32)
+        return rx, tx
+
+    def _apply_link_properties(self, props, error: Exception | None = None) -> None:
+        """Store line capacity from a ``GetCommonLinkProperties`` response."""
+        if error is not None:
+            print(f"[FritzReader] Failed to fetch line properties: {error}")
             self.link_max_dl = 0.0
             self.link_max_ul = 0.0
+            return
+        self.link_max_dl = int(props.get("NewLayer1DownstreamMaxBitRate", 0)) / 1_000_000
+        self.link_max_ul = int(props.get("NewLayer1UpstreamMaxBitRate", 0)) / 1_000_000
 
     # ------------------------------------------------------------------
     # Accessors
@@ -347,18 +853,52 @@ class FritzReader:
         self.max_dl = 0.0
         self.max_ul = 0.0
 
+    def get_transport_stats(self) -> dict:
+        """Return connection re-use statistics of the pooled HTTP session.
+
+        See :meth:`fritztransport.SessionPool.stats` for the keys.  Returns
+        an empty dict when not connected.
+        """
+        if self.fc is None:
+            return {}
+        from fritztransport import PooledFritzConnection
+        if not isinstance(self.fc, PooledFritzConnection):
+            return {}
+        return self.fc.transport_stats()
+
     def get_history(self) -> tuple:
-        """Unpack :attr:`history` into two separate lists.
+        """Return copies of the download and upload columns of :attr:`history`.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            ``(dl_values, ul_values)`` as ``float32`` arrays, oldest first;
+            empty when no data.
+        """
+        _, dl, ul, _ = self.history.arrays()
+        return dl, ul
+
+    def get_recent_samples(self) -> tuple:
+        """Return the router's own recent rate history as ``(t, dl, ul)``.
+
+        Reads the rate lists of ``X_AVM-DE_GetOnlineMonitor`` (see
+        :meth:`_history_from_online_monitor`).  The rows are not added to
+        :attr:`history`.
 
         Returns
         -------
-        tuple[list[float], list[float]]
-            ``(dl_values, ul_values)`` or ``([], [])`` when no data.
+        tuple[list, list, list]
+            Wall-clock times and rates in Mbit/s, oldest first; empty lists
+            when not connected or the firmware does not provide the lists.
         """
-        if not self.history:
-            return [], []
-        dl_list, ul_list = zip(*self.history)
-        return list(dl_list), list(ul_list)
+        if not self.fc:
+            return [], [], []
+        try:
+            status = self.fc.call_action("WANCommonIFC1", "X_AVM-DE_GetOnlineMonitor")
+            return self._history_from_online_monitor(status, time.time())
+        except Exception as e:
+            print(f"[FritzReader] Online monitor history unavailable: {e}")
+            return [], [], []
 
     def get_ip_addresses(self) -> tuple:
         """Return ``(lan_ip, wan_ip)`` strings.
@@ -397,12 +937,8 @@ class FritzReader:
         """
         if not self.fc:
             return "Not connected"
-        info = [
-            f"Model:      {self.fc.modelname}",
-            f"Address:    {self.fc.address}",
-            f"Line:       ↓ {self.link_max_dl:.1f} / ↑ {self.link_max_ul:.1f} Mbit/s",
-            "\n──────────────────────────────────────",
-        ]
+        info = self._detail_header()
+        info.append("\n──────────────────────────────────────")
         wan_services = [s for s in self.fc.services.keys() if "WAN" in s]
         for service_name in sorted(wan_services):
             info.append(f"\n─── Service: {service_name} ───")
@@ -427,3 +963,26 @@ class FritzReader:
             except Exception as e:
                 info.append(f"  ERROR: {e}")
         return "\n".join(info)
+
+    def _detail_header(self) -> list:
+        """Summary lines (model, line, methods, transport) of :meth:`get_detailed_info`."""
+        info = [
+            f"Model:      {self.fc.modelname}",
+            f"Address:    {self.fc.address}",
+            f"Line:       ↓ {self.link_max_dl:.1f} / ↑ {self.link_max_ul:.1f} Mbit/s",
+            "\n─── Measurement methods ───",
+        ]
+        for name, st in self.get_method_stats().items():
+            info.append(
+                f"  {'*' if st['active'] else ' '} {name}: "
+                f"{st['calls']} calls, {st['success_rate'] * 100:.0f} % ok, "
+                f"{st['latency_ms']:.0f} ms"
+            )
+        transport = self.get_transport_stats()
+        if transport:
+            info.append(
+                f"\nTransport:  {transport['requests']} requests over "
+                f"{transport['connections']} connection(s), "
+                f"{transport['reuse_ratio'] * 100:.0f} % re-used"
+            )
+        return info
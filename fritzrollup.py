@@ -0,0 +1,279 @@
+"""
+fritzrollup.py
+==============
+Multi-resolution rollups (RRD-style) of the bandwidth samples.
+
+Why
+---
+The live graph shows the last :data:`~fritzreader.HISTORY_SIZE` samples,
+and the raw samples in :mod:`fritzstore` are too many to plot or scan for
+"what happened last night" or "the last month".  :class:`RollupStore`
+therefore aggregates every sample as it arrives into fixed time buckets of
+several widths (:data:`TIERS`):
+
+=========  ===========  ==========
+Width      Slots        Span
+=========  ===========  ==========
+1 min      4 320        3 days
+15 min     3 360        35 days
+1 h        9 600        400 days
+=========  ===========  ==========
+
+Raw 1 s samples stay in the router's :class:`~fritzhistory.HistoryBuffer`
+and the sample store.  Each bucket (:data:`BUCKET_DTYPE`) holds the bucket
+start time, the sample count and min / max / sum per direction; the average
+is ``sum / count``.  Gap rows (``NaN`` rates, see
+:data:`fritzhistory.GAP_REASONS`) are masked out before accounting, so an
+outage leaves its buckets empty instead of dragging the averages to zero.
+
+Round-robin slots
+-----------------
+Every tier is a fixed ring of slots.  A sample at time *t* belongs to bucket
+``k = floor(t / width)``, which lives in slot ``k % slots``.  If that slot
+still holds an older bucket, it is reset first – the oldest data expires by
+being overwritten, so a tier never grows and an update is O(1) per tier
+regardless of how much history there is.  Samples older than the bucket in
+their slot (clock set back) are ignored.
+
+Persistence
+-----------
+With a directory, each router's tiers live in one file ``<router>.fbr``
+(64-byte header like the sample logs, then all slots) that is mapped with
+:class:`numpy.memmap`; updates go straight into the mapped pages and reach
+the disk when the OS writes them back or :meth:`RollupStore.flush` is
+called.  A file with a different tier layout is started afresh.  Without a
+directory the rollups are kept in memory only.
+"""
+
+import math
+import threading
+from pathlib import Path
+
+import numpy as np
+
+import fritzstore
+
+#: File name suffix of the rollup files.
+ROLLUP_SUFFIX = ".fbr"
+
+#: Magic bytes (6) plus format version (2).
+ROLLUP_MAGIC = b"FBSRRD\x00\x01"
+
+#: Bucket widths in seconds and slots per tier.
+TIERS = ((60, 4320), (900, 3360), (3600, 9600))
+
+#: One bucket (48 bytes).  ``t`` is the bucket start; ``count == 0`` marks an
+#: unused slot.
+BUCKET_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("dl_sum", "<f8"),
+    ("ul_sum", "<f8"),
+    ("count", "<u4"),
+    ("dl_min", "<f4"),
+    ("dl_max", "<f4"),
+    ("ul_min", "<f4"),
+    ("ul_max", "<f4"),
+    ("pad", "V4"),
+])
+
+
+def _file_name(router: str) -> str:
+    return fritzstore._file_name(router)[:-len(fritzstore.LOG_SUFFIX)] + ROLLUP_SUFFIX
+
+
+class Rollups:
+    """Bucket tiers of one router.
+
+    Thread-safe.
+
+    Parameters
+    ----------
+    path : str | Path | None
+        Rollup file (created when missing); ``None`` keeps the buckets in
+        memory.
+    router : str
+        Router name stored in the header of a new file.
+    read_only : bool
+        Map an existing file read-only and never rewrite it; a missing file
+        or one of another layout reads as empty buckets.
+    """
+
+    def __init__(self, path=None, router: str = "", read_only: bool = False) -> None:
+        self.path = Path(path) if path else None
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        total = sum(slots for _, slots in TIERS)
+        self._slots = self._map(total, router) if self.path is not None else None
+        if self._slots is None:
+            self._slots = np.zeros(total, dtype=BUCKET_DTYPE)
+        self._tiers = {}
+        pos = 0
+        for width, slots in TIERS:
+            self._tiers[width] = self._slots[pos:pos + slots]
+            pos += slots
+
+    def _map(self, total: int, router: str) -> np.memmap | None:
+        size = fritzstore.HEADER_DTYPE.itemsize + total * BUCKET_DTYPE.itemsize
+        header = None
+        if self.path.exists():
+            with open(self.path, "rb") as f:
+                raw = f.read(fritzstore.HEADER_DTYPE.itemsize)
+            if len(raw) == fritzstore.HEADER_DTYPE.itemsize:
+                header = np.frombuffer(raw, dtype=fritzstore.HEADER_DTYPE)[0]
+            if (
+                header is None
+                or header["magic"] != ROLLUP_MAGIC
+                or header["record_size"] != BUCKET_DTYPE.itemsize
+                or header["reserved"] != total
+                or self.path.stat().st_size != size
+            ):
+                if not self.read_only:
+                    print(f"[Store] {self.path.name}: unknown rollup layout, starting afresh.")
+                header = None
+        if header is None and self.read_only:
+            return None
+        if header is None:
+            header = np.zeros(1, dtype=fritzstore.HEADER_DTYPE)
+            header["magic"] = ROLLUP_MAGIC
+            header["record_size"] = BUCKET_DTYPE.itemsize
+            header["reserved"] = total   # slot count of all tiers
+            header["router"] = router.encode("utf-8")[:48]
+            with open(self.path, "wb") as f:
+                f.write(header.tobytes())
+                f.truncate(size)
+        return np.memmap(
+            self.path, dtype=BUCKET_DTYPE, mode="r" if self.read_only else "r+",
+            offset=fritzstore.HEADER_DTYPE.itemsize, shape=(total,),
+        )
+
+    def add(self, t, dl, ul) -> None:
+        """Account for one or more samples (scalars or equally long arrays).
+
+        Gap rows (``NaN`` rates) are skipped.
+        """
+        t = np.atleast_1d(np.asarray(t, dtype=np.float64))
+        dl = np.broadcast_to(np.asarray(dl, dtype=np.float64), t.shape)
+        ul = np.broadcast_to(np.asarray(ul, dtype=np.float64), t.shape)
+        ok = np.isfinite(dl) & np.isfinite(ul)
+        t, dl, ul = t[ok].tolist(), dl[ok].tolist(), ul[ok].tolist()
+        with self._lock:
+            for width, _ in TIERS:
+                ring = self._tiers[width]
+                for ts, d, u in zip(t, dl, ul):
+                    start = float(ts // width * width)
+                    slot = ring[int(ts // width) % len(ring)]
+                    if slot["t"] != start:
+                        if slot["t"] > start:
+                            continue   # older than the bucket in this slot
+                        slot["t"] = start
+                        slot["count"] = 0
+                        slot["dl_min"] = slot["dl_max"] = d
+                        slot["ul_min"] = slot["ul_max"] = u
+                        slot["dl_sum"] = slot["ul_sum"] = 0.0
+                    slot["count"] += 1
+                    slot["dl_sum"] += d
+                    slot["ul_sum"] += u
+                    if d < slot["dl_min"]:
+                        slot["dl_min"] = d
+                    elif d > slot["dl_max"]:
+                        slot["dl_max"] = d
+                    if u < slot["ul_min"]:
+                        slot["ul_min"] = u
+                    elif u > slot["ul_max"]:
+                        slot["ul_max"] = u
+
+    def read(self, width: int, start: float | None = None, end: float | None = None) -> np.ndarray:
+        """Return the buckets of tier *width* that overlap ``[start, end]``.
+
+        The result is a :data:`BUCKET_DTYPE` copy sorted by time; empty
+        buckets (no samples) are left out.  With both bounds, only the slots
+        of the range are read (O(range), not O(slots)).
+
+        Raises
+        ------
+        KeyError
+            When *width* is not one of :data:`TIERS`.
+        """
+        ring = self._tiers[width]
+        if start is not None and end is not None:
+            # Bucket k lives in slot k % slots: address the range directly
+            # instead of scanning the ring.
+            k = np.arange(math.ceil(start / width) - 1, math.floor(end / width) + 1)
+            if len(k) <= len(ring):
+                with self._lock:
+                    buckets = ring[k % len(ring)]
+                return buckets[(buckets["count"] > 0) & (buckets["t"] == k * float(width))]
+        with self._lock:
+            buckets = ring[ring["count"] > 0]
+        if start is not None:
+            buckets = buckets[buckets["t"] >= start - width]
+        if end is not None:
+            buckets = buckets[buckets["t"] <= end]
+        return np.array(buckets[np.argsort(buckets["t"], kind="stable")])
+
+    def flush(self) -> None:
+        """Write modified pages of the file to disk."""
+        if isinstance(self._slots, np.memmap) and not self.read_only:
+            with self._lock:
+                self._slots.flush()
+
+
+class RollupStore:
+    """:class:`Rollups` of all routers.
+
+    Parameters
+    ----------
+    directory : str | Path | None
+        Directory of the ``<router>.fbr`` files; ``None`` keeps all rollups
+        in memory.
+    read_only : bool
+        Open the files with ``read_only`` (see :class:`Rollups`) and do not
+        create the directory.
+    """
+
+    def __init__(self, directory=None, read_only: bool = False) -> None:
+        self.directory = Path(directory) if directory else None
+        self.read_only = read_only
+        if self.directory is not None and not read_only:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._rollups: dict = {}
+        self._lock = threading.Lock()
+
+    def _get(self, router: str) -> Rollups:
+        with self._lock:
+            rollups = self._rollups.get(router)
+            if rollups is None:
+                path = self.directory / _file_name(router) if self.directory else None
+                rollups = self._rollups[router] = Rollups(path, router, self.read_only)
+            return rollups
+
+    def add(self, router: str, t, dl, ul) -> None:
+        """Account for samples of *router*; see :meth:`Rollups.add`."""
+        self._get(router).add(t, dl, ul)
+
+    def read(self, router: str, width: int, start: float | None = None, end: float | None = None) -> np.ndarray:
+        """Return *router*'s buckets of tier *width*; see :meth:`Rollups.read`."""
+        return self._get(router).read(width, start, end)
+
+    def flush(self) -> None:
+        """Write all rollup files to disk."""
+        with self._lock:
+            rollups = list(self._rollups.values())
+        for r in rollups:
+            r.flush()
+
+    def close(self) -> None:
+        """Flush and drop all rollups."""
+        self.flush()
+        with self._lock:
+            self._rollups.clear()
+
+
+def averages(buckets: np.ndarray) -> tuple:
+    """Return ``(t, dl_avg, ul_avg)`` arrays of :data:`BUCKET_DTYPE` buckets."""
+    count = np.maximum(buckets["count"], 1)
+    return (
+        buckets["t"].copy(),
+        (buckets["dl_sum"] / count).astype(np.float32),
+        (buckets["ul_sum"] / count).astype(np.float32),
+    )
@@ -0,0 +1,294 @@
+"""
+fritzscheduler.py
+=================
+Wall-clock aligned polling schedule with backoff and adaptive rate.
+
+Why
+---
+A repeating :class:`QTimer` fires every *interval* milliseconds after it was
+started.  Its ticks are not tied to the clock, so sample times drift, and a
+slow tick shifts every following one.  :class:`PollScheduler` instead
+computes each wake-up as an absolute point in time.
+
+Scheduling rules
+----------------
+* **Alignment** – ticks fall on multiples of :attr:`PollScheduler.step`
+  seconds since the Unix epoch (``…:00``, ``…:02``, ``…:04`` at 2 s), so all
+  routers – and samples across restarts – share the same time grid.
+* **Duration compensation** – the delay to the next tick is computed from
+  the clock *after* the tick's work was dispatched, so call duration does not
+  accumulate.
+* **Late ticks are skipped** – when a tick fires more than
+  :data:`LATE_TOLERANCE` × step after its boundary (event loop stalled,
+  machine suspended), it is dropped and counted instead of being run late or
+  in a burst to catch up.
+* **Backoff** – while a router is unreachable, the reconnect state machine
+  of :class:`~fritzpoller.RouterPoller` spaces its connect attempts with
+  :class:`Backoff`: the normal interval doubled per consecutive failure, up
+  to :data:`BACKOFF_CAP` seconds, shortened by a random :data:`JITTER` share
+  so that several monitors do not retry a rebooting box in lock-step.  The
+  first successful connect resets it.
+* **Adaptive rate** (optional) – a router whose utilisation is at least
+  :data:`BURST_UTILISATION` of the line capacity is polled every
+  ``interval / 2`` (minimum :data:`MIN_INTERVAL`); after
+  :data:`IDLE_SAMPLES` samples below :data:`IDLE_UTILISATION` it is polled
+  only every ``interval × IDLE_FACTOR``.  This keeps detail during bursts
+  and spares the router's CPU while the line is quiet.
+
+The scheduler holds no timer itself; :class:`~fritzworker.FritzWorker` arms a
+single-shot :class:`QTimer` with :meth:`PollScheduler.delay_to_next` and
+:class:`~fritzpoller.RouterPoller` asks :meth:`PollScheduler.is_due` per
+router.
+"""
+
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+#: Shortest polling interval in seconds (burst mode).
+MIN_INTERVAL = 1.0
+
+#: Longest delay between two attempts on an unreachable router in seconds.
+BACKOFF_CAP = 60.0
+
+#: Maximum share (0 – 1) by which a backoff delay is randomly shortened.
+JITTER = 0.2
+
+#: A tick later than this fraction of a step after its boundary is skipped.
+LATE_TOLERANCE = 0.5
+
+#: Utilisation (0 – 1) from which a router counts as bursting.
+BURST_UTILISATION = 0.25
+
+#: Utilisation below which a sample counts as idle.
+IDLE_UTILISATION = 0.02
+
+#: Consecutive idle samples before the interval is stretched.
+IDLE_SAMPLES = 5
+
+#: Interval multiplier while idle.
+IDLE_FACTOR = 4
+
+#: Rate in Mbit/s used as "line capacity" when the router did not report one.
+FALLBACK_CAPACITY = 100.0
+
+
+class Backoff:
+    """Capped exponential backoff with jitter.
+
+    After *n* consecutive failures the delay is
+    ``min(cap, base × factor**(n-1))``, reduced by a random share of up to
+    *jitter*.  The jitter only ever shortens the delay, so *cap* is a hard
+    upper bound.
+
+    Parameters
+    ----------
+    base : float
+        Delay after the first failure in seconds.
+    cap : float
+        Upper bound of the delay in seconds.
+    factor : float
+        Growth per consecutive failure.
+    jitter : float
+        Maximum share (0 – 1) removed at random; ``0`` disables jitter.
+    rng : random.Random | None
+        Random source (for reproducible tests); default :mod:`random`.
+    """
+
+    def __init__(
+        self,
+        base: float,
+        cap: float = BACKOFF_CAP,
+        factor: float = 2.0,
+        jitter: float = JITTER,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.base = base
+        self.cap = cap
+        self.factor = factor
+        self.jitter = jitter
+        self.failures = 0
+        self._rng = rng or random
+
+    def next_delay(self) -> float:
+        """Count one failure and return the delay before the next attempt."""
+        self.failures += 1
+        delay = min(self.cap, self.base * self.factor ** (self.failures - 1))
+        return delay * (1.0 - self.jitter * self._rng.random())
+
+    def reset(self) -> None:
+        """Forget all failures (call on success)."""
+        self.failures = 0
+
+
+@dataclass
+class RouterSchedule:
+    """Per-router scheduling state of :class:`PollScheduler`.
+
+    Attributes
+    ----------
+    interval : float
+        Current polling interval in seconds (changes in adaptive mode).
+    next_due : float
+        Wall-clock time from which the router is polled again.
+    idle_samples : int
+        Consecutive samples below :data:`IDLE_UTILISATION`.
+    """
+
+    interval: float
+    next_due: float = 0.0
+    idle_samples: int = 0
+
+
+class PollScheduler:
+    """Compute aligned tick times and per-router due times.
+
+    Thread-safe: :meth:`record_success` / :meth:`record_failure` are called
+    from poll threads, the other methods from the worker thread.
+
+    Parameters
+    ----------
+    interval : float
+        Configured refresh interval in seconds.
+    adaptive : bool
+        Enable the burst / idle rate adaptation.
+    clock : callable
+        Wall-clock source, default :func:`time.time`.
+    """
+
+    def __init__(self, interval: float, adaptive: bool = False, clock=time.time) -> None:
+        self.interval = max(float(interval), MIN_INTERVAL)
+        self.adaptive = adaptive
+        self.clock = clock
+        #: Ticks dropped because they fired too late.
+        self.late_ticks: int = 0
+        self._routers: dict = {}
+        self._last_k: int = 0    # grid index of the last claimed tick
+        self._next_k: int | None = None  # grid index the timer is armed for
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Tick grid
+    # ------------------------------------------------------------------
+
+    @property
+    def step(self) -> float:
+        """Spacing of the tick grid: the shortest interval any router may use."""
+        if self.adaptive:
+            return max(self.interval / 2, MIN_INTERVAL)
+        return self.interval
+
+    def delay_to_next(self, now: float | None = None) -> float:
+        """Return seconds until the next grid boundary after the last tick."""
+        now = self.clock() if now is None else now
+        k = math.floor(now / self.step) + 1
+        if self._last_k - 2 < k <= self._last_k:
+            # Timer fired marginally early: never serve a boundary twice.
+            k = self._last_k + 1
+        self._next_k = k
+        return max(k * self.step - now, 0.0)
+
+    def begin_tick(self, now: float | None = None) -> float | None:
+        """Claim the boundary of a timer tick that fired at *now*.
+
+        Returns
+        -------
+        float | None
+            The boundary time to poll for, or ``None`` when the tick is late
+            by more than :data:`LATE_TOLERANCE` of a step and is skipped.
+        """
+        now = self.clock() if now is None else now
+        k = self._next_k if self._next_k is not None else round(now / self.step)
+        self._next_k = None
+        self._last_k = k
+        if now - k * self.step > LATE_TOLERANCE * self.step:
+            self.late_ticks += 1
+            return None
+        return k * self.step
+
+    # ------------------------------------------------------------------
+    # Per-router state
+    # ------------------------------------------------------------------
+
+    def _get(self, name: str) -> RouterSchedule:
+        state = self._routers.get(name)
+        if state is None:
+            state = self._routers[name] = RouterSchedule(self.interval)
+        return state
+
+    def is_due(self, name: str, boundary: float) -> bool:
+        """Return ``True`` when router *name* should be polled at *boundary*."""
+        with self._lock:
+            state = self._get(name)
+            if state.next_due - boundary > BACKOFF_CAP + state.interval:
+                state.next_due = 0.0  # wall clock jumped backwards
+            return boundary >= state.next_due - 1e-6
+
+    def _align(self, t: float, interval: float) -> float:
+        return math.ceil((t - 1e-6) / interval) * interval
+
+    def record_success(
+        self,
+        name: str,
+        boundary: float | None,
+        down: float,
+        up: float,
+        link_dl: float = 0.0,
+        link_ul: float = 0.0,
+    ) -> None:
+        """Account for a sample of *name*; adapts the rate.
+
+        Parameters
+        ----------
+        boundary : float | None
+            Tick boundary the sample was taken for; ``None`` for samples
+            outside the grid (first sample after connect).
+        down, up : float
+            Sample in Mbit/s.
+        link_dl, link_ul : float
+            Line capacity in Mbit/s (``0.0`` when unknown).
+        """
+        with self._lock:
+            state = self._get(name)
+            if self.adaptive:
+                utilisation = max(
+                    down / (link_dl or FALLBACK_CAPACITY),
+                    up / (link_ul or link_dl or FALLBACK_CAPACITY),
+                )
+                if utilisation >= BURST_UTILISATION:
+                    state.interval = self.step
+                    state.idle_samples = 0
+                elif utilisation < IDLE_UTILISATION:
+                    state.idle_samples += 1
+                    if state.idle_samples >= IDLE_SAMPLES:
+                        state.interval = min(self.interval * IDLE_FACTOR, BACKOFF_CAP)
+                else:
+                    state.interval = self.interval
+                    state.idle_samples = 0
+            self._advance(state, boundary)
+
+    def record_failure(self, name: str, boundary: float | None = None) -> None:
+        """Account for a tick of *name* that produced no sample.
+
+        The adaptive rate falls back to the configured interval, so the
+        router is checked at the normal rate while it recovers.  When the
+        next connect attempt is made is up to the caller's :class:`Backoff`.
+        """
+        with self._lock:
+            state = self._get(name)
+            state.interval = self.interval
+            state.idle_samples = 0
+            self._advance(state, boundary)
+
+    def _advance(self, state: RouterSchedule, boundary: float | None) -> None:
+        if boundary is None:
+            state.next_due = self._align(self.clock(), state.interval)
+        else:
+            state.next_due = self._align(boundary + state.interval, state.interval)
+
+    def router_interval(self, name: str) -> float:
+        """Current polling interval of *name* in seconds."""
+        with self._lock:
+            return self._get(name).interval
@@ -0,0 +1,182 @@
+"""
+fritztransport.py
+=================
+Pooled HTTP transport for all TR-064 calls of FB Speed Monitor.
+
+Motivation
+----------
+Every :class:`fritzconnection.FritzConnection` creates its own
+:class:`requests.Session`.  Within one connection object that session already
+keeps the TCP connection alive, but it is thrown away on every reconnect:
+the next sample then pays for a new TCP handshake *and* a fresh HTTP digest
+challenge (401 → retry) before the actual SOAP request.  Over site-to-site
+VPNs those extra round-trips dominate the sample latency.
+
+Design
+------
+:class:`SessionPool` is a process-wide registry holding exactly one
+authenticated :class:`requests.Session` per router (keyed by address, port
+and credentials).  The session
+
+* uses an HTTP/1.1 keep-alive connection pool sized for the handful of
+  concurrent callers of one router (poll timer, debug dialog),
+* owns a single :class:`requests.auth.HTTPDigestAuth` instance, which
+  re-uses the server nonce (incrementing ``nc``) for pre-emptive
+  authorisation until the box declares it stale, and
+* survives :meth:`~fritzreader.FritzReader.connect` / reconnect cycles
+  because it lives in the pool, not in the connection object.
+
+:class:`PooledFritzConnection` is a thin :class:`FritzConnection` subclass
+that swaps the pooled session in *before* the router API is loaded, so even
+the description download of a reconnect re-uses the warm connection.
+
+With *description_cache* enabled (the default) the API description is
+loaded through :mod:`fritzcache`: one GET of ``tr64desc.xml`` validates the
+on-disk copy, and the full crawl of all SCPD files only runs on a cache miss
+(new router, model change or firmware update).
+
+Connection re-use is reported by :meth:`SessionPool.stats` based on the
+request / connection counters of the underlying urllib3 pools.
+"""
+
+import threading
+
+import requests
+from fritzconnection import FritzConnection
+
+import fritzcache
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPDigestAuth
+
+#: Maximum number of simultaneously open keep-alive connections per router.
+POOL_MAXSIZE = 4
+
+
+class SessionPool:
+    """Registry of persistent, authenticated sessions – one per router.
+
+    Thread-safe; all FritzReader instances of the process share
+    :data:`SESSION_POOL`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sessions: dict = {}
+        self._hits: dict = {}
+
+    @staticmethod
+    def _key(address: str, port, user, password) -> tuple:
+        return address.split("//")[-1], port, user or "", password or ""
+
+    def get(self, address: str, port=None, user=None, password=None) -> requests.Session:
+        """Return the pooled session for a router, creating it on first use."""
+        key = self._key(address, port, user, password)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                session.verify = False
+                if password:
+                    session.auth = HTTPDigestAuth(user or "", password)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[key] = session
+                self._hits[key] = 0
+            else:
+                self._hits[key] += 1
+            return session
+
+    def discard(self, address: str, port=None, user=None, password=None) -> None:
+        """Close and forget the session of one router (e.g. on credential change)."""
+        key = self._key(address, port, user, password)
+        with self._lock:
+            session = self._sessions.pop(key, None)
+            self._hits.pop(key, None)
+        if session is not None:
+            session.close()
+
+    def stats(self, address: str, port=None, user=None, password=None) -> dict:
+        """Return connection re-use statistics for one router.
+
+        Returns
+        -------
+        dict
+            ``requests`` – HTTP requests sent (including digest retries),
+            ``connections`` – TCP connections opened,
+            ``reused`` – requests served on an already open connection,
+            ``reuse_ratio`` – ``reused / requests`` (0 – 1),
+            ``session_reuses`` – how often a (re-)connect picked up the
+            existing session instead of creating a new one.
+        """
+        key = self._key(address, port, user, password)
+        with self._lock:
+            session = self._sessions.get(key)
+            hits = self._hits.get(key, 0)
+        n_req = n_conn = 0
+        if session is not None:
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for pool_key in list(pools.keys()):
+                    pool = pools.get(pool_key)
+                    if pool is not None:
+                        n_req += pool.num_requests
+                        n_conn += pool.num_connections
+        reused = max(n_req - n_conn, 0)
+        return {
+            "requests": n_req,
+            "connections": n_conn,
+            "reused": reused,
+            "reuse_ratio": reused / n_req if n_req else 0.0,
+            "session_reuses": hits,
+        }
+
+
+#: Process-wide default pool.
+SESSION_POOL = SessionPool()
+
+
+class PooledFritzConnection(FritzConnection):
+    """:class:`FritzConnection` that talks through a :class:`SessionPool`.
+
+    Accepts all :class:`FritzConnection` keyword arguments plus *pool*
+    (default: :data:`SESSION_POOL`) and *description_cache* (default
+    ``True``, see :mod:`fritzcache`).
+
+    Attributes
+    ----------
+    cache_hit : bool
+        ``True`` when the API description came from the on-disk cache.
+    """
+
+    def __init__(
+        self, *args, pool: SessionPool = None, description_cache: bool = True, **kwargs
+    ) -> None:
+        self._pool = pool or SESSION_POOL
+        self._description_cache = description_cache
+        self.cache_hit = False
+        self._pool_args = (
+            kwargs.get("address") or (args[0] if args else ""),
+            kwargs.get("port"),
+            kwargs.get("user"),
+            kwargs.get("password"),
+        )
+        super().__init__(*args, **kwargs)
+
+    def _load_router_api(self, *args, **kwargs) -> None:
+        # Called by FritzConnection.__init__ after the soaper and device
+        # manager exist but before any request went out: swap the private
+        # session for the pooled one so that every request – including the
+        # description download – uses the persistent connection.
+        session = self._pool.get(*self._pool_args)
+        self.session = session
+        self.soaper.session = session
+        self.device_manager.session = session
+        if self._description_cache:
+            self.cache_hit = fritzcache.load_router_api(self)
+        else:
+            super()._load_router_api(*args, **kwargs)
+
+    def transport_stats(self) -> dict:
+        """Return :meth:`SessionPool.stats` for this router."""
+        return self._pool.stats(*self._pool_args)
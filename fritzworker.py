@@ -15,8 +15,9 @@ Cross-thread communication is handled exclusively via Qt signals and slots:
 
 * **Worker → GUI** – :attr:`connection_status`, :attr:`data_updated`,
   :attr:`discovery_needed`, :attr:`debug_info_ready` are emitted from the
-  worker thread and delivered to the main thread via Qt's automatic
-  *queued connection* mechanism.
+  worker thread or from the poll threads of :class:`~fritzpoller.RouterPoller`
+  and delivered to the main thread via Qt's automatic *queued connection*
+  mechanism.
 
 * **GUI → Worker** – The GUI defines private signals
   (``_reconnect_signal``, ``_debug_request``, ``_set_device_signal``) that
@@ -24,19 +25,76 @@ Cross-thread communication is handled exclusively via Qt signals and slots:
   schedules the corresponding slot call in the worker thread's event loop,
   avoiding any direct cross-thread method calls.
 
+Multiple routers
+----------------
+All routers returned by :meth:`config.Config.get_routers` are polled by one
+:class:`~fritzpoller.RouterPoller`: every timer tick starts one task per
+router on a bounded thread pool, so the worker thread itself never blocks on
+network I/O.  Every emitted dict carries a ``"router"`` key with the router
+name; the history is kept per router.
+
 Connection lifecycle
 --------------------
-``run()`` → ``_do_connect()`` → success → start :class:`QTimer` for
-``update_data()`` polls.
-
-On failure during the *first* start, :attr:`discovery_needed` is emitted so
-the GUI can open the auto-discovery dialog.  On failure during a subsequent
-reconnect, only :attr:`connection_status` is emitted (no dialog).
+``run()`` → ``_do_connect()`` → all routers connect concurrently; each takes
+its first sample immediately after a successful connect, while the
+:class:`QTimer` drives ``update_data()`` ticks.  The time from the start of
+the connect to that first sample is printed and reported to the GUI as
+``"first_sample_ms"``.
+
+Before the first poll, :meth:`FritzWorker._do_connect` seeds every router's
+history with the last ``capacity × interval`` seconds from the sample store
+– or, without stored samples, the 1-minute rollups – and emits them as one
+``"backfill"`` payload, so the graph is full right after a start or
+reconnect.  After connecting, the poller adds the router's own recent
+samples on top (see :mod:`fritzpoller`).
+
+When the only configured router fails during the *first* start,
+:attr:`discovery_needed` is emitted so the GUI can open the auto-discovery
+dialog.  Otherwise only :attr:`connection_status` is emitted (no dialog) and
+the router is retried after its backoff delay.
+
+Recovery never runs in the worker thread: a failed poll hands the router to
+the reconnect state machine of :class:`~fritzpoller.RouterPoller`, which
+reconnects on the pool (keeping the old connection until the new one is
+ready), spaces further attempts with a capped, jittered backoff and emits a
+gap sample for every tick without data.  The worker's event loop stays free
+for reconnect, debug and device-change requests throughout.
+
+Scheduling
+----------
+The timer is a single-shot :class:`QTimer` re-armed after every tick with
+:meth:`~fritzscheduler.PollScheduler.delay_to_next`, so ticks stay on the
+wall-clock grid regardless of how long a tick took; a tick that fires too
+late is skipped.  The :class:`~fritzscheduler.PollScheduler` also decides
+per router whether it is due (optional adaptive rate from
+``[APP] adaptive_polling``).
+
+Persistence
+-----------
+With ``[APP] history_store = log`` (default) every sample is also appended
+to the router's file in :mod:`fritzstore`; with ``sqlite`` it goes to the
+SQLite database instead (retention from ``[APP] retention_days``), with
+``compact`` to the encoded block files of :mod:`fritzblocks`.  The poll
+threads hand their new rows to the store, which writes them in batches; the
+store outlives reconnects and is flushed and closed in :meth:`stop`.  Gap
+rows are stored too, with their reason in the record's ``flags`` byte.
+
+The same rows also update the :class:`~fritzrollup.RollupStore`
+(1 min / 15 min / 1 h buckets), which backs the GUI's 24 h / 7 d / 30 d
+views; gap rows do not count there.  Its files sit next to the sample store; with ``history_store =
+none`` the rollups are kept in memory only.
 """
 
-from pathlib import Path
-from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, QTimer
-from fritzreader import FritzReader
+import sqlite3
+import time
+from PyQt5.QtCore import QObject, Qt, pyqtSignal, pyqtSlot, QTimer
+from config import RouterSettings
+from fritzblocks import BlockStore
+from fritzpoller import RouterPoller
+from fritzquery import HistoryQuery
+from fritzrollup import RollupStore
+from fritzscheduler import PollScheduler
+from fritzstore import DATA_DIR, LogStore, SQLiteStore, open_store
 
 
 class FritzWorker(QObject):
@@ -62,15 +120,35 @@ class FritzWorker(QObject):
     # Signals emitted by the worker (received in the GUI thread)
     # ------------------------------------------------------------------
 
-    #: Emitted once after every (re-)connect attempt.
-    #: ``dict`` keys: ``"connected"`` (bool), ``"message"`` (str),
-    #: ``"details"`` (dict with ``link_dl``, ``link_ul``, ``wan_ip``,
-    #: ``model``) or ``None`` on failure.
+    #: Emitted once per router after every (re-)connect attempt.
+    #: ``dict`` keys: ``"router"`` (str), ``"connected"`` (bool),
+    #: ``"message"`` (str), ``"details"`` (dict with ``link_dl``,
+    #: ``link_ul``, ``wan_ip``, ``model``, ``connect_ms``, ``cache_hit``) or
+    #: ``None`` on failure; failures also carry ``"retry_in"`` (seconds).
     connection_status = pyqtSignal(dict)
 
-    #: Emitted on every successful timer tick with fresh bandwidth data.
-    #: ``dict`` keys: ``"down"``, ``"up"``, ``"max_dl"``, ``"max_ul"``
-    #: (all ``float``), ``"history"`` (deque), ``"error"`` (``None`` or str).
+    #: Emitted per router on every timer tick with fresh bandwidth data.
+    #: ``dict`` keys: ``"router"`` (str), ``"down"``, ``"up"``,
+    #: ``"max_dl"``, ``"max_ul"`` (all ``float``), ``"rows"`` (read-only
+    #: ``(t, dl, ul, flags)`` arrays of the history rows added since the
+    #: previous sample; gap rows have ``NaN`` rates and a
+    #: :data:`~fritzhistory.GAP_REASONS` code), ``"seq"`` (int, sequence number of the newest row),
+    #: ``"capacity"`` (int, history depth), ``"method"`` (name of the
+    #: measurement method or ``None``), ``"error"`` (``None`` or str).
+    #: The receiver rebuilds the history with
+    #: :meth:`~fritzhistory.HistoryBuffer.extend`.  The first sample after a
+    #: connect additionally carries ``"first_sample_ms"`` (float).  While a
+    #: router is not connected, gap samples are emitted instead:
+    #: ``"router"``, ``"gap"`` (``True``), ``"reason"`` (``"connecting"`` |
+    #: ``"disconnected"``), ``"time"``, ``"retry_in"`` (float or ``None``)
+    #: and ``"error"`` (str); the one that records a new gap row also
+    #: carries ``"rows"``, ``"seq"`` and ``"capacity"``.  ``"down"`` /
+    #: ``"up"`` of a sample are ``NaN`` when its round produced a gap row.  Right after a (re-)connect, a router may first
+    #: emit a backfill payload with the preloaded history or, once
+    #: connected, the router's own recent samples: ``"router"``,
+    #: ``"backfill"`` (``True``), ``"rows"``, ``"seq"``, ``"capacity"`` and
+    #: ``"error"`` (``None``); the latter are stored with ``"method"``
+    #: ``None``.
     data_updated = pyqtSignal(dict)
 
     #: Emitted when the very first connection attempt fails.
@@ -89,8 +167,18 @@ class FritzWorker(QObject):
         super().__init__()
         self.cfg = cfg
 
-        #: Active :class:`~fritzreader.FritzReader`, created in :meth:`_do_connect`.
-        self.reader: FritzReader | None = None
+        #: Active :class:`~fritzpoller.RouterPoller`, created in :meth:`_do_connect`.
+        self.poller: RouterPoller | None = None
+        #: :class:`~fritzscheduler.PollScheduler` of the active poller.
+        self.scheduler: PollScheduler | None = None
+        #: Persistent sample store, opened once in :meth:`run` (``None`` = off).
+        self.store: LogStore | SQLiteStore | BlockStore | None = None
+        #: 1 min / 15 min / 1 h rollups of all routers, created in :meth:`run`;
+        #: read by the GUI for its long time ranges (thread-safe).
+        self.rollups: RollupStore | None = None
+        #: Range queries over :attr:`store` and :attr:`rollups`, created in
+        #: :meth:`run`; used by the GUI and the startup backfill.
+        self.history: HistoryQuery | None = None
 
         #: :class:`~PyQt5.QtCore.QTimer` created exactly once in :meth:`run`.
         #: Stored as an instance attribute to avoid the timer being garbage-collected.
@@ -103,6 +191,13 @@ class FritzWorker(QObject):
         #: dialog.  Consumed by the next :meth:`_do_connect` call and then cleared.
         self._pending_device_info = None
 
+    @property
+    def reader(self):
+        """Reader of the first router (single-router convenience)."""
+        if self.poller and self.poller.routers:
+            return next(iter(self.poller.routers.values())).reader
+        return None
+
     # ------------------------------------------------------------------
     # Slots (executed in the worker thread)
     # ------------------------------------------------------------------
@@ -118,30 +213,45 @@ class FritzWorker(QObject):
         """
         if self.timer is None:
             self.timer = QTimer()
+            self.timer.setSingleShot(True)
+            self.timer.setTimerType(Qt.PreciseTimer)
             self.timer.timeout.connect(self.update_data)
+        if self.store is None:
+            try:
+                self.store = open_store(
+                    self.cfg.settings.history_store, retention_days=self.cfg.settings.retention_days
+                )
+            except (OSError, sqlite3.Error) as e:
+                print(f"[Worker] History store unavailable: {e}")
+        if self.rollups is None:
+            # Persisted next to the samples; memory only without a store.
+            try:
+                self.rollups = RollupStore(DATA_DIR if self.store is not None else None)
+            except OSError as e:
+                print(f"[Worker] Rollup files unavailable: {e}")
+                self.rollups = RollupStore()
+        self.history = HistoryQuery(self.store, self.rollups)
         self._do_connect()
 
     @pyqtSlot()
     def reconnect(self) -> None:
-        """Reset history and peaks, then attempt a fresh connection.
+        """Drop all readers (history and peaks) and connect afresh.
 
         Called from the GUI via the ``_reconnect_signal`` (queued connection)
-        so that execution happens inside the worker thread's event loop,
-        making the blocking network call thread-safe.
+        so that execution happens inside the worker thread's event loop.
+        The router list is re-read from the configuration.
         """
         if self.timer:
             self.timer.stop()
-        if self.reader:
-            self.reader.history.clear()
-            self.reader.reset_maxima()
         self._do_connect()
 
     @pyqtSlot(object)
     def set_device_and_reconnect(self, device_info) -> None:
         """Store a device selected in the discovery dialog and reconnect.
 
-        Persists the chosen IP address to ``config.ini`` so it survives
-        application restarts, then calls :meth:`reconnect`.
+        The GUI has already saved the chosen IP address to ``config.ini``
+        (:class:`~config.Config` is only written from the GUI thread); the
+        worker connects to it with :meth:`reconnect`.
 
         Parameters
         ----------
@@ -149,68 +259,62 @@ class FritzWorker(QObject):
             Device chosen by the user in :class:`~gui.DiscoveryDialog`.
         """
         self._pending_device_info = device_info
-
-        # Persist the new address to config.ini
-        if "FRITZBOX" not in self.cfg.config:
-            self.cfg.config.add_section("FRITZBOX")
-        self.cfg.config["FRITZBOX"]["address"] = device_info.ip
-        try:
-            with (Path(__file__).parent / "config.ini").open("w", encoding="utf-8") as f:
-                self.cfg.config.write(f)
-        except Exception as e:
-            print(f"[Worker] Failed to persist IP to config: {e}")
-
         self.reconnect()
 
     @pyqtSlot()
     def update_data(self) -> None:
-        """Timer callback – fetch current bandwidth and emit :attr:`data_updated`.
+        """Timer callback – start one poll per due router, re-arm the timer.
 
-        On failure, emits ``data_updated`` with ``"error"`` set, then
-        attempts an immediate reconnect.  If the reconnect succeeds the
-        normal polling cycle continues on the next timer tick.
+        Returns immediately; the results arrive through
+        :attr:`data_updated` from the poll threads.  A router whose
+        previous poll is still running is skipped for this tick.  On a
+        failed poll the router emits ``data_updated`` with ``"error"`` set
+        and reconnects right away.
         """
         if not self._is_running:
             if self.timer:
                 self.timer.stop()
             return
-
-        try:
-            down, up = self.reader.get_bandwidth()
-            if down is None or up is None:
-                raise ConnectionError("Invalid data received from FRITZ!Box")
-
-            self.data_updated.emit({
-                "down": down,
-                "up": up,
-                "max_dl": self.reader.max_dl,
-                "max_ul": self.reader.max_ul,
-                "history": self.reader.history,
-                "error": None,
-            })
-
-        except Exception as e:
-            print(f"[Worker] Data fetch error: {e}")
-            self.data_updated.emit({"error": str(e)})
-            if not self.reader.connect():
-                print("[Worker] Reconnect failed.")
+        if self.poller and self.scheduler:
+            boundary = self.scheduler.begin_tick()
+            if boundary is None:
+                print("[Worker] Tick fired late – skipped.")
             else:
-                print("[Worker] Reconnect successful.")
+                self.poller.tick(boundary)
+        self._arm_timer()
 
-    @pyqtSlot()
-    def fetch_debug_info(self) -> None:
+    def _arm_timer(self) -> None:
+        """Start the single-shot timer for the next grid boundary."""
+        if self.timer and self.scheduler and self._is_running:
+            self.timer.start(max(1, round(self.scheduler.delay_to_next() * 1000)))
+
+    @pyqtSlot(str)
+    def fetch_debug_info(self, router: str = "") -> None:
         """Collect verbose diagnostic data and emit :attr:`debug_info_ready`.
 
-        Runs in the worker thread so the potentially slow TR-064 queries do
-        not block the GUI.  The GUI opens the debug dialog first, then
-        triggers this slot and updates the dialog text when the signal
+        The TR-064 queries run on the poll pool, so neither the GUI nor the
+        polling timer is blocked.  The GUI opens the debug dialog first,
+        then triggers this slot and updates the dialog text when the signal
         arrives.
+
+        Parameters
+        ----------
+        router : str
+            Router name; empty selects the first router.
         """
-        if self.reader:
-            info = self.reader.get_detailed_info()
-        else:
-            info = "Not connected."
-        self.debug_info_ready.emit(info)
+        reader = self.poller.reader(router) if self.poller and router else self.reader
+        if reader is None or not reader.fc:
+            self.debug_info_ready.emit("Not connected.")
+            return
+
+        def collect():
+            try:
+                info = reader.get_detailed_info()
+            except Exception as e:
+                info = f"Error: {e}"
+            self.debug_info_ready.emit(info)
+
+        self.poller.run_task(collect)
 
     @pyqtSlot()
     def stop(self) -> None:
@@ -218,50 +322,127 @@ class FritzWorker(QObject):
         self._is_running = False
         if self.timer:
             self.timer.stop()
+        if self.poller:
+            self.poller.shutdown()
+        if self.store:
+            try:
+                self.store.close()
+            except (OSError, sqlite3.Error) as e:
+                print(f"[Worker] Could not write the last samples: {e}")
+            self.store = None
+        if self.rollups:
+            try:
+                self.rollups.flush()
+            except OSError as e:
+                print(f"[Worker] Could not write the rollups: {e}")
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
     def _do_connect(self) -> None:
-        """Build a :class:`~fritzreader.FritzReader` and attempt to connect.
+        """Build a :class:`~fritzpoller.RouterPoller` and connect all routers.
 
         If :attr:`_pending_device_info` is set (from the discovery dialog)
-        the reader is built with that IP; otherwise the stored config
-        credentials are used.
+        the single default router is built with that IP; otherwise the
+        routers from :meth:`config.Config.get_routers` are used.
 
-        On success, starts the polling timer and emits
-        :attr:`connection_status` with ``"connected": True``.
-        On failure, emits :attr:`connection_status` with ``"connected": False``
-        and – on the very first attempt – also emits :attr:`discovery_needed`.
+        Connecting happens on the poll pool; each router emits
+        :attr:`connection_status` when its attempt finished and takes its
+        first sample right away.  The polling timer is armed for the next
+        boundary of a new :class:`~fritzscheduler.PollScheduler`.
         """
+        if self.poller:
+            self.poller.shutdown()
+        routers = self.cfg.get_routers()
         if self._pending_device_info:
-            self.reader = FritzReader.from_device_info(self._pending_device_info, self.cfg)
+            address, username, password = self.cfg.get_fritzbox_credentials()
+            routers = [RouterSettings(
+                name=routers[0].name if len(routers) == 1 else self._pending_device_info.ip,
+                address=self._pending_device_info.ip,
+                username=username or "",
+                password=password or "",
+            )]
             self._pending_device_info = None
-        else:
-            self.reader = FritzReader.from_config(self.cfg)
-
-        if self.reader.connect():
-            self._first_run = False
-            self.connection_status.emit({
-                "connected": True,
-                "message": "Connected",
-                "details": {
-                    "link_dl": self.reader.link_max_dl,
-                    "link_ul": self.reader.link_max_ul,
-                    "wan_ip": self.reader.get_ip_addresses()[1],
-                    "model": self.reader.fc.modelname if self.reader.fc else "",
-                },
-            })
-            if self.timer:
-                self.timer.start(self.cfg.get_refresh_interval() * 1000)
-        else:
+        if not routers:
             self.connection_status.emit({
+                "router": "",
                 "connected": False,
-                "message": "Connection to FRITZ!Box failed",
+                "message": "No FRITZ!Box configured",
                 "details": None,
             })
-            if self._first_run:
-                # Offer auto-discovery only on the very first failed attempt
-                self._first_run = False
-                self.discovery_needed.emit()
+            self._offer_discovery()
+            return
+
+        settings = self.cfg.settings
+        self.scheduler = PollScheduler(settings.refresh_interval, adaptive=settings.adaptive_polling)
+        poller = RouterPoller(
+            routers,
+            on_status=lambda status: self._on_status(poller, status),
+            on_sample=lambda data: self._on_sample(poller, data),
+            scheduler=self.scheduler,
+        )
+        self.poller = poller
+        for name in poller.routers:
+            self._preload(poller, name)
+        poller.start()
+        self._arm_timer()
+
+    def _preload(self, poller: RouterPoller, router: str) -> None:
+        """Seed *router*'s history from the store or the rollups and emit it.
+
+        Covers the window the live graph shows (history capacity × refresh
+        interval), read with :meth:`~fritzquery.HistoryQuery.query`: the
+        stored samples or, when there are none, the 1-minute rollup
+        averages.  Nothing
+        is emitted when neither has data for the window.
+        """
+        capacity = poller.reader(router).history.capacity
+        end = time.time()
+        try:
+            t, dl, ul = self.history.query(router, end - capacity * self.scheduler.interval, end)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[Worker] Could not read stored history of {router}: {e}")
+            return
+        if not len(t):
+            return
+        t, dl, ul = t[-capacity:], dl[-capacity:], ul[-capacity:]
+        self.data_updated.emit(poller.preload(router, t, dl, ul))
+        print(f"[Worker] {router}: {len(t)} samples preloaded.")
+
+    def _on_status(self, poller: RouterPoller, status: dict) -> None:
+        """Forward a connect result of the current poller (poll thread)."""
+        if poller is not self.poller:
+            return
+        self.connection_status.emit(status)
+        if not status["connected"] and len(poller.routers) == 1:
+            self._offer_discovery()
+        elif status["connected"]:
+            self._first_run = False
+
+    def _on_sample(self, poller: RouterPoller, data: dict) -> None:
+        """Store and forward a sample of the current poller (poll thread)."""
+        if poller is not self.poller:
+            return
+        store = self.store
+        if store is not None and "rows" in data:
+            t, dl, ul, flags = data["rows"]
+            try:
+                # A backfill payload has "method": None – its rows come
+                # from the router's buffer, not from the live method.
+                store.append(data["router"], t, dl, ul, method=data.get("method"), flags=flags)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                print(f"[Worker] Could not store sample of {data['router']}: {e}")
+        rollups = self.rollups
+        if rollups is not None and "rows" in data:
+            try:
+                rollups.add(data["router"], *data["rows"][:3])
+            except OSError as e:
+                print(f"[Worker] Could not update rollups of {data['router']}: {e}")
+        self.data_updated.emit(data)
+
+    def _offer_discovery(self) -> None:
+        """Emit :attr:`discovery_needed` on the very first failed start only."""
+        if self._first_run:
+            self._first_run = False
+            self.discovery_needed.emit()
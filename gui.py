@@ -10,6 +10,11 @@ The GUI is structured as a single :class:`FritzMain` main window backed by a
 :class:`~PyQt5.QtCore.QThread`.  All network I/O is confined to the worker
 thread; the GUI thread only reacts to signals.
 
+The worker is started by a zero-timeout timer once the event loop runs, so
+the window is painted first.  fritzconnection (via :mod:`fritzreader`),
+:mod:`fritz_discovery` and :mod:`fritzexport` are imported where they are
+first used, not by this module (``python bench.py coldstart``).
+
 Key classes
 ~~~~~~~~~~~
 :class:`_DiscoveryThread`
@@ -30,9 +35,18 @@ Key classes
     Settings dialog for all application and connection parameters.
     Saves changes to ``config.ini`` and triggers a reconnect.
 
+:class:`ExportDialog`
+    Exports a time range of one router's samples or rollups to CSV /
+    NDJSON (optionally gzip) via :mod:`fritzexport` in a background thread.
+
 :class:`FritzMain`
     Main window.  Owns the :class:`~PyQt5.QtCore.QThread` / worker pair,
-    drives the :mod:`pyqtgraph` live graph, and wires all signals.
+    drives the :mod:`pyqtgraph` live graph, and wires all signals.  When
+    several routers are configured, a selector above the cards chooses the
+    router whose data is shown; the latest status and sample of every
+    router are kept so switching is instant.  A second selector switches
+    the graph from the live samples to the 24 h / 7 d / 30 d averages of
+    the worker's :class:`~fritzrollup.RollupStore`.
 
 Plot implementation notes
 -------------------------
@@ -42,9 +56,24 @@ Plot implementation notes
   remove/add cycle is needed.
 * Curve style (Neon-Lines vs. Filled Areas) is applied only when the setting
   actually changes, avoiding redundant pen-object creation.
-* Scipy PChip smoothing is applied with ``clip_negative=False`` when the
-  "mirror upload" mode is active so that the reflected negative values are
-  preserved correctly.
+* The curves hold at most two points per pixel column of the visible
+  x-range (min/max decimation, :mod:`fritzplot`); zoom, pan and resize
+  re-decimate, so long histories stay interactive.
+* A new sample does not rebuild the plot data: it is appended to a
+  :class:`~fritzplot.PlotBuffer`, which keeps the rows, the plotted upload,
+  the fill baselines and the min/max envelope in preallocated buffers and
+  updates only the new bins.  The curves get views of it, so the work per
+  sample does not grow with the history length (``python bench.py plot``).
+* The x axis is the sample time (:class:`pyqtgraph.DateAxisItem`).  The
+  crosshair finds the nearest sample by binary search on the timestamps and
+  rebuilds its label only when the hovered sample changes, so hovering stays
+  cheap however long the history is.
+* Gap rows of the history (``NaN``, see :mod:`fritzhistory`) break the
+  curves and fills (``connect="finite"``); the range views break where
+  rollup buckets are missing.
+* PChip smoothing (:func:`fritzplot.smooth`, pure NumPy – no SciPy needed)
+  is applied with ``clip_negative=False`` when the "mirror upload" mode is
+  active so that the reflected negative values are preserved correctly.
 
 Color scheme
 ------------
@@ -55,28 +84,27 @@ upload, blue accent.  All colours are defined as module-level constants
 
 import os
 import sys
+import time
 import traceback
 from pathlib import Path
 
 import numpy as np
 import pyqtgraph as pg
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QDateTime, Qt, QThread, QTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QColor, QFont, QIcon, QPalette
 from PyQt5.QtWidgets import (
-    QAction, QApplication, QCheckBox, QComboBox, QDialog, QFormLayout,
-    QFrame, QHBoxLayout, QLabel, QLineEdit, QListWidget, QListWidgetItem,
-    QMainWindow, QMenu, QMessageBox, QProgressBar, QPushButton, QSizePolicy,
-    QSpinBox, QSystemTrayIcon, QTextEdit, QVBoxLayout, QWidget,
+    QAction, QApplication, QCheckBox, QComboBox, QDateTimeEdit, QDialog,
+    QFileDialog, QFormLayout, QFrame, QHBoxLayout, QLabel, QLineEdit,
+    QListWidget, QListWidgetItem, QMainWindow, QMenu, QMessageBox,
+    QProgressBar, QPushButton, QSizePolicy, QSpinBox, QSystemTrayIcon,
+    QTextEdit, QVBoxLayout, QWidget,
 )
 
-from config import Config
+from config import Background, Config, CurveStyle, UploadMode, YAxisScaling
+from fritzhistory import HistoryBuffer
+from fritzplot import PlotBuffer, break_gaps, minmax_decimate, smooth, visible_slice
 from fritzworker import FritzWorker
 
-try:
-    from scipy.interpolate import PchipInterpolator
-except ImportError:
-    PchipInterpolator = None
-
 # ---------------------------------------------------------------------------
 # Catppuccin Mocha colour palette
 # See https://github.com/catppuccin/catppuccin for the full spec.
@@ -93,6 +121,15 @@ C_ACCENT  = "#89b4fa"  #: Accent / interactive highlight (blue)
 C_WARN    = "#f9e2af"  #: Warning colour (yellow)  – reserved for future use
 C_ERR     = "#f38ba8"  #: Error overlay colour (same hue as upload)
 
+#: Anzeigezeiträume: Name → (Spanne in s, Bucket-Breite der Rollups in s);
+#: ``None`` = Live-Verlauf der letzten Messpunkte.
+RANGES = {
+    "Live":       None,
+    "24 Stunden": (86_400, 60),
+    "7 Tage":     (7 * 86_400, 900),
+    "30 Tage":    (30 * 86_400, 3600),
+}
+
 STYLESHEET = f"""
 QMainWindow, QDialog, QWidget {{
     background-color: {C_BG};
@@ -435,7 +472,7 @@ class ConfigDialog(QDialog):
         self.cfg = cfg
         self.setWindowTitle("FB Speed – Einstellungen")
         self.setModal(True)
-        self.setFixedSize(420, 440)
+        self.setFixedSize(420, 470)
         self._init_ui()
 
     def _init_ui(self):
@@ -457,41 +494,47 @@ class ConfigDialog(QDialog):
         layout.addRow("Benutzer:", self.user_edit)
         layout.addRow("Passwort:", self.pass_edit)
 
+        settings = self.cfg.settings
         self.refresh_spin = QSpinBox()
         self.refresh_spin.setRange(1, 60)
-        self.refresh_spin.setValue(self.cfg.get_refresh_interval())
+        self.refresh_spin.setValue(settings.refresh_interval)
         self.refresh_spin.setSuffix(" s")
         layout.addRow("Aktualisierung:", self.refresh_spin)
 
+        self.adaptive_check = QCheckBox()
+        self.adaptive_check.setChecked(settings.adaptive_polling)
+        self.adaptive_check.setToolTip(
+            "Bei hoher Last doppelt so oft, im Leerlauf seltener abfragen "
+            "(entlastet die FRITZ!Box)"
+        )
+        layout.addRow("Adaptive Abfragerate:", self.adaptive_check)
+
         self.always_top_check = QCheckBox()
-        self.always_top_check.setChecked(self.cfg.get_always_on_top())
+        self.always_top_check.setChecked(settings.always_on_top)
         layout.addRow("Immer im Vordergrund:", self.always_top_check)
 
         self.bg_combo = QComboBox()
-        self.bg_combo.addItems(["schwarz", "weiss"])
-        self.bg_combo.setCurrentText(self.cfg.get_bg())
+        self.bg_combo.addItems([m.value for m in Background])
+        self.bg_combo.setCurrentText(settings.bg.value)
         layout.addRow("Hintergrund:", self.bg_combo)
 
         self.style_combo = QComboBox()
-        self.style_combo.addItems(["Neon-Lines", "Gefüllte Flächen"])
-        self.style_combo.setCurrentText(self.cfg.get_style())
+        self.style_combo.addItems([m.value for m in CurveStyle])
+        self.style_combo.setCurrentText(settings.style.value)
         layout.addRow("Kurven-Stil:", self.style_combo)
 
         self.ulmode_combo = QComboBox()
-        self.ulmode_combo.addItems(["Überlagert", "Spiegeln unter 0"])
-        self.ulmode_combo.setCurrentText(self.cfg.get_ulmode())
+        self.ulmode_combo.addItems([m.value for m in UploadMode])
+        self.ulmode_combo.setCurrentText(settings.ulmode.value)
         layout.addRow("Upload-Anzeige:", self.ulmode_combo)
 
         self.yaxis_combo = QComboBox()
-        self.yaxis_combo.addItems(["An Leitungskapazität anpassen", "Dynamisch an Spitzenwert"])
-        self.yaxis_combo.setCurrentText(self.cfg.get_yaxis_scaling_mode())
+        self.yaxis_combo.addItems([m.value for m in YAxisScaling])
+        self.yaxis_combo.setCurrentText(settings.yaxis_scaling.value)
         layout.addRow("Y-Achsen-Skalierung:", self.yaxis_combo)
 
         self.smoothing_check = QCheckBox()
-        self.smoothing_check.setChecked(self.cfg.get_smoothing_enabled())
-        if PchipInterpolator is None:
-            self.smoothing_check.setEnabled(False)
-            self.smoothing_check.setToolTip("Benötigt 'scipy': pip install scipy")
+        self.smoothing_check.setChecked(settings.smoothing)
         layout.addRow("Kurven glätten:", self.smoothing_check)
 
         btn_box = QHBoxLayout()
@@ -516,6 +559,7 @@ class ConfigDialog(QDialog):
         self.cfg.config["FRITZBOX"]["username"] = self.user_edit.text().strip()
         self.cfg.config["FRITZBOX"]["password"] = self.pass_edit.text().strip()
         self.cfg.config["APP"]["refresh_interval"] = str(self.refresh_spin.value())
+        self.cfg.config["APP"]["adaptive_polling"] = "yes" if self.adaptive_check.isChecked() else "no"
         self.cfg.config["APP"]["bg"] = self.bg_combo.currentText()
         self.cfg.config["APP"]["style"] = self.style_combo.currentText()
         self.cfg.config["APP"]["ulmode"] = self.ulmode_combo.currentText()
@@ -523,13 +567,170 @@ class ConfigDialog(QDialog):
         self.cfg.config["WINDOW"]["always_on_top"] = "yes" if self.always_top_check.isChecked() else "no"
         self.cfg.config["APP"]["smoothing"] = "yes" if self.smoothing_check.isChecked() else "no"
         try:
-            with (Path(__file__).parent / "config.ini").open("w", encoding="utf-8") as f:
-                self.cfg.config.write(f)
+            self.cfg.save()   # baut cfg.settings neu und benachrichtigt FritzMain
             self.accept()
         except Exception as e:
             QMessageBox.warning(self, "Fehler", f"Konfiguration konnte nicht gespeichert werden:\n{e}")
 
 
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+class _ExportThread(QThread):
+    """Background thread that runs :func:`fritzexport.export`.
+
+    Signals
+    -------
+    done : int, str
+        Number of exported rows and an error message (empty on success).
+    """
+
+    done = pyqtSignal(int, str)
+
+    def __init__(self, kwargs: dict, parent=None):
+        super().__init__(parent)
+        self._kwargs = kwargs
+
+    def run(self) -> None:
+        """Write buffered samples, stream the export to disk and emit :attr:`done`."""
+        import fritzexport
+        store = self._kwargs["store"]
+        try:
+            if store is not None:
+                store.flush()   # noch gepufferte Messpunkte mitnehmen
+            rows = fritzexport.export(**self._kwargs)
+        except (OSError, ValueError) as e:
+            self.done.emit(0, str(e))
+        except Exception as e:   # sqlite3.Error, zlib.error, … – der Dialog wartet auf done
+            self.done.emit(0, repr(e))
+        else:
+            self.done.emit(rows, "")
+
+
+class ExportDialog(QDialog):
+    """Export recorded samples or rollups of one router to CSV / NDJSON.
+
+    The export runs in an :class:`_ExportThread` and streams chunk by chunk
+    (see :mod:`fritzexport`), so the window stays responsive and memory
+    stays flat even for months of 1 s samples.
+    """
+
+    #: Anzeigename → Schlüssel in :data:`fritzexport.RESOLUTIONS`
+    RESOLUTION_NAMES = {
+        "Rohdaten (alle Messpunkte)": "raw",
+        "1-min-Werte": "1min",
+        "15-min-Werte": "15min",
+        "1-h-Werte": "1h",
+    }
+
+    def __init__(self, routers: list, current: str, store, rollups, parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._rollups = rollups
+        self._thread = None
+        self.setWindowTitle("FB Speed – Daten exportieren")
+        self.setModal(True)
+        self.setMinimumWidth(420)
+        self._init_ui(routers, current)
+
+    def _init_ui(self, routers: list, current: str):
+        layout = QFormLayout(self)
+        layout.setSpacing(10)
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setLabelAlignment(Qt.AlignRight)
+
+        self.router_combo = QComboBox()
+        self.router_combo.addItems(routers)
+        self.router_combo.setCurrentText(current)
+        layout.addRow("Router:", self.router_combo)
+
+        now = QDateTime.currentDateTime()
+        self.start_edit = QDateTimeEdit(now.addDays(-1))
+        self.end_edit = QDateTimeEdit(now)
+        for edit in (self.start_edit, self.end_edit):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("dd.MM.yyyy HH:mm")
+        layout.addRow("Von:", self.start_edit)
+        layout.addRow("Bis:", self.end_edit)
+
+        self.resolution_combo = QComboBox()
+        self.resolution_combo.addItems(list(self.RESOLUTION_NAMES))
+        if self._store is None:
+            # Ohne Speicher (history_store = none) gibt es nur die Rollups
+            self.resolution_combo.removeItem(0)
+        layout.addRow("Auflösung:", self.resolution_combo)
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItems(["CSV", "NDJSON"])
+        layout.addRow("Format:", self.format_combo)
+
+        self.gzip_check = QCheckBox()
+        self.gzip_check.setToolTip("Ausgabe mit gzip komprimieren (.gz)")
+        layout.addRow("Komprimieren:", self.gzip_check)
+
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)
+        self.progress.hide()
+        layout.addRow(self.progress)
+
+        btn_box = QHBoxLayout()
+        self.export_btn = QPushButton("Exportieren…")
+        self.export_btn.setDefault(True)
+        self.export_btn.setStyleSheet(
+            f"QPushButton {{ background-color: {C_ACCENT}; color: {C_BG}; border-color: {C_ACCENT}; font-weight: bold; }}"
+        )
+        self.close_btn = QPushButton("Schließen")
+        self.export_btn.clicked.connect(self._start_export)
+        self.close_btn.clicked.connect(self.reject)
+        btn_box.addStretch()
+        btn_box.addWidget(self.export_btn)
+        btn_box.addWidget(self.close_btn)
+        layout.addRow(btn_box)
+
+    def _start_export(self):
+        fmt = self.format_combo.currentText().lower()
+        suffix = ".csv" if fmt == "csv" else ".ndjson"
+        if self.gzip_check.isChecked():
+            suffix += ".gz"
+        router = self.router_combo.currentText()
+        name = "".join(c if c.isalnum() or c in "-_." else "_" for c in router)
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export speichern", str(Path.home() / f"{name}{suffix}"), f"*{suffix}"
+        )
+        if not path:
+            return
+        kwargs = dict(
+            store=self._store,
+            rollups=self._rollups,
+            router=router,
+            path=path,
+            start=self.start_edit.dateTime().toSecsSinceEpoch(),
+            end=self.end_edit.dateTime().toSecsSinceEpoch(),
+            resolution=self.RESOLUTION_NAMES[self.resolution_combo.currentText()],
+            fmt=fmt,
+            compress=self.gzip_check.isChecked(),
+        )
+        self.export_btn.setEnabled(False)
+        self.progress.show()
+        self._thread = _ExportThread(kwargs, self)
+        self._thread.done.connect(self._on_done)
+        self._thread.start()
+
+    def _on_done(self, rows: int, error: str):
+        self.progress.hide()
+        self.export_btn.setEnabled(True)
+        if error:
+            QMessageBox.warning(self, "Fehler", f"Export fehlgeschlagen:\n{error}")
+        else:
+            QMessageBox.information(self, "Export", f"{rows} Zeilen exportiert.")
+
+    def reject(self):
+        if self._thread is not None and self._thread.isRunning():
+            return   # laufenden Export nicht abbrechen
+        super().reject()
+
+
 # ---------------------------------------------------------------------------
 # Main window
 # ---------------------------------------------------------------------------
@@ -550,7 +751,8 @@ class FritzMain(QMainWindow):
     ``_reconnect_signal``
         Triggers :meth:`~fritzworker.FritzWorker.reconnect`.
     ``_debug_request``
-        Triggers :meth:`~fritzworker.FritzWorker.fetch_debug_info`.
+        Triggers :meth:`~fritzworker.FritzWorker.fetch_debug_info` for the
+        selected router (name as ``str`` argument).
     ``_set_device_signal``
         Triggers :meth:`~fritzworker.FritzWorker.set_device_and_reconnect`
         with a :class:`~fritz_discovery.DeviceInfo` argument.
@@ -558,28 +760,52 @@ class FritzMain(QMainWindow):
 
     # Private signals for GUI → Worker cross-thread calls (QueuedConnection)
     _reconnect_signal  = pyqtSignal()
-    _debug_request     = pyqtSignal()
+    _debug_request     = pyqtSignal(str)      # Router-Name
     _set_device_signal = pyqtSignal(object)   # DeviceInfo
 
     def __init__(self):
         super().__init__()
-        self._hist_snapshot = []    # Thread-sicherer Snapshot für Crosshair
+        self._hist_snapshot = ()    # (t, dl, ul)-Views des angezeigten Routers
+        self._hover_idx = -1        # Messpunkt unter dem Crosshair (-1 = keiner)
+        self._plot = None           # PlotBuffer des angezeigten Routers/Zeitraums
+        self._plot_seq = -1         # seq der neuesten Zeile in _plot (-1 = keine Live-Daten)
+        self._plot_new_x = -np.inf  # Zeit der ältesten Zeile seit dem letzten Zeichnen
+        self._plot_partial = False  # Kurven zeigen nur einen Ausschnitt von _plot
+        self._y_range = None        # zuletzt gesetzter Y-Bereich
         self.link_dl = 0.0
         self.link_ul = 0.0
         self._current_style = None  # Cache für Stil-Änderungen
         self._tray = None
         self._debug_dialog = None
+        self._router_status = {}    # Router-Name → letzter connection_status
+        self._router_data = {}      # Router-Name → letztes data_updated
+        self._router_hist = {}      # Router-Name → HistoryBuffer (Spiegel der Worker-Historie)
+        self._current_router = ""   # Router, dessen Daten angezeigt werden
+        self._range = None          # (Spanne, Bucket-Breite) oder None = Live
+        self.worker = None          # FritzWorker, erst nach dem ersten Frame gestartet
+        self.thread = None
 
         try:
             self._init_config()
             self._init_ui()
+        except Exception as e:
+            self._init_failed(e)
+        # Der Worker lädt fritzconnection und verbindet sich – beides erst,
+        # wenn die Ereignisschleife läuft und das Fenster gezeichnet ist.
+        QTimer.singleShot(0, self._deferred_start)
+
+    def _deferred_start(self):
+        try:
             self._start_worker()
         except Exception as e:
-            QMessageBox.critical(
-                self, "Initialisierungsfehler",
-                f"Fehler beim Starten:\n{e}\n\n{traceback.format_exc()}"
-            )
-            sys.exit(1)
+            self._init_failed(e)
+
+    def _init_failed(self, e):
+        QMessageBox.critical(
+            self, "Initialisierungsfehler",
+            f"Fehler beim Starten:\n{e}\n\n{traceback.format_exc()}"
+        )
+        sys.exit(1)
 
     # ── Konfiguration ──────────────────────────────────────────────────────
 
@@ -588,6 +814,12 @@ class FritzMain(QMainWindow):
         if not config_file.exists():
             self._create_default_config()
         self.cfg = Config()
+        self.cfg.add_listener(self._settings_changed)
+
+    def _settings_changed(self, settings):
+        """Übernimmt geänderte Einstellungen (Einstellungsdialog, ``reload()``) sofort."""
+        self._apply_background()
+        self._update_plot()
 
     def _create_default_config(self):
         default = (
@@ -601,6 +833,9 @@ class FritzMain(QMainWindow):
             "always_on_top = yes\n"
             "[APP]\n"
             "refresh_interval = 2\n"
+            "adaptive_polling = no\n"
+            "history_store = log\n"
+            "retention_days = 90\n"
             "bg = schwarz\n"
             "style = Neon-Lines\n"
             "ulmode = Überlagert\n"
@@ -624,6 +859,21 @@ class FritzMain(QMainWindow):
         vbox.setSpacing(8)
         vbox.setContentsMargins(10, 8, 10, 8)
 
+        # Router-Auswahl (nur sichtbar bei mehreren Routern) und Zeitraum
+        top = QHBoxLayout()
+        self.router_combo = QComboBox()
+        self.router_combo.currentTextChanged.connect(self._select_router)
+        top.addWidget(self.router_combo, stretch=1)
+        top.addStretch()
+        top.addWidget(QLabel("Zeitraum:"))
+        self.range_combo = QComboBox()
+        self.range_combo.addItems(list(RANGES))
+        self.range_combo.setToolTip("Live-Verlauf oder Mittelwerte aus den gespeicherten Rollups")
+        self.range_combo.currentTextChanged.connect(self._select_range)
+        top.addWidget(self.range_combo)
+        vbox.addLayout(top)
+        self._populate_routers()
+
         # Metric Cards (DL / UL / Peak DL / Peak UL)
         vbox.addLayout(self._build_cards_row())
 
@@ -634,13 +884,26 @@ class FritzMain(QMainWindow):
         vbox.addWidget(self.ip_label)
 
         # Live-Graph
-        self.plot_widget = pg.PlotWidget()
+        self.plot_widget = pg.PlotWidget(axisItems={"bottom": pg.DateAxisItem(orientation="bottom")})
         vbox.addWidget(self.plot_widget, stretch=1)
 
         self._setup_plot()
         self._setup_tray()
         self._setup_window_geometry()
 
+    def _populate_routers(self):
+        """Füllt die Router-Auswahl aus der Konfiguration."""
+        names = [r.name for r in self.cfg.get_routers()]
+        self._router_status.clear()
+        self._router_data.clear()
+        self._router_hist.clear()
+        self.router_combo.blockSignals(True)
+        self.router_combo.clear()
+        self.router_combo.addItems(names)
+        self.router_combo.blockSignals(False)
+        self.router_combo.setVisible(len(names) > 1)
+        self._current_router = names[0] if names else ""
+
     def _build_cards_row(self) -> QHBoxLayout:
         """Erstellt die Zeile mit den vier Metric-Cards."""
         self._card_dl      = MetricCard("↓  Download",  C_DL)
@@ -672,6 +935,11 @@ class FritzMain(QMainWindow):
         act_reconnect.triggered.connect(self._reconnect)
         cfg_menu.addAction(act_reconnect)
 
+        data_menu = mbar.addMenu("D&aten")
+        act_export = QAction("&Exportieren…", self, shortcut="Ctrl+E")
+        act_export.triggered.connect(self._open_export)
+        data_menu.addAction(act_export)
+
         debug_menu = mbar.addMenu("&Debug")
         act_debug = QAction("&Debug-Informationen…", self)
         act_debug.triggered.connect(self._show_debug_info)
@@ -682,12 +950,15 @@ class FritzMain(QMainWindow):
         act_about.triggered.connect(self._show_about)
         help_menu.addAction(act_about)
 
-    def _setup_plot(self):
-        bg = C_BG if self.cfg.get_bg() == "schwarz" else "#eff1f5"
+    def _apply_background(self):
+        bg = C_BG if self.cfg.settings.bg is Background.BLACK else "#eff1f5"
         self.plot_widget.setBackground(QColor(bg))
+
+    def _setup_plot(self):
+        self._apply_background()
         self.plot_widget.showGrid(x=True, y=True, alpha=0.15)
         self.plot_widget.setLabel("left", "Bandbreite (Mbit/s)")
-        self.plot_widget.setLabel("bottom", "Zeit (Messpunkte)")
+        self.plot_widget.setLabel("bottom", "Zeit")
 
         # Persistente Kurven und Fill-Bereiche (kein Rebuild bei jedem Update!)
         self.dl_curve = pg.PlotCurveItem(pen=pg.mkPen(color=C_DL, width=2), name="↓ Download")
@@ -723,6 +994,11 @@ class FritzMain(QMainWindow):
             self.plot_widget.scene().sigMouseMoved, rateLimit=60, slot=self._mouse_moved
         )
 
+        # Zoom / Pan / Größenänderung → sichtbaren Ausschnitt neu dezimieren
+        vb = self.plot_widget.getViewBox()
+        vb.sigXRangeChanged.connect(self._view_changed)
+        vb.sigResized.connect(self._view_changed)
+
         # Fehler-Overlay
         self._error_item = pg.TextItem("", color=C_ERR, anchor=(0.5, 0.5))
         self._error_item.setFont(QFont("", 16, QFont.Bold))
@@ -750,7 +1026,7 @@ class FritzMain(QMainWindow):
         try:
             x, y = self.cfg.get_window_position()
             self.move(x, y)
-            if self.cfg.get_always_on_top():
+            if self.cfg.settings.always_on_top:
                 self.setWindowFlag(Qt.WindowStaysOnTopHint, True)
         except Exception as e:
             print(f"Fehler bei Fenster-Setup: {e}")
@@ -780,7 +1056,23 @@ class FritzMain(QMainWindow):
 
     @pyqtSlot(dict)
     def _handle_connection_status(self, status):
-        self.statusBar().showMessage(status["message"], 4000)
+        router = status.get("router", "")
+        self._router_status[router] = status
+        if router and self.router_combo.findText(router) < 0:
+            # z. B. per Discovery gewähltes Gerät
+            self.router_combo.addItem(router)
+            self.router_combo.setVisible(self.router_combo.count() > 1)
+        if router and not self._current_router:
+            self._current_router = router
+        if self.router_combo.count() > 1:
+            self.statusBar().showMessage(f"{router}: {status['message']}", 4000)
+        else:
+            self.statusBar().showMessage(status["message"], 4000)
+        if router == self._current_router or not router:
+            self._show_connection_status(status)
+
+    def _show_connection_status(self, status):
+        """Zeigt Modell, Leitung und WAN-IP des ausgewählten Routers an."""
         if status["connected"]:
             details = status["details"]
             self.link_dl = details["link_dl"]
@@ -803,14 +1095,84 @@ class FritzMain(QMainWindow):
                 ip_html = f"<b>{model}</b>  |  WAN: {wan_ip}"
             self.ip_label.setText(ip_html)
         else:
+            retry = status.get("retry_in")
+            suffix = f" – neuer Versuch in {retry:.0f} s" if retry is not None else ""
             self.ip_label.setText(
-                f"<font color='{C_ERR}'>Verbindung zur FRITZ!Box fehlgeschlagen</font>"
+                f"<font color='{C_ERR}'>Verbindung zur FRITZ!Box fehlgeschlagen{suffix}</font>"
             )
 
     @pyqtSlot(dict)
     def _handle_data_update(self, data):
+        router = data.get("router", "")
+        if "rows" in data:
+            # Nur die neuen Zeilen kommen über den Thread – hier anhängen
+            hist = self._router_hist.get(router)
+            if hist is None or hist.capacity != data["capacity"]:
+                hist = self._router_hist[router] = HistoryBuffer(data["capacity"])
+            hist.extend(*data["rows"], seq=data["seq"])
+        self._router_data[router] = data
+        if router != self._current_router:
+            return
+        self._show_data(data)
+
+    def _select_router(self, name: str):
+        """Wechselt die Anzeige auf den Router *name*."""
+        if not name or name == self._current_router:
+            return
+        self._current_router = name
+        self._clear_display()
+        status = self._router_status.get(name)
+        if status:
+            self._show_connection_status(status)
+        else:
+            self.ip_label.setText("Verbinde...")
+        data = self._router_data.get(name)
+        if data:
+            self._show_data(data)
+
+    def _select_range(self, name: str):
+        """Wechselt den Zeitraum des Graphen (Live oder Rollup-Mittelwerte)."""
+        self._range = RANGES.get(name)
+        if self._range is None:
+            self.plot_widget.setLabel("bottom", "Zeit")
+        else:
+            width = self._range[1]
+            unit = f"{width // 3600}-h" if width >= 3600 else f"{width // 60}-min"
+            self.plot_widget.setLabel("bottom", f"Zeit ({unit}-Mittelwerte)")
+        self._hist_snapshot = ()
+        self._hover_idx = -1
+        self._plot = None
+        self._plot_seq = -1
+        self._y_range = None
+        for curve in (self.dl_curve, self.ul_curve, self._dl_zero, self._ul_zero):
+            curve.clear()
+        data = self._router_data.get(self._current_router)
+        if data and not data.get("error"):
+            self._show_data(data)
+
+    def _range_snapshot(self, router: str) -> tuple:
+        """(t, dl, ul)-Mittelwerte des gewählten Zeitraums aus den Rollups."""
+        history = self.worker.history if self.worker is not None else None
+        if history is None:
+            return ()
+        span, width = self._range
+        t, dl, ul = history.query(router, time.time() - span, resolution=width)
+        # Fehlende Buckets als Lücke, nicht als Linie darüber hinweg
+        return break_gaps(t, dl, ul, step=1.5 * width) if len(t) else ()
+
+    def _show_data(self, data):
+        """Aktualisiert Cards und Graph mit einem Datensatz des ausgewählten Routers."""
         if data.get("error"):
-            self._error_item.setText("Verbindungsproblem!")
+            if "rows" in data:
+                # Lückenzeilen des Ausfalls gleich mitzeichnen
+                self._sync_plot(data)
+                self._update_plot()
+            text = "Verbindungsproblem!"
+            if data.get("retry_in") is not None:
+                text += f"\nNeuer Versuch in {data['retry_in']:.0f} s"
+            elif data.get("reason") == "connecting":
+                text += "\nVerbinde neu..."
+            self._error_item.setText(text)
             vb = self.plot_widget.getViewBox()
             r = vb.viewRange()
             cx = (r[0][0] + r[0][1]) / 2
@@ -820,12 +1182,20 @@ class FritzMain(QMainWindow):
             return
 
         self._error_item.hide()
+        if "first_sample_ms" in data:
+            self.statusBar().showMessage(f"Erste Messung nach {data['first_sample_ms']:.0f} ms", 4000)
+
+        self._sync_plot(data)
+
+        if data.get("backfill"):
+            # Vorgeladener Verlauf vor der ersten Messung: nur der Graph
+            self.statusBar().showMessage(f"Verlauf geladen: {len(data['rows'][0])} Messpunkte", 4000)
+            self._update_plot()
+            return
+
         down, up = data["down"], data["up"]
         max_dl, max_ul = data["max_dl"], data["max_ul"]
 
-        # Thread-sicherer Snapshot für Crosshair-Zugriff
-        self._hist_snapshot = list(data["history"])
-
         # Metric Cards aktualisieren
         self._card_dl.set_value(down)
         self._card_ul.set_value(up)
@@ -834,12 +1204,57 @@ class FritzMain(QMainWindow):
 
         # Tray-Tooltip
         if self._tray:
-            self._tray.setToolTip(f"FB Speed\n↓ {down:.2f}  ↑ {up:.2f} Mbit/s")
+            if np.isnan(down):
+                self._tray.setToolTip("FB Speed\nKein gültiger Messwert")
+            else:
+                self._tray.setToolTip(f"FB Speed\n↓ {down:.2f}  ↑ {up:.2f} Mbit/s")
 
         self._update_plot()
 
     # ── Graph-Rendering ───────────────────────────────────────────────────
 
+    def _sync_plot(self, data):
+        """Bringt :attr:`_plot` auf den Stand des Datensatzes *data*.
+
+        Live werden nur die neuen Zeilen angehängt; nach Router- oder
+        Zeitraumwechsel oder verpassten Zeilen wird der Puffer aus dem
+        Spiegel des Routers neu gefüllt, im Zeitraum-Modus aus den Rollups.
+        """
+        router = data.get("router", "")
+        columns = self._plot_columns()
+        if self._range is not None:
+            snap = self._range_snapshot(router) or ((),) * 3
+            n = len(snap[0])
+            if self._plot is None or self._plot.capacity != max(n, 1):
+                self._plot = PlotBuffer(n, columns)
+            self._plot.reset(*snap)
+            self._plot_seq = -1
+            self._plot_new_x = -np.inf
+        else:
+            hist = self._router_hist.get(router)
+            if hist is None:
+                return
+            rows = data.get("rows")
+            new = len(rows[0]) if rows is not None else 0
+            plot = self._plot
+            if plot is not None and plot.capacity == hist.capacity and self._plot_seq == hist.total - new:
+                if new:
+                    plot.extend(*rows[:3])
+                    self._plot_new_x = min(self._plot_new_x, float(rows[0][0]))
+            else:
+                if plot is None or plot.capacity != hist.capacity:
+                    plot = self._plot = PlotBuffer(hist.capacity, columns)
+                plot.reset(*hist.arrays()[:3])
+                self._plot_new_x = -np.inf
+            self._plot_seq = hist.total
+        # Views auf die Zeilen; Indizes beziehen sich auf den alten Stand
+        self._hist_snapshot = self._plot.rows()[:3] if len(self._plot) else ()
+        self._hover_idx = -1
+
+    def _plot_columns(self) -> int:
+        """Breite der Plotfläche in Pixelspalten."""
+        return max(int(self.plot_widget.getViewBox().width()), 100)
+
     def _mouse_moved(self, event):
         if not self._hist_snapshot:
             return
@@ -847,78 +1262,142 @@ class FritzMain(QMainWindow):
         if not self.plot_widget.sceneBoundingRect().contains(pos):
             return
         mp = self.plot_widget.getViewBox().mapSceneToView(pos)
-        idx = int(mp.x())
-        if 0 <= idx < len(self._hist_snapshot):
-            dl, ul = self._hist_snapshot[idx]
-            self._crosshair_v.setPos(mp.x())
+        x = mp.x()
+        t_hist, dl_hist, ul_hist = self._hist_snapshot
+        # Nächster Messpunkt per Binärsuche auf den Zeitstempeln
+        idx = int(np.searchsorted(t_hist, x))
+        if idx == len(t_hist) or (idx > 0 and x - t_hist[idx - 1] < t_hist[idx] - x):
+            idx -= 1
+        if idx != self._hover_idx:
+            # Label-HTML nur bei neuem Messpunkt neu aufbauen
+            self._hover_idx = idx
+            ts = float(t_hist[idx])
+            fmt = "%H:%M:%S" if self._range is None else "%d.%m. %H:%M"
+            self._crosshair_v.setPos(ts)
+            if np.isnan(dl_hist[idx]):
+                values = "Lücke – keine Messwerte"
+            else:
+                values = (f"<font color='{C_DL}'>↓ {dl_hist[idx]:.2f}</font><br>"
+                          f"<font color='{C_UL}'>↑ {ul_hist[idx]:.2f}</font>")
             self._crosshair_label.setHtml(
                 f"<div style='background:{C_SURFACE};color:{C_TEXT};"
                 f"padding:5px;border-radius:4px;border:1px solid {C_OVERLAY};'>"
-                f"<font color='{C_DL}'>↓ {dl:.2f}</font><br>"
-                f"<font color='{C_UL}'>↑ {ul:.2f}</font></div>"
+                f"{time.strftime(fmt, time.localtime(ts))}<br>{values}</div>"
             )
-            self._crosshair_label.setPos(mp.x(), mp.y())
+        self._crosshair_label.setPos(x, mp.y())
 
     def _update_plot(self):
-        if not self._hist_snapshot:
+        plot = self._plot
+        if plot is None or not len(plot):
             return
 
-        n = len(self._hist_snapshot)
-        x_base = np.arange(n, dtype=float)
-        dl_y = np.array([p[0] for p in self._hist_snapshot])
-        ul_y = np.array([p[1] for p in self._hist_snapshot])
+        settings = self.cfg.settings
+        is_mirrored = settings.ulmode is UploadMode.MIRROR
+        plot.configure(self._plot_columns(), is_mirrored, settings.smoothing)
 
-        ulmode = self.cfg.get_ulmode()
-        is_mirrored = ulmode.startswith("Spiegel")
-        if is_mirrored:
-            ul_y = -ul_y
-
-        smoothing = self.cfg.get_smoothing_enabled()
-        if smoothing:
-            # Bug-Fix: clip_negative=False wenn Spiegel-Modus, damit negative UL-Werte erhalten bleiben
-            dl_x, dl_y = self._get_smoothed_data(x_base, dl_y, clip_negative=True)
-            ul_x, ul_y = self._get_smoothed_data(x_base, ul_y, clip_negative=not is_mirrored)
-        else:
-            dl_x = ul_x = x_base
-
-        # Kurven aktualisieren – FillBetweenItem aktualisiert sich automatisch!
-        self.dl_curve.setData(dl_x, dl_y)
-        self.ul_curve.setData(ul_x, ul_y)
-        self._dl_zero.setData(dl_x, np.zeros(len(dl_x)))
-        self._ul_zero.setData(ul_x, np.zeros(len(ul_x)))
+        # Gezoomt: nur neu zeichnen, wenn neue Zeilen im Ausschnitt liegen
+        vb = self.plot_widget.getViewBox()
+        if vb.autoRangeEnabled()[0] or self._plot_new_x <= vb.viewRange()[0][1]:
+            self._render_curves()
+            self._plot_new_x = np.inf
 
         # Stil nur aktualisieren wenn sich etwas geändert hat
         self._apply_style()
 
-        # Y-Achse skalieren
-        dl_hist_vals = [p[0] for p in self._hist_snapshot]
-        scaling = self.cfg.get_yaxis_scaling_mode()
-        if scaling.startswith("An Leitungs"):
-            plot_max = max(self.link_dl, max(dl_hist_vals, default=0))
+        # Y-Achse skalieren – die Hüllkurve enthält das Maximum aller Zeilen
+        hist_max = float(np.fmax.reduce(plot.curves()[1]))   # ohne Lücken (NaN)
+        if not hist_max >= 0:
+            hist_max = 0.0
+        if settings.yaxis_scaling is YAxisScaling.LINK_CAPACITY:
+            plot_max = max(self.link_dl, hist_max)
         else:
-            plot_max = max(dl_hist_vals, default=0)
+            plot_max = hist_max
 
         y_max = max(plot_max, 1.0)
         pad_top = y_max * 0.05
         pad_bot = y_max * 0.08
 
         if is_mirrored:
-            self.plot_widget.setYRange(-(y_max + pad_top), y_max + pad_top)
+            y_range = (-(y_max + pad_top), y_max + pad_top)
         else:
-            self.plot_widget.setYRange(-pad_bot, y_max + pad_top)
+            y_range = (-pad_bot, y_max + pad_top)
+        if y_range != self._y_range:
+            self._y_range = y_range
+            self.plot_widget.setYRange(*y_range)
+
+    def _render_curves(self):
+        """Setzt die Kurven auf den sichtbaren Teil von :attr:`_plot`.
+
+        Bei Auto-Range bekommen die Kurven die Views des
+        :class:`~fritzplot.PlotBuffer` – die Zeilen, ihre geglättete Fassung
+        oder ihre laufend nachgeführte Min/Max-Hüllkurve mit höchstens zwei
+        Punkten je Pixelspalte.  Nach Zoom oder Pan wird der sichtbare
+        Ausschnitt davon per :func:`fritzplot.minmax_decimate` dezimiert;
+        ist der Puffer dezimiert, aber der Ausschnitt klein genug, werden
+        dessen Zeilen geglättet.
+        """
+        plot = self._plot
+        if plot is None or not len(plot):
+            return
+        columns = self._plot_columns()
+        plot.configure(columns, plot.mirrored, plot.smoothing)
+        vb = self.plot_widget.getViewBox()
+        if vb.autoRangeEnabled()[0]:
+            x, dl_y, ul_y, base = plot.curves()
+            self._plot_partial = False
+        else:
+            if plot.decimated:
+                t, dl, _, ul_plot, zero = plot.rows()
+                cols = (t, dl, ul_plot, zero)
+            else:
+                cols = plot.curves()
+            i, j = visible_slice(cols[0], *vb.viewRange()[0])
+            self._plot_partial = (i, j) != (0, len(cols[0]))
+            # Kopien: der Puffer verschiebt seine Zeilen beim Anhängen, der
+            # Ausschnitt bleibt aber bis zum nächsten Zoom stehen
+            x, dl_y, ul_y, base = (c[i:j].copy() for c in cols)
+            if j - i > 2 * columns:
+                _, dl_y = minmax_decimate(x, dl_y, columns)
+                x, ul_y = minmax_decimate(x, ul_y, columns)
+                base = dl_y * 0
+            elif plot.decimated and plot.smoothing:
+                # Bug-Fix: clip_negative=False wenn Spiegel-Modus, damit negative UL-Werte erhalten bleiben
+                _, dl_y = self._get_smoothed_data(x, dl_y, clip_negative=True)
+                x, ul_y = self._get_smoothed_data(x, ul_y, clip_negative=not plot.mirrored)
+                base = dl_y * 0
+
+        # Kurven aktualisieren – FillBetweenItem aktualisiert sich automatisch!
+        # Lücken (NaN) unterbrechen Linie und Basislinie an derselben Stelle,
+        # damit auch die Füllung dort aussetzt.
+        self.dl_curve.setData(x, dl_y, connect="finite")
+        self.ul_curve.setData(x, ul_y, connect="finite")
+        self._dl_zero.setData(x, base, connect="finite")
+        self._ul_zero.setData(x, base, connect="finite")
+
+    def _view_changed(self, *_):
+        """Zoom, Pan oder neue Plotbreite: Ausschnitt neu dezimieren."""
+        # Bei Auto-Range zeigen die Kurven ohnehin alle Daten (das Signal
+        # stammt dann vom eigenen setData()) – außer direkt nach dem Zoom
+        # oder wenn sich die Breite geändert hat.
+        if self._plot is None:
+            return
+        if (self._plot_partial or not self.plot_widget.getViewBox().autoRangeEnabled()[0]
+                or self._plot.columns != self._plot_columns()):
+            self._render_curves()
 
     def _get_smoothed_data(self, x, y, clip_negative: bool = True):
         """Apply PChip spline smoothing to a data series.
 
-        Upsamples *y* by a factor of 6 using
-        :class:`~scipy.interpolate.PchipInterpolator`.  Returns the original
-        arrays unchanged when ``scipy`` is not installed or when fewer than
-        four data points are available.
+        Evaluates a monotone cubic through the samples at
+        :data:`fritzplot.SMOOTH_STEPS` points per sample interval
+        (:func:`fritzplot.smooth`).  The live curves come smoothed from the
+        :class:`~fritzplot.PlotBuffer`; this is used for zoomed views of a
+        decimated history.
 
         Parameters
         ----------
         x : np.ndarray
-            Sample positions (integer indices).
+            Sample times (Unix seconds, strictly increasing).
         y : np.ndarray
             Sample values in Mbit/s.
         clip_negative : bool
@@ -930,19 +1409,15 @@ class FritzMain(QMainWindow):
         -------
         tuple[np.ndarray, np.ndarray]
             ``(x_new, y_smooth)`` with higher resolution, or ``(x, y)``
-            as a no-op fallback.
+            for fewer than two points.  Gaps (``NaN``) stay in place; the
+            runs between them are smoothed separately.
         """
-        if PchipInterpolator is None or len(x) < 4:
-            return x, y
-        try:
-            interp = PchipInterpolator(x, y)
-            x_new = np.linspace(x.min(), x.max(), len(x) * 6)
-            y_smooth = interp(x_new)
-            if clip_negative:
-                y_smooth[y_smooth < 0] = 0.0
-            return x_new, y_smooth
-        except Exception:
+        if len(x) < 2:
             return x, y
+        x_new, y_smooth = smooth(x, y)
+        if clip_negative:
+            np.maximum(y_smooth, 0.0, out=y_smooth)
+        return x_new, y_smooth
 
     def _apply_style(self):
         """Update curve pens and fill visibility to match the configured style.
@@ -957,12 +1432,12 @@ class FritzMain(QMainWindow):
             Curves rendered with a thin 1-pixel outline; fill items visible
             with 50 % alpha brush.
         """
-        style = self.cfg.get_style()
-        if style == self._current_style:
+        style = self.cfg.settings.style
+        if style is self._current_style:
             return
         self._current_style = style
 
-        if style.startswith("Gefüllte"):
+        if style is CurveStyle.FILLED:
             self.dl_curve.setPen(pg.mkPen(color=C_DL, width=1))
             self.ul_curve.setPen(pg.mkPen(color=C_UL, width=1))
             self._dl_fill.setVisible(True)
@@ -978,24 +1453,38 @@ class FritzMain(QMainWindow):
     def _open_config(self):
         dlg = ConfigDialog(self.cfg, self)
         if dlg.exec_():
-            self.cfg.reload()
-            self._current_style = None  # Stil-Cache ungültig machen
-            # Hintergrundfarbe sofort anpassen
-            bg = C_BG if self.cfg.get_bg() == "schwarz" else "#eff1f5"
-            self.plot_widget.setBackground(QColor(bg))
             self._reconnect()
 
+    def _open_export(self):
+        # Store und Rollups gibt es erst, wenn der Worker-Thread läuft (history zuletzt gesetzt)
+        if self.worker is None or self.worker.history is None:
+            self.statusBar().showMessage("Verlauf wird noch geladen – Export gleich erneut versuchen.", 4000)
+            return
+        routers = [self.router_combo.itemText(i) for i in range(self.router_combo.count())]
+        dlg = ExportDialog(routers, self._current_router, self.worker.store, self.worker.rollups, self)
+        dlg.exec_()
+
     def _reconnect(self):
         self.statusBar().showMessage("Verbinde neu…", 0)
-        self._hist_snapshot = []
+        self._populate_routers()
+        self._clear_display()
+        # Thread-sicherer Aufruf über Signal/Slot (QueuedConnection)
+        self._reconnect_signal.emit()
+
+    def _clear_display(self):
+        """Leert Graph und Cards (Reconnect, Routerwechsel)."""
+        self._hist_snapshot = ()
+        self._hover_idx = -1
+        self._plot = None
+        self._plot_seq = -1
+        self._y_range = None
         self.dl_curve.clear()
         self.ul_curve.clear()
         self._dl_zero.clear()
         self._ul_zero.clear()
+        self._error_item.hide()
         for card in (self._card_dl, self._card_ul, self._card_peak_dl, self._card_peak_ul):
             card.set_value(-1)
-        # Thread-sicherer Aufruf über Signal/Slot (QueuedConnection)
-        self._reconnect_signal.emit()
 
     def _open_discovery_dialog(self):
         dlg = DiscoveryDialog(self)
@@ -1005,8 +1494,6 @@ class FritzMain(QMainWindow):
             # Kein Gerät gewählt → Einstellungsdialog öffnen
             cfg_dlg = ConfigDialog(self.cfg, self)
             if cfg_dlg.exec_():
-                self.cfg.reload()
-                self._current_style = None
                 self._reconnect()
             else:
                 # Abbrechen: trotzdem mit bestehender Konfiguration nochmal versuchen
@@ -1015,11 +1502,26 @@ class FritzMain(QMainWindow):
     def _on_device_selected(self, device_info):
         """Wird aufgerufen wenn der Nutzer ein Gerät im Discovery-Dialog wählt."""
         self.statusBar().showMessage(f"Verbinde mit {device_info.model} ({device_info.ip})…", 0)
-        self._hist_snapshot = []
-        self.dl_curve.clear()
-        self.ul_curve.clear()
-        for card in (self._card_dl, self._card_ul, self._card_peak_dl, self._card_peak_ul):
-            card.set_value(-1)
+        self._clear_display()
+        if self.router_combo.count() != 1:
+            # Der Worker benennt das Gerät nach seiner IP
+            self._router_status.clear()
+            self._router_data.clear()
+            self._router_hist.clear()
+            self.router_combo.blockSignals(True)
+            self.router_combo.clear()
+            self.router_combo.blockSignals(False)
+            self.router_combo.hide()
+            self._current_router = ""
+        # IP hier im GUI-Thread speichern: config.ini und die Config-Listener
+        # gehören dem GUI-Thread, der Worker liest die Konfiguration nur
+        try:
+            if "FRITZBOX" not in self.cfg.config:
+                self.cfg.config.add_section("FRITZBOX")
+            self.cfg.config["FRITZBOX"]["address"] = device_info.ip
+            self.cfg.save()
+        except Exception as e:
+            print(f"Fehler beim Speichern der IP-Adresse: {e}")
         # IP an Worker übergeben (thread-sicher über Signal)
         self._set_device_signal.emit(device_info)
 
@@ -1040,7 +1542,7 @@ class FritzMain(QMainWindow):
         layout.addWidget(close_btn)
         self._debug_dialog.show()
         # Daten-Anfrage an Worker senden (läuft im Worker-Thread, blockiert GUI nicht)
-        self._debug_request.emit()
+        self._debug_request.emit(self._current_router)
 
     @pyqtSlot(str)
     def _handle_debug_info(self, info: str):
@@ -1066,16 +1568,16 @@ class FritzMain(QMainWindow):
                 self.cfg.config.add_section("WINDOW")
             self.cfg.config["WINDOW"]["x"] = str(self.pos().x())
             self.cfg.config["WINDOW"]["y"] = str(self.pos().y())
-            with (Path(__file__).parent / "config.ini").open("w", encoding="utf-8") as f:
-                self.cfg.config.write(f)
+            self.cfg.save()
         except Exception as e:
             print(f"Fehler beim Speichern der Fensterposition: {e}")
 
     def _quit_application(self):
         self.save_window_position()
-        self.worker.stop()
-        self.thread.quit()
-        self.thread.wait(3000)
+        if self.thread is not None:
+            self.worker.stop()
+            self.thread.quit()
+            self.thread.wait(3000)
         QApplication.instance().quit()
 
     def closeEvent(self, event):
@@ -1105,9 +1607,6 @@ def main():
     else:
         os.environ.setdefault("QT_AUTO_SCREEN_SCALE_FACTOR", "1")
 
-    if PchipInterpolator is None:
-        print("HINWEIS: 'scipy' nicht installiert – Kurvenglättung deaktiviert. (pip install scipy)")
-
     app = QApplication(sys.argv)
     app.setApplicationName("FB Speed Monitor")
     app.setApplicationVersion("5.0")